@@ -0,0 +1,41 @@
+"""
+Times bulk construction of Amounts from trusted minor unit integers, comparing
+the validated constructors with the unchecked bulk path.
+
+Usage: python benchmarks/bench_construction.py [--count 1000000]
+"""
+from __future__ import print_function
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from currint import Amount, currencies  # noqa
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000, help="number of Amounts to construct")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    values = list(range(args.count))
+    gbp = currencies["GBP"]
+    cases = [
+        ("from_code_and_minor", lambda: [Amount.from_code_and_minor("GBP", value) for value in values]),
+        ("Amount(currency, value)", lambda: [Amount(gbp, value) for value in values]),
+        ("_from_trusted", lambda: [Amount._from_trusted(gbp, value) for value in values]),
+        ("from_minor_many", lambda: Amount.from_minor_many("GBP", values)),
+    ]
+    baseline = None
+    print("%-26s %10s %10s" % ("constructor", "seconds", "speedup"))
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print("%-26s %10.4f %9.2fx" % (name, best, baseline / best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Times deduplicating Amounts with a set and with a dict, compared to the
+quadratic list scan that was the only option while Amount was unhashable.
+
+Usage: python benchmarks/bench_hashing.py [--count 1000000] [--distinct 10000]
+"""
+from __future__ import print_function
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from currint import Amount, currencies  # noqa
+
+
+def make_amounts(count, distinct):
+    rng = random.Random(42)
+    codes = ["GBP", "USD", "EUR", "JPY"]
+    return [
+        Amount(currencies[rng.choice(codes)], rng.randrange(distinct // len(codes)))
+        for _ in range(count)
+    ]
+
+
+def dedup_set(amounts):
+    return set(amounts)
+
+
+def dedup_dict(amounts):
+    counts = {}
+    for amount in amounts:
+        counts[amount] = counts.get(amount, 0) + 1
+    return counts
+
+
+def dedup_list(amounts):
+    seen = []
+    for amount in amounts:
+        if amount not in seen:
+            seen.append(amount)
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000, help="number of Amounts to deduplicate")
+    parser.add_argument("--distinct", type=int, default=10000, help="approximate number of distinct Amounts")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    amounts = make_amounts(args.count, args.distinct)
+    # The list scan is quadratic, so only time it on a small sample
+    sample = amounts[:max(args.count // 100, 1)]
+    print("%-28s %12s" % ("method", "seconds"))
+    for name, func, data in [
+        ("set(amounts)", dedup_set, amounts),
+        ("dict counting", dedup_dict, amounts),
+        ("list scan (%d amounts)" % len(sample), dedup_list, sample),
+    ]:
+        best = min(timeit.repeat(lambda: func(data), number=1, repeat=args.repeat))
+        print("%-28s %12.4f" % (name, best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Times a cold `import currint` in fresh interpreters, which is what our
+short-lived command line tools and workers pay on every invocation.
+
+Usage: python benchmarks/bench_import.py [--runs 20] [--module currint.currency]
+"""
+from __future__ import print_function
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCRIPT = """
+import sys
+from timeit import default_timer
+sys.path.insert(0, %r)
+start = default_timer()
+import %s
+print(default_timer() - start)
+"""
+
+
+def time_import(module):
+    """
+    Returns the seconds taken to import the module in a new interpreter.
+    """
+    # Installed packages import from cached bytecode, so allow writing it
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT % (ROOT, module)], env=env)
+    return float(output.decode("ascii").strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="number of interpreters to start")
+    parser.add_argument("--module", action="append", help="module to import (may be repeated)")
+    args = parser.parse_args()
+
+    print("%-26s %10s %10s" % ("module", "best ms", "median ms"))
+    for module in args.module or ["currint.currency", "currint"]:
+        time_import(module)
+        times = sorted(time_import(module) for _ in range(args.runs))
+        print("%-26s %10.2f %10.2f" % (module, times[0] * 1000, times[len(times) // 2] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures the memory cost per instance of Amount and Currency, comparing the
+slotted classes against equivalent __dict__-based layouts.
+
+Usage: python benchmarks/bench_memory.py [--count 10000000]
+"""
+from __future__ import print_function
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from currint import Amount, Currency, currencies  # noqa
+
+
+class DictAmount(Amount):
+    """
+    An Amount with a per-instance __dict__, as Amount was before it used __slots__.
+    """
+
+
+class DictCurrency(Currency):
+    """
+    A Currency with a per-instance __dict__, as Currency was before it used __slots__.
+    """
+
+
+def measure(factory, count):
+    """
+    Returns the number of bytes allocated per object created by `factory`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Don't count the list holding the objects, or the int values themselves
+    overhead = sys.getsizeof(objects) + sum(sys.getsizeof(i) for i in range(min(count, 256), count))
+    del objects
+    return (end - start - overhead) / float(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000000, help="number of Amounts to create")
+    args = parser.parse_args()
+
+    gbp = currencies["GBP"]
+    currency_count = max(args.count // 1000, 1)
+    results = [
+        ("Amount (__dict__)", measure(lambda i: DictAmount(gbp, i), args.count)),
+        ("Amount (__slots__)", measure(lambda i: Amount(gbp, i), args.count)),
+        ("Currency (__dict__)", measure(lambda i: DictCurrency("GBP", "826", 2, "Pound Sterling"), currency_count)),
+        ("Currency (__slots__)", measure(lambda i: Currency("GBP", "826", 2, "Pound Sterling"), currency_count)),
+    ]
+    print("%-22s %14s" % ("layout", "bytes/instance"))
+    for name, size in results:
+        print("%-22s %14.1f" % (name, size))
+    print("Total for %d Amounts: %.1f MB (__dict__) vs %.1f MB (__slots__)" % (
+        args.count,
+        results[0][1] * args.count / 1e6,
+        results[1][1] * args.count / 1e6,
+    ))
+
+
+if __name__ == "__main__":
+    main()
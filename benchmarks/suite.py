@@ -0,0 +1,511 @@
+"""
+Benchmark suite for the Amount and Currency hot paths.
+
+Times every registered case and writes a JSON report that can be compared
+against a report from another commit:
+
+    python benchmarks/suite.py --output before.json
+    git checkout other-branch
+    python benchmarks/suite.py --output after.json --compare before.json
+
+With --compare, exits non-zero if any case got slower than --threshold.
+Cases for features that the checked out tree doesn't have are skipped, so
+the same script can time older commits. Slow cases that write temporary
+files or start process pools only run with --all.
+"""
+from __future__ import print_function
+import argparse
+import atexit
+import importlib
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Only names every version of currint has are imported here; cases import
+# anything newer themselves, and list it in `requires`
+from currint import Amount, currencies  # noqa
+from currint import amount as amount_module  # noqa
+
+CASES = []
+
+
+def case(name, requires=(), default=True):
+    """
+    Registers a benchmark. The decorated function does any setup and
+    returns the zero-argument callable to be timed.
+
+    `requires` lists the dotted names (e.g. "currint.Rate") the case needs;
+    it is skipped if any are missing. Cases with default=False only run
+    with --all.
+    """
+    def decorator(func):
+        CASES.append((name, func, tuple(requires), default))
+        return func
+    return decorator
+
+
+def missing_requirement(requires):
+    """
+    Returns the first dotted name in requires that can't be found, or None.
+    """
+    for dotted in requires:
+        parts = dotted.split(".")
+        target = None
+        for split in range(len(parts), 0, -1):
+            try:
+                target = importlib.import_module(".".join(parts[:split]))
+            except ImportError:
+                continue
+            break
+        for part in parts[split:]:
+            target = getattr(target, part, None)
+        if target is None:
+            return dotted
+    return None
+
+
+# Construction
+
+@case("amount.init")
+def bench_init():
+    gbp = currencies["GBP"]
+    return lambda: Amount(gbp, 12345)
+
+
+@case("amount.from_code_and_minor")
+def bench_from_code_and_minor():
+    return lambda: Amount.from_code_and_minor("GBP", 12345)
+
+
+@case("amount.from_code_and_major.str")
+def bench_from_code_and_major_str():
+    return lambda: Amount.from_code_and_major("GBP", "123.45")
+
+
+@case("amount.from_code_and_major.decimal")
+def bench_from_code_and_major_decimal():
+    value = Decimal("123.45")
+    return lambda: Amount.from_code_and_major("GBP", value)
+
+
+@case("amount.from_numeric_and_minor", requires=["currint.Amount.from_numeric_and_minor"])
+def bench_from_numeric_and_minor():
+    return lambda: Amount.from_numeric_and_minor("0826", 12345)
+
+
+@case("amount.from_minor_many.1000", requires=["currint.Amount.from_minor_many"])
+def bench_from_minor_many():
+    values = list(range(1000))
+    return lambda: Amount.from_minor_many("GBP", values)
+
+
+# Arithmetic and comparison
+
+@case("amount.add")
+def bench_add():
+    left = Amount(currencies["GBP"], 12345)
+    right = Amount(currencies["GBP"], 678)
+    return lambda: left + right
+
+
+@case("amount.sub")
+def bench_sub():
+    left = Amount(currencies["GBP"], 12345)
+    right = Amount(currencies["GBP"], 678)
+    return lambda: left - right
+
+
+@case("amount.lt")
+def bench_lt():
+    left = Amount(currencies["GBP"], 12345)
+    right = Amount(currencies["GBP"], 678)
+    return lambda: left < right
+
+
+@case("amount.eq")
+def bench_eq():
+    left = Amount(currencies["GBP"], 12345)
+    right = Amount(currencies["GBP"], 12345)
+    return lambda: left == right
+
+
+@case("amount.hash", requires=["currint.Amount.__hash__"])
+def bench_hash():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: hash(amount)
+
+
+@case("amount.sum_zero_seed.1000")
+def bench_sum():
+    amounts = [Amount(currencies["GBP"], value) for value in range(1000)]
+    return lambda: sum(amounts, Amount.ZERO)
+
+
+@case("total.1000", requires=["currint.total"])
+def bench_total():
+    from currint import total
+    amounts = [Amount(currencies["GBP"], value) for value in range(1000)]
+    return lambda: total(amounts)
+
+
+@case("totals_by_currency.1000", requires=["currint.totals_by_currency"])
+def bench_totals_by_currency():
+    from currint import totals_by_currency
+    codes = ["GBP", "USD", "EUR", "JPY"]
+    amounts = [Amount(currencies[codes[value % 4]], value) for value in range(1000)]
+    return lambda: totals_by_currency(amounts)
+
+
+# Factors, conversion and division
+
+@case("amount.apply_factor.int")
+def bench_apply_factor_int():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.apply_factor(3)
+
+
+@case("amount.apply_factor.decimal")
+def bench_apply_factor_decimal():
+    amount = Amount(currencies["GBP"], 12345)
+    factor = Decimal("1.005")
+    return lambda: amount.apply_factor(factor)
+
+
+@case("amount.convert_currency.float")
+def bench_convert_currency_float():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.convert_currency("USD", 1.2734)
+
+
+@case("amount.convert_currency.decimal")
+def bench_convert_currency_decimal():
+    amount = Amount(currencies["GBP"], 12345)
+    rate = Decimal("1.2734")
+    return lambda: amount.convert_currency("USD", rate)
+
+
+@case("amount.apply_factor.rate", requires=["currint.Rate"])
+def bench_apply_factor_rate():
+    from currint import Rate
+    amount = Amount(currencies["GBP"], 12345)
+    factor = Rate("1.005")
+    return lambda: amount.apply_factor(factor)
+
+
+@case("amount.convert_currency.rate", requires=["currint.Rate"])
+def bench_convert_currency_rate():
+    from currint import Rate
+    amount = Amount(currencies["GBP"], 12345)
+    rate = Rate("1.2734")
+    return lambda: amount.convert_currency("USD", rate)
+
+
+@case("amount.convert_currency.major", requires=["currint.Rate"])
+def bench_convert_currency_major():
+    from currint import Rate
+    amount = Amount(currencies["USD"], 12345)
+    rate = Rate("151.37")
+    return lambda: amount.convert_currency("JPY", rate, major=True)
+
+
+@case("rate.apply_many.1000", requires=["currint.Rate.apply_many"])
+def bench_rate_apply_many():
+    from currint import Rate
+    values = list(range(-500, 500))
+    rate = Rate("1.2734")
+    return lambda: rate.apply_many(values)
+
+
+@case("rate_table.convert.cross", requires=["currint.RateTable"])
+def bench_rate_table_convert():
+    from currint import RateTable
+    table = RateTable(pivot="USD")
+    table.update({("GBP", "USD"): "1.2734", ("USD", "JPY"): "151.37"})
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: table.convert(amount, "JPY")
+
+
+@case("rate_table.convert_many.1000", requires=["currint.RateTable.convert_many"])
+def bench_rate_table_convert_many():
+    from currint import RateTable
+    table = RateTable(pivot="USD")
+    table.update({("GBP", "USD"): "1.2734", ("USD", "JPY"): "151.37", ("EUR", "USD"): "1.0841"})
+    amounts = [Amount(currencies[("GBP", "EUR")[value % 2]], value) for value in range(1000)]
+    return lambda: table.convert_many(amounts, "JPY")
+
+
+@case("amount.divide_and_round")
+def bench_divide_and_round():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.divide_and_round(7)
+
+
+@case("amount.integral_division")
+def bench_integral_division():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.integral_division(5)
+
+
+@case("amount.integral_division.large")
+def bench_integral_division_large():
+    amount = Amount(currencies["XBT"], (2 ** 60 + 3) * 5)
+    return lambda: amount.integral_division(5)
+
+
+@case("amount.divmod", requires=["currint.Amount.__divmod__"])
+def bench_divmod():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: divmod(amount, 7)
+
+
+@case("amount.allocate.3", requires=["currint.Amount.allocate"])
+def bench_allocate():
+    amount = Amount(currencies["GBP"], 12345)
+    weights = [Decimal("0.2"), Decimal("0.3"), Decimal("0.5")]
+    return lambda: amount.allocate(weights)
+
+
+@case("amount.split.3", requires=["currint.Amount.split"])
+def bench_split():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.split(3)
+
+
+@case("amount.allocate_many.1000x3", requires=["currint.Amount.allocate_many"])
+def bench_allocate_many():
+    amounts = [Amount(currencies["GBP"], value) for value in range(1000)]
+    weights = [Decimal("0.2"), Decimal("0.3"), Decimal("0.5")]
+    return lambda: Amount.allocate_many(amounts, weights)
+
+
+# Currency registry, conversion and formatting
+
+@case("currencies.lookup")
+def bench_currencies_lookup():
+    return lambda: currencies["GBP"]
+
+
+@case("get_currency", requires=["currint.get_currency"])
+def bench_get_currency():
+    from currint import get_currency
+    return lambda: get_currency("gbp")
+
+
+@case("get_currency.invalid", requires=["currint.get_currency"])
+def bench_get_currency_invalid():
+    from currint import get_currency
+    return lambda: get_currency("WAITWHAT", None)
+
+
+@case("arrays.indices_for_numeric.1000", requires=["currint.arrays.indices_for_numeric"])
+def bench_indices_for_numeric():
+    from currint.arrays import indices_for_numeric
+    numeric_codes = [("826", "840", "978", "392")[value % 4] for value in range(1000)]
+    return lambda: indices_for_numeric(numeric_codes)
+
+
+@case("currency.major_to_minor")
+def bench_major_to_minor():
+    value = Decimal("123.45")
+    currency = currencies["GBP"]
+    return lambda: currency.major_to_minor(value)
+
+
+@case("currency.minor_to_major")
+def bench_minor_to_major():
+    currency = currencies["GBP"]
+    return lambda: currency.minor_to_major(12345)
+
+
+@case("amount.to_major_decimal")
+def bench_to_major_decimal():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: amount.to_major_decimal()
+
+
+@case("currency.format")
+def bench_format():
+    currency = currencies["GBP"]
+    return lambda: currency.format(-12345)
+
+
+@case("currency.format.divisor")
+def bench_format_divisor():
+    currency = currencies["MRO"]
+    return lambda: currency.format(12)
+
+
+@case("currency.format_decimal")
+def bench_format_decimal():
+    currency = currencies["GBP"]
+    return lambda: currency.format_decimal(-12345)
+
+
+@case("currency.format_many.1000", requires=["currint.Currency.format_many"])
+def bench_format_many():
+    currency = currencies["GBP"]
+    values = list(range(-500, 500))
+    return lambda: currency.format_many(values)
+
+
+@case("amount.str")
+def bench_str():
+    amount = Amount(currencies["GBP"], 12345)
+    return lambda: str(amount)
+
+
+# Serialization
+
+@case("pickle.amounts.1000")
+def bench_pickle_amounts():
+    amounts = [Amount(currencies[("GBP", "USD")[value % 2]], value * 37) for value in range(1000)]
+    return lambda: pickle.loads(pickle.dumps(amounts, pickle.HIGHEST_PROTOCOL))
+
+
+@case("codec.dumps_many.1000", requires=["currint.codec.dumps_many"])
+def bench_codec_dumps_many():
+    from currint.codec import dumps_many
+    amounts = [Amount(currencies[("GBP", "USD")[value % 2]], value * 37) for value in range(1000)]
+    return lambda: dumps_many(amounts)
+
+
+@case("codec.loads_many.1000", requires=["currint.codec.dumps_many", "currint.codec.loads_many"])
+def bench_codec_loads_many():
+    from currint.codec import dumps_many, loads_many
+    data = dumps_many([Amount(currencies[("GBP", "USD")[value % 2]], value * 37) for value in range(1000)])
+    return lambda: loads_many(data)
+
+
+@case("ledger.open_and_total.100000", requires=["currint.ledger.LedgerWriter"], default=False)
+def bench_ledger_totals():
+    from currint.ledger import LedgerReader, LedgerWriter
+    handle, path = tempfile.mkstemp(suffix=".ledger")
+    os.close(handle)
+    atexit.register(os.remove, path)
+    with LedgerWriter(path) as writer:
+        writer.write_many(Amount(currencies[("GBP", "USD", "EUR")[value % 3]], value) for value in range(100000))
+
+    def run():
+        with LedgerReader(path) as reader:
+            return reader.totals()
+    return run
+
+
+# Parallel bulk operations (timed with a warm pool; includes shipping shards)
+
+@case("parallel.totals.1000000", requires=["currint.parallel.totals"], default=False)
+def bench_parallel_totals():
+    from concurrent.futures import ProcessPoolExecutor
+    from currint import parallel
+    from currint.arrays import MultiCurrencyAmountArray
+    batch = MultiCurrencyAmountArray.from_codes_and_minor(
+        [("GBP", "USD", "EUR")[value % 3] for value in range(1000000)], range(1000000),
+    )
+    pool = ProcessPoolExecutor()
+    atexit.register(pool.shutdown)
+    parallel.totals(batch, executor=pool)
+    return lambda: parallel.totals(batch, executor=pool)
+
+
+def time_case(func, repeat, min_time):
+    """
+    Returns the best time per call in nanoseconds, and the loop count used.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return best / number * 1e9, number
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT,
+        ).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints each case's change against the baseline report, and returns the
+    names of cases that slowed down by more than threshold.
+    """
+    regressions = []
+    print()
+    print("%-40s %12s %12s %8s" % ("case", "baseline ns", "current ns", "ratio"))
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            print("%-40s %12s %12.1f %8s" % (name, "-", result["ns_per_call"], "new"))
+            continue
+        old = baseline[name]["ns_per_call"]
+        ratio = result["ns_per_call"] / old
+        flag = ""
+        if ratio > threshold:
+            regressions.append(name)
+            flag = "  SLOWER"
+        print("%-40s %12.1f %12.1f %7.2fx%s" % (name, old, result["ns_per_call"], ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write a JSON report to this path")
+    parser.add_argument("--compare", help="compare against a previous JSON report")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio that counts as a regression")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--all", action="store_true", help="also run the slow cases (temporary files, process pools)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup, requires, default in CASES:
+        if args.filter not in name or not (default or args.all):
+            continue
+        missing = missing_requirement(requires)
+        if missing is not None:
+            print("%-40s %12s (no %s)" % (name, "skipped", missing))
+            continue
+        ns_per_call, number = time_case(setup(), args.repeat, args.min_time)
+        results[name] = {"ns_per_call": ns_per_call, "number": number}
+        print("%-40s %12.1f ns" % (name, ns_per_call))
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "speedups": getattr(amount_module, "_speedups", None) is not None,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n%d case(s) slower than %.2fx: %s" % (len(regressions), args.threshold, ", ".join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
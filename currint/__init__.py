@@ -1,4 +1,8 @@
-from .amount import Amount  # noqa
-from .currency import Currency, currencies  # noqa
+from .amount import Amount, total, totals_by_currency  # noqa
+from .arrays import AmountArray, MultiCurrencyAmountArray  # noqa
+from .currency import Currency, currencies, get_currency, load_currency_data, register_currency  # noqa
+from .fx import RateTable  # noqa
+from .parsing import parse_major_stream  # noqa
+from .rate import Rate  # noqa
 
 __version__ = '2.0.0'
@@ -0,0 +1,748 @@
+/*
+ * Compiled core for currint.amount.Amount.
+ *
+ * AmountCore is the base class of Amount when this extension is available:
+ * it holds the currency and value slots and implements arithmetic,
+ * comparison, hashing and minor/major conversion with exactly the same
+ * semantics (and exceptions) as the pure Python _AmountCore in amount.py,
+ * which is used instead if this fails to build or CURRINT_PURE_PYTHON is set.
+ *
+ * Results are always plain Amounts, as Amount._from_trusted makes them;
+ * amount.py hands us the Amount class, Amount.ZERO, Currency and
+ * get_currency through setup() once they exist.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <structmember.h>
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *currency;
+    PyObject *value;
+} AmountObject;
+
+static PyTypeObject AmountCoreType;
+
+/* Set by setup() */
+static PyTypeObject *amount_type = NULL;
+static PyObject *zero = NULL;
+static PyObject *currency_type = NULL;
+static PyObject *get_currency = NULL;
+
+/* From the decimal module */
+static PyObject *decimal_type = NULL;
+static PyObject *invalid_operation = NULL;
+
+static PyObject *str_currency = NULL;
+static PyObject *str_value = NULL;
+static PyObject *str_divisor = NULL;
+static PyObject *str_lt = NULL;
+static PyObject *str_major_to_minor = NULL;
+static PyObject *str_minor_to_major = NULL;
+static PyObject *str_force_round = NULL;
+static PyObject *round_function = NULL;
+
+static PyObject *core_richcompare(PyObject *self, PyObject *other, int op);
+
+/* Attribute access: straight from the struct for plain Amounts, otherwise
+ * through getattr, so subclasses and non-Amounts behave as in Python. */
+
+static PyObject *
+get_field(PyObject *obj, PyObject *name, int is_currency)
+{
+    if (amount_type != NULL && Py_TYPE(obj) == amount_type) {
+        PyObject *field = is_currency ? ((AmountObject *)obj)->currency : ((AmountObject *)obj)->value;
+        if (field != NULL) {
+            Py_INCREF(field);
+            return field;
+        }
+    }
+    return PyObject_GetAttr(obj, name);
+}
+
+#define GET_CURRENCY(obj) get_field((obj), str_currency, 1)
+#define GET_VALUE(obj) get_field((obj), str_value, 0)
+
+static PyObject *
+new_amount(PyObject *currency, PyObject *value)
+{
+    /* Amount._from_trusted(currency, value); steals value */
+    AmountObject *amount;
+    if (value == NULL) {
+        return NULL;
+    }
+    amount = (AmountObject *)amount_type->tp_alloc(amount_type, 0);
+    if (amount == NULL) {
+        Py_DECREF(value);
+        return NULL;
+    }
+    Py_INCREF(currency);
+    amount->currency = currency;
+    amount->value = value;
+    return (PyObject *)amount;
+}
+
+static int
+check_ready(void)
+{
+    if (amount_type == NULL) {
+        PyErr_SetString(PyExc_RuntimeError, "currint._speedups.setup() has not been called");
+        return -1;
+    }
+    return 0;
+}
+
+/* Lifecycle */
+
+static int
+core_traverse(AmountObject *self, visitproc visit, void *arg)
+{
+    Py_VISIT(self->currency);
+    Py_VISIT(self->value);
+    return 0;
+}
+
+static int
+core_clear(AmountObject *self)
+{
+    Py_CLEAR(self->currency);
+    Py_CLEAR(self->value);
+    return 0;
+}
+
+static void
+core_dealloc(AmountObject *self)
+{
+    PyObject_GC_UnTrack(self);
+    core_clear(self);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+/* Arithmetic */
+
+static PyObject *
+binary_op(PyObject *self, PyObject *other, const char *verb, PyObject *(*op)(PyObject *, PyObject *))
+{
+    PyObject *currency, *other_currency, *value, *other_value, *result;
+    int is_amount, different;
+
+    if (!PyObject_TypeCheck(self, &AmountCoreType)) {
+        /* Amount has no reflected operators */
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+    if (check_ready() < 0) {
+        return NULL;
+    }
+    is_amount = PyObject_IsInstance(other, (PyObject *)amount_type);
+    if (is_amount <= 0) {
+        /* e.g. an AmountArray, which handles Amounts itself */
+        if (is_amount < 0) {
+            return NULL;
+        }
+        Py_RETURN_NOTIMPLEMENTED;
+    }
+    currency = GET_CURRENCY(self);
+    if (currency == NULL) {
+        return NULL;
+    }
+    if (other == zero) {
+        value = GET_VALUE(self);
+        result = value == NULL ? NULL : new_amount(currency, value);
+        Py_DECREF(currency);
+        return result;
+    }
+    other_currency = GET_CURRENCY(other);
+    if (other_currency == NULL) {
+        Py_DECREF(currency);
+        return NULL;
+    }
+    if (currency != other_currency) {
+        PyObject *compared = PyObject_RichCompare(currency, other_currency, Py_NE);
+        different = compared == NULL ? -1 : PyObject_IsTrue(compared);
+        Py_XDECREF(compared);
+        if (different != 0) {
+            if (different > 0) {
+                PyErr_Format(
+                    PyExc_ValueError, "You cannot %s amounts of different currencies (%S and %S)",
+                    verb, currency, other_currency
+                );
+            }
+            Py_DECREF(currency);
+            Py_DECREF(other_currency);
+            return NULL;
+        }
+    }
+    Py_DECREF(other_currency);
+    value = GET_VALUE(self);
+    other_value = value == NULL ? NULL : GET_VALUE(other);
+    if (other_value == NULL) {
+        Py_XDECREF(value);
+        Py_DECREF(currency);
+        return NULL;
+    }
+    result = new_amount(currency, op(value, other_value));
+    Py_DECREF(value);
+    Py_DECREF(other_value);
+    Py_DECREF(currency);
+    return result;
+}
+
+static PyObject *
+core_add(PyObject *self, PyObject *other)
+{
+    return binary_op(self, other, "add", PyNumber_Add);
+}
+
+static PyObject *
+core_subtract(PyObject *self, PyObject *other)
+{
+    return binary_op(self, other, "subtract", PyNumber_Subtract);
+}
+
+static int
+core_bool(PyObject *self)
+{
+    PyObject *value = GET_VALUE(self);
+    int result;
+    if (value == NULL) {
+        return -1;
+    }
+    result = PyObject_IsTrue(value);
+    Py_DECREF(value);
+    return result;
+}
+
+static Py_hash_t
+core_hash(PyObject *self)
+{
+    /* Every zero amount is equal to Amount.ZERO, so they share a hash */
+    PyObject *value, *currency, *key;
+    Py_hash_t result;
+    int nonzero;
+
+    value = GET_VALUE(self);
+    if (value == NULL) {
+        return -1;
+    }
+    nonzero = PyObject_IsTrue(value);
+    if (nonzero <= 0) {
+        Py_DECREF(value);
+        return nonzero;
+    }
+    currency = GET_CURRENCY(self);
+    if (currency == NULL) {
+        Py_DECREF(value);
+        return -1;
+    }
+    key = PyTuple_Pack(2, currency, value);
+    Py_DECREF(currency);
+    Py_DECREF(value);
+    if (key == NULL) {
+        return -1;
+    }
+    result = PyObject_Hash(key);
+    Py_DECREF(key);
+    return result;
+}
+
+/* Comparison */
+
+static PyObject *
+core_eq(PyObject *self, PyObject *other)
+{
+    PyObject *currency, *other_currency, *value, *other_value, *result;
+    int is_amount;
+
+    is_amount = PyObject_IsInstance(other, (PyObject *)amount_type);
+    if (is_amount < 0) {
+        return NULL;
+    }
+    if (!is_amount) {
+        Py_RETURN_FALSE;
+    }
+    if (other == zero) {
+        return PyObject_RichCompare(other, self, Py_EQ);
+    }
+    currency = GET_CURRENCY(self);
+    if (currency == NULL) {
+        return NULL;
+    }
+    other_currency = GET_CURRENCY(other);
+    if (other_currency == NULL) {
+        Py_DECREF(currency);
+        return NULL;
+    }
+    if (currency != other_currency) {
+        int same;
+        result = PyObject_RichCompare(currency, other_currency, Py_EQ);
+        same = result == NULL ? -1 : PyObject_IsTrue(result);
+        if (same <= 0) {
+            if (same < 0) {
+                Py_CLEAR(result);
+            }
+            Py_DECREF(currency);
+            Py_DECREF(other_currency);
+            return result;
+        }
+        Py_DECREF(result);
+    }
+    Py_DECREF(currency);
+    Py_DECREF(other_currency);
+    value = GET_VALUE(self);
+    other_value = value == NULL ? NULL : GET_VALUE(other);
+    if (other_value == NULL) {
+        Py_XDECREF(value);
+        return NULL;
+    }
+    result = PyObject_RichCompare(value, other_value, Py_EQ);
+    Py_DECREF(value);
+    Py_DECREF(other_value);
+    return result;
+}
+
+static PyObject *
+core_lt(PyObject *self, PyObject *other)
+{
+    PyObject *currency, *other_currency, *value, *other_value, *result;
+
+    if (other == zero) {
+        return PyObject_RichCompare(other, self, Py_GT);
+    }
+    currency = GET_CURRENCY(self);
+    if (currency == NULL) {
+        return NULL;
+    }
+    other_currency = GET_CURRENCY(other);
+    if (other_currency == NULL) {
+        Py_DECREF(currency);
+        return NULL;
+    }
+    if (currency != other_currency) {
+        PyObject *compared = PyObject_RichCompare(currency, other_currency, Py_NE);
+        int different = compared == NULL ? -1 : PyObject_IsTrue(compared);
+        Py_XDECREF(compared);
+        if (different != 0) {
+            if (different > 0) {
+                PyErr_Format(
+                    PyExc_ValueError, "You cannot compare amounts of different currencies (%S and %S)",
+                    currency, other_currency
+                );
+            }
+            Py_DECREF(currency);
+            Py_DECREF(other_currency);
+            return NULL;
+        }
+    }
+    Py_DECREF(currency);
+    Py_DECREF(other_currency);
+    value = GET_VALUE(self);
+    other_value = value == NULL ? NULL : GET_VALUE(other);
+    if (other_value == NULL) {
+        Py_XDECREF(value);
+        return NULL;
+    }
+    result = PyObject_RichCompare(value, other_value, Py_LT);
+    Py_DECREF(value);
+    Py_DECREF(other_value);
+    return result;
+}
+
+static PyObject *
+type_lt(PyObject *self, PyObject *other)
+{
+    /* type(self).__lt__(self, other), as functools.total_ordering calls it */
+    PyObject *method, *result;
+    if (Py_TYPE(self)->tp_richcompare == core_richcompare) {
+        return core_lt(self, other);
+    }
+    method = PyObject_GetAttr((PyObject *)Py_TYPE(self), str_lt);
+    if (method == NULL) {
+        return NULL;
+    }
+    result = PyObject_CallFunctionObjArgs(method, self, other, NULL);
+    Py_DECREF(method);
+    return result;
+}
+
+static PyObject *
+core_richcompare(PyObject *self, PyObject *other, int op)
+{
+    PyObject *result;
+    int truth;
+
+    if (check_ready() < 0) {
+        return NULL;
+    }
+    switch (op) {
+    case Py_EQ:
+        return core_eq(self, other);
+    case Py_NE:
+        /* not (self == other) */
+        result = PyObject_RichCompare(self, other, Py_EQ);
+        if (result == NULL) {
+            return NULL;
+        }
+        truth = PyObject_Not(result);
+        Py_DECREF(result);
+        if (truth < 0) {
+            return NULL;
+        }
+        return PyBool_FromLong(truth);
+    case Py_LT:
+        return core_lt(self, other);
+    default:
+        break;
+    }
+    /* The rest are derived from __lt__ as functools.total_ordering does */
+    result = type_lt(self, other);
+    if (result == NULL || result == Py_NotImplemented) {
+        return result;
+    }
+    truth = PyObject_IsTrue(result);
+    if (truth < 0) {
+        Py_DECREF(result);
+        return NULL;
+    }
+    switch (op) {
+    case Py_GT:
+        /* not (self < other) and self != other */
+        Py_DECREF(result);
+        if (truth) {
+            Py_RETURN_FALSE;
+        }
+        return PyObject_RichCompare(self, other, Py_NE);
+    case Py_LE:
+        /* (self < other) or self == other */
+        if (truth) {
+            return result;
+        }
+        Py_DECREF(result);
+        return PyObject_RichCompare(self, other, Py_EQ);
+    default:
+        /* Py_GE: not (self < other) */
+        Py_DECREF(result);
+        return PyBool_FromLong(!truth);
+    }
+}
+
+/* Minor/major conversion */
+
+static PyObject *
+minor_to_major(PyObject *currency, PyObject *value)
+{
+    /* Currency.minor_to_major(value), inlined for plain Currencies */
+    PyObject *divisor, *decimal, *result;
+
+    if ((PyObject *)Py_TYPE(currency) != currency_type) {
+        return PyObject_CallMethodObjArgs(currency, str_minor_to_major, value, NULL);
+    }
+    if (!PyLong_Check(value)) {
+        PyErr_SetString(PyExc_ValueError, "The value passed in must be either an integer or a long");
+        return NULL;
+    }
+    decimal = PyObject_CallFunctionObjArgs(decimal_type, value, NULL);
+    if (decimal == NULL) {
+        return NULL;
+    }
+    divisor = PyObject_GetAttr(currency, str_divisor);
+    if (divisor == NULL) {
+        Py_DECREF(decimal);
+        return NULL;
+    }
+    result = PyNumber_TrueDivide(decimal, divisor);
+    Py_DECREF(decimal);
+    Py_DECREF(divisor);
+    return result;
+}
+
+static PyObject *
+major_to_minor(PyObject *currency, PyObject *value, PyObject *force_round)
+{
+    /* Currency.major_to_minor(value, force_round=force_round), inlined for
+     * plain Currencies */
+    PyObject *divisor, *minor, *integral, *result;
+    int is_decimal, rounding, different;
+
+    if ((PyObject *)Py_TYPE(currency) != currency_type) {
+        PyObject *method, *args, *kwargs;
+        method = PyObject_GetAttr(currency, str_major_to_minor);
+        if (method == NULL) {
+            return NULL;
+        }
+        args = PyTuple_Pack(1, value);
+        kwargs = args == NULL ? NULL : PyDict_New();
+        if (kwargs == NULL || PyDict_SetItem(kwargs, str_force_round, force_round) < 0) {
+            Py_DECREF(method);
+            Py_XDECREF(args);
+            Py_XDECREF(kwargs);
+            return NULL;
+        }
+        result = PyObject_Call(method, args, kwargs);
+        Py_DECREF(method);
+        Py_DECREF(args);
+        Py_DECREF(kwargs);
+        return result;
+    }
+    is_decimal = PyLong_Check(value) ? 1 : PyObject_IsInstance(value, decimal_type);
+    if (is_decimal < 0) {
+        return NULL;
+    }
+    if (!is_decimal) {
+        PyErr_SetString(PyExc_ValueError, "The value passed in must be either an integer, a long or a decimal.");
+        return NULL;
+    }
+    divisor = PyObject_GetAttr(currency, str_divisor);
+    if (divisor == NULL) {
+        return NULL;
+    }
+    minor = PyNumber_Multiply(value, divisor);
+    Py_DECREF(divisor);
+    if (minor == NULL) {
+        return NULL;
+    }
+    rounding = PyObject_IsTrue(force_round);
+    if (rounding < 0) {
+        Py_DECREF(minor);
+        return NULL;
+    }
+    if (rounding) {
+        PyObject *rounded = PyObject_CallFunctionObjArgs(round_function, minor, NULL);
+        Py_DECREF(minor);
+        if (rounded == NULL) {
+            return NULL;
+        }
+        minor = PyNumber_Long(rounded);
+        Py_DECREF(rounded);
+        if (minor == NULL) {
+            return NULL;
+        }
+    }
+    integral = PyNumber_Long(minor);
+    if (integral == NULL) {
+        Py_DECREF(minor);
+        return NULL;
+    }
+    result = PyObject_RichCompare(minor, integral, Py_NE);
+    Py_DECREF(minor);
+    different = result == NULL ? -1 : PyObject_IsTrue(result);
+    Py_XDECREF(result);
+    if (different != 0) {
+        if (different > 0) {
+            PyErr_Format(
+                PyExc_ValueError,
+                "Cannot convert major amount %R to minor amount; would result in fractional amount of minor unit",
+                value
+            );
+        }
+        Py_DECREF(integral);
+        return NULL;
+    }
+    return integral;
+}
+
+static PyObject *
+core_to_major_decimal(PyObject *self, PyObject *unused)
+{
+    PyObject *currency, *value, *result;
+    if (check_ready() < 0) {
+        return NULL;
+    }
+    currency = GET_CURRENCY(self);
+    if (currency == NULL) {
+        return NULL;
+    }
+    value = GET_VALUE(self);
+    if (value == NULL) {
+        Py_DECREF(currency);
+        return NULL;
+    }
+    result = minor_to_major(currency, value);
+    Py_DECREF(currency);
+    Py_DECREF(value);
+    return result;
+}
+
+static PyObject *
+core_from_code_and_major(PyObject *cls, PyObject *args, PyObject *kwargs)
+{
+    static char *keywords[] = {"currency_code", "value", "force_round", NULL};
+    PyObject *code, *value, *force_round = Py_False;
+    PyObject *currency, *decimal, *minor, *result = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO|O:from_code_and_major", keywords, &code, &value, &force_round)) {
+        return NULL;
+    }
+    if (check_ready() < 0) {
+        return NULL;
+    }
+    currency = PyObject_CallFunctionObjArgs(get_currency, code, NULL);
+    if (currency == NULL) {
+        return NULL;
+    }
+    decimal = PyObject_CallFunctionObjArgs(decimal_type, value, NULL);
+    if (decimal != NULL) {
+        minor = major_to_minor(currency, decimal, force_round);
+        Py_DECREF(decimal);
+        if (minor != NULL) {
+            result = PyObject_CallFunctionObjArgs(cls, currency, minor, NULL);
+            Py_DECREF(minor);
+        }
+    }
+    Py_DECREF(currency);
+    if (result == NULL && PyErr_ExceptionMatches(invalid_operation)) {
+        /* raise ValueError(...) from inside "except InvalidOperation:" */
+        PyObject *type, *cause, *traceback, *error_type, *error, *error_traceback;
+        PyErr_Fetch(&type, &cause, &traceback);
+        PyErr_NormalizeException(&type, &cause, &traceback);
+        if (traceback != NULL) {
+            PyException_SetTraceback(cause, traceback);
+        }
+        PyErr_Format(PyExc_ValueError, "Invalid currency value %S", value);
+        PyErr_Fetch(&error_type, &error, &error_traceback);
+        PyErr_NormalizeException(&error_type, &error, &error_traceback);
+        PyException_SetContext(error, cause);
+        PyErr_Restore(error_type, error, error_traceback);
+        Py_DECREF(type);
+        Py_XDECREF(traceback);
+    }
+    return result;
+}
+
+/* Module */
+
+static PyObject *
+speedups_setup(PyObject *module, PyObject *args)
+{
+    PyObject *amount, *zero_amount, *currency, *get_currency_function;
+    if (!PyArg_ParseTuple(args, "O!OOO:setup", &PyType_Type, &amount, &zero_amount, &currency, &get_currency_function)) {
+        return NULL;
+    }
+    if (!PyType_IsSubtype((PyTypeObject *)amount, &AmountCoreType)) {
+        PyErr_SetString(PyExc_TypeError, "Amount must be a subclass of AmountCore");
+        return NULL;
+    }
+    Py_INCREF(amount);
+    Py_XSETREF(amount_type, (PyTypeObject *)amount);
+    Py_INCREF(zero_amount);
+    Py_XSETREF(zero, zero_amount);
+    Py_INCREF(currency);
+    Py_XSETREF(currency_type, currency);
+    Py_INCREF(get_currency_function);
+    Py_XSETREF(get_currency, get_currency_function);
+    Py_RETURN_NONE;
+}
+
+static PyMemberDef core_members[] = {
+    {"currency", T_OBJECT_EX, offsetof(AmountObject, currency), 0, NULL},
+    {"value", T_OBJECT_EX, offsetof(AmountObject, value), 0, NULL},
+    {NULL}
+};
+
+static PyMethodDef core_methods[] = {
+    {"to_major_decimal", (PyCFunction)core_to_major_decimal, METH_NOARGS,
+     "Returns our value as a Decimal of major units"},
+    {"from_code_and_major", (PyCFunction)(void (*)(void))core_from_code_and_major,
+     METH_VARARGS | METH_KEYWORDS | METH_CLASS,
+     "Initialises the amount with a currency code and a value\n"
+     "in the major unit (e.g. \"1.43\", Decimal(\"1.43\"), 10)"},
+    {NULL}
+};
+
+static PyNumberMethods core_as_number = {
+    core_add,               /* nb_add */
+    core_subtract,          /* nb_subtract */
+    0,                      /* nb_multiply */
+    0,                      /* nb_remainder */
+    0,                      /* nb_divmod */
+    0,                      /* nb_power */
+    0,                      /* nb_negative */
+    0,                      /* nb_positive */
+    0,                      /* nb_absolute */
+    core_bool,              /* nb_bool */
+};
+
+static PyTypeObject AmountCoreType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "currint._speedups.AmountCore",
+    sizeof(AmountObject),
+};
+
+static PyMethodDef speedups_methods[] = {
+    {"setup", speedups_setup, METH_VARARGS,
+     "setup(Amount, Amount.ZERO, Currency, get_currency)\n\n"
+     "Tells the extension the classes and functions it builds results with."},
+    {NULL}
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "currint._speedups",
+    "Compiled core for currint.amount.Amount",
+    -1,
+    speedups_methods,
+};
+
+#define INTERN(variable, text) \
+    if ((variable = PyUnicode_InternFromString(text)) == NULL) return NULL;
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    PyObject *module, *decimal, *builtins;
+
+    INTERN(str_currency, "currency");
+    INTERN(str_value, "value");
+    INTERN(str_divisor, "divisor");
+    INTERN(str_lt, "__lt__");
+    INTERN(str_major_to_minor, "major_to_minor");
+    INTERN(str_minor_to_major, "minor_to_major");
+    INTERN(str_force_round, "force_round");
+
+    decimal = PyImport_ImportModule("decimal");
+    if (decimal == NULL) {
+        return NULL;
+    }
+    decimal_type = PyObject_GetAttrString(decimal, "Decimal");
+    invalid_operation = PyObject_GetAttrString(decimal, "InvalidOperation");
+    Py_DECREF(decimal);
+    if (decimal_type == NULL || invalid_operation == NULL) {
+        return NULL;
+    }
+    builtins = PyImport_ImportModule("builtins");
+    if (builtins == NULL) {
+        return NULL;
+    }
+    round_function = PyObject_GetAttrString(builtins, "round");
+    Py_DECREF(builtins);
+    if (round_function == NULL) {
+        return NULL;
+    }
+
+    AmountCoreType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC;
+    AmountCoreType.tp_doc = "Slots, arithmetic and comparison for Amount";
+    /* object.__new__, so object.__new__(Amount) keeps working */
+    AmountCoreType.tp_new = PyBaseObject_Type.tp_new;
+    AmountCoreType.tp_dealloc = (destructor)core_dealloc;
+    AmountCoreType.tp_traverse = (traverseproc)core_traverse;
+    AmountCoreType.tp_clear = (inquiry)core_clear;
+    AmountCoreType.tp_as_number = &core_as_number;
+    AmountCoreType.tp_richcompare = core_richcompare;
+    AmountCoreType.tp_hash = core_hash;
+    AmountCoreType.tp_members = core_members;
+    AmountCoreType.tp_methods = core_methods;
+    if (PyType_Ready(&AmountCoreType) < 0) {
+        return NULL;
+    }
+
+    module = PyModule_Create(&speedups_module);
+    if (module == NULL) {
+        return NULL;
+    }
+    Py_INCREF(&AmountCoreType);
+    if (PyModule_AddObject(module, "AmountCore", (PyObject *)&AmountCoreType) < 0) {
+        Py_DECREF(&AmountCoreType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
+}
@@ -0,0 +1,92 @@
+import six
+from decimal import Decimal
+
+
+def normalise_weights(weights):
+    """
+    Converts a sequence of non-negative integer or Decimal weights into
+    integers with the same ratios, returning (integer weights, total).
+    """
+    weights = list(weights)
+    if not weights:
+        raise ValueError("You must provide at least one weight")
+    for weight in weights:
+        if not isinstance(weight, six.integer_types + (Decimal, )):
+            raise ValueError("You can only allocate by integer, long or Decimal weights")
+        if isinstance(weight, Decimal) and not weight.is_finite():
+            raise ValueError("Weights must be finite")
+        if weight < 0:
+            raise ValueError("Weights cannot be negative")
+    if not all(isinstance(weight, six.integer_types) for weight in weights):
+        # Scale every weight by the same power of ten to make them integers
+        places = 0
+        for weight in weights:
+            if isinstance(weight, Decimal):
+                places = max(places, -weight.as_tuple().exponent)
+        weights = [_scale(weight, places) for weight in weights]
+    total = sum(weights)
+    if not total:
+        raise ValueError("At least one weight must be non-zero")
+    return weights, total
+
+
+def _scale(weight, places):
+    """
+    Returns weight * 10 ** places as an exact integer.
+    """
+    if isinstance(weight, six.integer_types):
+        return weight * 10 ** places
+    sign, digits, exponent = weight.as_tuple()
+    value = 0
+    for digit in digits:
+        value = value * 10 + digit
+    return value * 10 ** (exponent + places)
+
+
+def allocate_minor(value, weights, total):
+    """
+    Splits an integer value into parts proportional to the (normalised)
+    integer weights, using the largest remainder method: every part is
+    rounded towards zero, then the leftover units go to the parts with the
+    largest remainders, earlier parts winning ties.
+
+    Negative values are allocated as the mirror image of positive ones.
+    """
+    if value < 0:
+        return [-part for part in allocate_minor(-value, weights, total)]
+    parts = []
+    remainders = []
+    for weight in weights:
+        part, remainder = divmod(value * weight, total)
+        parts.append(part)
+        remainders.append(remainder)
+    leftover = value - sum(parts)
+    if leftover:
+        # There are always at least `leftover` non-zero remainders, so
+        # zero-weighted parts never receive anything.
+        order = sorted(range(len(parts)), key=remainders.__getitem__, reverse=True)
+        for index in order[:leftover]:
+            parts[index] += 1
+    return parts
+
+
+def split_minor(value, count):
+    """
+    Splits an integer value into `count` parts that differ by at most one
+    unit, with the larger parts first (allocate_minor with equal weights).
+    """
+    if not isinstance(count, six.integer_types) or count < 1:
+        raise ValueError("You can only split into a positive integer number of parts")
+    if value < 0:
+        return [-part for part in split_minor(-value, count)]
+    part, leftover = divmod(value, count)
+    return [part + 1] * leftover + [part] * (count - leftover)
+
+
+def allocate_minor_many(values, weights):
+    """
+    Allocates every integer in `values` against the same weights, which are
+    normalised once. Returns a list of parts for each value.
+    """
+    weights, total = normalise_weights(weights)
+    return [allocate_minor(value, weights, total) for value in values]
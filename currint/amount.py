@@ -1,36 +1,33 @@
+import os
 import six
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 from functools import total_ordering
+from .allocation import allocate_minor, allocate_minor_many, normalise_weights, split_minor
+from .currency import Currency, currency_for_numeric, get_currency
+from .rate import Rate
+
+# The compiled core (see _speedups.c), unless it isn't built or
+# CURRINT_PURE_PYTHON is set in the environment
+if os.environ.get("CURRINT_PURE_PYTHON"):
+    _speedups = None
+else:
+    try:
+        from . import _speedups
+    except ImportError:
+        _speedups = None
+
+_new = object.__new__
 
 
 @total_ordering
-@six.python_2_unicode_compatible
-class Amount(object):
+class _AmountCore(object):
     """
-    An amount of a currency.
+    The slots, arithmetic, comparison and minor/major conversion of Amount.
+    When it is built, currint._speedups.AmountCore is used instead; it has
+    exactly the same semantics.
     """
 
-    def __init__(self, currency, value):
-        """
-        Initialises the Amount with a Currency object and an
-        integer value of its minor unit (i.e. cents for USD)
-        """
-        assert isinstance(value, six.integer_types)
-        assert not isinstance(currency, six.string_types)
-        self.currency = currency
-        self.value = value
-
-    @classmethod
-    def from_code_and_minor(cls, currency_code, value):
-        """
-        Initialises the amount with a currency code and an integer value
-        of minor units
-        """
-        from .currency import currencies
-        try:
-            return cls(currencies[currency_code.upper()], value)
-        except KeyError:
-            raise ValueError("Invalid currency code %s" % currency_code)
+    __slots__ = ("currency", "value")
 
     @classmethod
     def from_code_and_major(cls, currency_code, value, force_round=False):
@@ -38,49 +35,52 @@ class Amount(object):
         Initialises the amount with a currency code and a value
         in the major unit (e.g. "1.43", Decimal("1.43"), 10)
         """
-        from .currency import currencies
+        currency = get_currency(currency_code)
         try:
-            currency = currencies[currency_code.upper()]
             return cls(currency, currency.major_to_minor(Decimal(value), force_round=force_round))
-        except KeyError:
-            raise ValueError("Invalid currency code %s" % currency_code)
         except InvalidOperation:
             raise ValueError("Invalid currency value %s" % value)
 
-    def __str__(self):
-        return self.currency.format(self.value)
-
-    def __repr__(self):
-        return "<Amount %s, %s>" % (self.currency, self.value)
-
     def __eq__(self, other):
         if not isinstance(other, Amount):
             return False
         if other is _ZeroAmount.instance:
             return other == self
-        return (self.currency == other.currency) and (self.value == other.value)
+        return (self.currency is other.currency or self.currency == other.currency) and (self.value == other.value)
 
     def __ne__(self, other):
         return not (self == other)
 
+    def __hash__(self):
+        # Every zero amount is equal to Amount.ZERO, whatever its currency,
+        # so they all have to share a hash.
+        if not self.value:
+            return 0
+        return hash((self.currency, self.value))
+
     def __add__(self, other):
+        if not isinstance(other, Amount):
+            # e.g. an AmountArray, which handles Amounts itself
+            return NotImplemented
         if other is _ZeroAmount.instance:
-            return Amount(self.currency, self.value)
-        if self.currency != other.currency:
+            return Amount._from_trusted(self.currency, self.value)
+        if self.currency is not other.currency and self.currency != other.currency:
             raise ValueError("You cannot add amounts of different currencies (%s and %s)" % (self.currency, other.currency))
-        return Amount(self.currency, self.value + other.value)
+        return Amount._from_trusted(self.currency, self.value + other.value)
 
     def __sub__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
         if other is _ZeroAmount.instance:
-            return Amount(self.currency, self.value)
-        if self.currency != other.currency:
+            return Amount._from_trusted(self.currency, self.value)
+        if self.currency is not other.currency and self.currency != other.currency:
             raise ValueError("You cannot subtract amounts of different currencies (%s and %s)" % (self.currency, other.currency))
-        return Amount(self.currency, self.value - other.value)
+        return Amount._from_trusted(self.currency, self.value - other.value)
 
     def __lt__(self, other):
         if other is _ZeroAmount.instance:
             return other > self
-        if self.currency != other.currency:
+        if self.currency is not other.currency and self.currency != other.currency:
             raise ValueError("You cannot compare amounts of different currencies (%s and %s)" % (self.currency, other.currency))
         return self.value < other.value
 
@@ -90,23 +90,148 @@ class Amount(object):
     def __bool__(self):
         return self.__nonzero__()
 
+    def to_major_decimal(self):
+        "Returns our value as a Decimal of major units"
+        return self.currency.minor_to_major(self.value)
+
+
+if _speedups is not None:
+    _AmountCore = _speedups.AmountCore  # noqa
+
+
+@six.python_2_unicode_compatible
+class Amount(_AmountCore):
+    """
+    An amount of a currency.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, currency, value):
+        """
+        Initialises the Amount with a Currency object and an
+        integer value of its minor unit (i.e. cents for USD)
+        """
+        assert isinstance(value, six.integer_types)
+        assert not isinstance(currency, six.string_types)
+        self.currency = currency
+        self.value = value
+
+    @classmethod
+    def from_code_and_minor(cls, currency_code, value):
+        """
+        Initialises the amount with a currency code and an integer value
+        of minor units
+        """
+        return cls(get_currency(currency_code), value)
+
+    @classmethod
+    def from_numeric_and_minor(cls, numeric_code, value):
+        """
+        Initialises the amount with an ISO 4217 numeric currency code (e.g.
+        826 or "826") and an integer value of minor units
+        """
+        return cls(currency_for_numeric(numeric_code), value)
+
+    def __reduce_ex__(self, protocol):
+        # An Amount of a registry currency pickles as just (code, value)
+        if type(self) is Amount:
+            currency = self.currency
+            if get_currency(currency.code, None) is currency:
+                return (_unpickle_amount, (currency.code, self.value))
+            return (_unpickle_amount, (currency, self.value))
+        # Protocols 0 and 1 would rebuild subclasses by calling their first
+        # non-Python base class, which may be the compiled core
+        return super(Amount, self).__reduce_ex__(max(protocol, 2))
+
+    def __copy__(self):
+        return self._from_trusted(self.currency, self.value)
+
+    def __deepcopy__(self, memo):
+        # Only reached via copy.deepcopy, so importing it here is free
+        from copy import deepcopy
+        return self._from_trusted(deepcopy(self.currency, memo), self.value)
+
+    def __getstate__(self):
+        return {"currency": self.currency, "value": self.value}
+
+    def __setstate__(self, state):
+        self.currency = state["currency"]
+        self.value = state["value"]
+
+    @classmethod
+    def from_minor_many(cls, currency_code, values):
+        """
+        Returns a list of Amounts of a single currency from an iterable of
+        integer values of minor units.
+
+        The currency is resolved once, and the values are not type checked;
+        this is intended for bulk loading trusted data (e.g. integer columns
+        from our own database).
+        """
+        currency = get_currency(currency_code)
+        amounts = []
+        append = amounts.append
+        for value in values:
+            amount = _new(cls)
+            amount.currency = currency
+            amount.value = value
+            append(amount)
+        return amounts
+
+    @classmethod
+    def _from_trusted(cls, currency, value):
+        """
+        Initialises the Amount without validating its arguments. Callers must
+        guarantee that currency is a Currency and value an integer.
+        """
+        amount = _new(cls)
+        amount.currency = currency
+        amount.value = value
+        return amount
+
+    def __str__(self):
+        return self.currency.format(self.value)
+
+    def __repr__(self):
+        return "<Amount %s, %s>" % (self.currency, self.value)
+
     def apply_factor(self, other):
+        if isinstance(other, Rate):
+            return Amount._from_trusted(self.currency, other.apply(self.value))
         if not isinstance(other, six.integer_types + (Decimal, )):
-            raise ValueError("You can only apply an integer, long or Decimal factor to an Amount")
+            raise ValueError("You can only apply an integer, long, Decimal or Rate factor to an Amount")
         return Amount(
             self.currency,
             int(Decimal(self.value * other).to_integral(ROUND_HALF_UP)),
         )
 
-    def convert_currency(self, new_code, rate):
+    def convert_currency(self, new_code, rate, major=False):
         """
         Converts this Amount into an Amount of another currency at the given rate
 
         Rate is the number of new currency for each unit of the old -
-        new = old * rate. Rate can be a float or a Decimal.
+        new = old * rate. Rate can be a float, a Decimal, or a Rate (which
+        converts using integer arithmetic only).
+
+        By default the rate applies to minor units directly. If major is
+        True, the rate is between major units instead (e.g. 150 for USD to
+        JPY), and the currencies' differing minor units are accounted for
+        with integer scaling; the rate must then be an integer, Decimal,
+        string or Rate.
         """
+        if major:
+            new_currency = get_currency(new_code)
+            rate = Rate(rate)
+            if self is _ZeroAmount.instance:
+                # No minor units to scale from, but zero is zero in any currency
+                return Amount._from_trusted(new_currency, 0)
+            rate = rate.minor_rate(self.currency, new_currency)
+            return Amount._from_trusted(new_currency, rate.apply(self.value))
+        if isinstance(rate, Rate):
+            return Amount.from_code_and_minor(new_code, rate.apply(self.value))
         if not isinstance(rate, six.integer_types + (float, Decimal)):
-            raise ValueError("You can only apply an integer, long, float or Decimal factor to an Amount")
+            raise ValueError("You can only apply an integer, long, float, Decimal or Rate factor to an Amount")
         return Amount.from_code_and_minor(
             new_code,
             int(Decimal(self.value * rate).to_integral(ROUND_HALF_UP)),
@@ -119,10 +244,21 @@ class Amount(object):
         """
         if not isinstance(divisor, six.integer_types):
             raise ValueError("You can only divide by an integer or a long.")
-        new_value = self.value / float(divisor)
-        if int(new_value) != new_value:
+        quotient, remainder = divmod(self.value, divisor)
+        if remainder:
             raise ValueError("Amount not exactly divisible by provided divisor")
-        return Amount(self.currency, int(new_value))
+        return Amount._from_trusted(self.currency, quotient)
+
+    def __divmod__(self, divisor):
+        """
+        Divides the value through by the integer provided, returning
+        (quotient, remainder) Amounts with the same semantics as divmod()
+        on integers: quotient * divisor + remainder == self.
+        """
+        if not isinstance(divisor, six.integer_types):
+            raise ValueError("You can only divide by an integer or a long.")
+        quotient, remainder = divmod(self.value, divisor)
+        return Amount._from_trusted(self.currency, quotient), Amount._from_trusted(self.currency, remainder)
 
     def divide_and_round(self, divisor, mode=ROUND_HALF_UP):
         """
@@ -135,9 +271,40 @@ class Amount(object):
             self.currency, int((Decimal(self.value) / Decimal(divisor)).to_integral_exact(mode))
         )
 
-    def to_major_decimal(self):
-        "Returns our value as a Decimal of major units"
-        return self.currency.minor_to_major(self.value)
+    def allocate(self, weights):
+        """
+        Splits the Amount into parts proportional to the given integer or
+        Decimal weights. The parts always add up to exactly this Amount;
+        leftover minor units go to the parts with the largest remainders.
+        """
+        weights, total = normalise_weights(weights)
+        currency = self.currency
+        return [Amount._from_trusted(currency, part) for part in allocate_minor(self.value, weights, total)]
+
+    def split(self, count):
+        """
+        Splits the Amount into `count` parts that differ by at most one
+        minor unit and add up to exactly this Amount.
+        """
+        currency = self.currency
+        return [Amount._from_trusted(currency, part) for part in split_minor(self.value, count)]
+
+    @classmethod
+    def allocate_many(cls, amounts, weights):
+        """
+        Allocates every Amount in an iterable against the same weights
+        (see allocate), normalising the weights only once. Returns a list
+        of parts for each Amount.
+        """
+        amounts = list(amounts)
+        results = []
+        for amount, parts in zip(amounts, allocate_minor_many((amount.value for amount in amounts), weights)):
+            if amount is _ZeroAmount.instance:
+                results.append([amount] * len(parts))
+            else:
+                currency = amount.currency
+                results.append([Amount._from_trusted(currency, part) for part in parts])
+        return results
 
 
 @six.python_2_unicode_compatible
@@ -148,6 +315,8 @@ class _ZeroAmount(Amount):
     It can be used as the start of a sum() operation when you don't know the
     currency involved (yet).
     """
+    __slots__ = ()
+
     instance = None
 
     def __init__(self):
@@ -162,11 +331,15 @@ class _ZeroAmount(Amount):
         return cls.instance
 
     def __add__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
         if other is _ZeroAmount.instance:
             return self
         return Amount(other.currency, other.value)
 
     def __sub__(self, other):
+        if not isinstance(other, Amount):
+            return NotImplemented
         if other is _ZeroAmount.instance:
             return self
         return Amount(other.currency, -other.value)
@@ -176,12 +349,30 @@ class _ZeroAmount(Amount):
             return False
         return self.value == other.value
 
+    __hash__ = Amount.__hash__
+
     def __lt__(self, other):
         return self.value < other.value
 
+    def __divmod__(self, divisor):
+        if not isinstance(divisor, six.integer_types):
+            raise ValueError("You can only divide by an integer or a long.")
+        if not divisor:
+            raise ZeroDivisionError("integer division or modulo by zero")
+        return self, self
+
     def __str__(self):
         return six.text_type(self.value)
 
+    def __reduce_ex__(self, protocol):
+        return (_ZeroAmount, ())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __nonzero__(self):
         return False
 
@@ -196,8 +387,85 @@ class _ZeroAmount(Amount):
     def from_code_and_major(cls, currency_code, value):
         raise NotImplementedError
 
+    @classmethod
+    def from_numeric_and_minor(cls, numeric_code, value):
+        raise NotImplementedError
+
+    @classmethod
+    def from_minor_many(cls, currency_code, values):
+        raise NotImplementedError
+
+    def allocate(self, weights):
+        return [self] * len(normalise_weights(weights)[0])
+
+    def split(self, count):
+        return [self] * len(split_minor(0, count))
+
     def to_major_decimal(self):
         return Decimal(self.value)
 
 
 Amount.ZERO = _ZeroAmount()
+
+if _speedups is not None:
+    _speedups.setup(Amount, Amount.ZERO, Currency, get_currency)
+
+
+def _unpickle_amount(currency, value):
+    """
+    Rebuilds a pickled Amount; currency is a Currency, or the code of a
+    registry currency.
+    """
+    amount = _new(Amount)
+    amount.currency = get_currency(currency) if isinstance(currency, six.string_types) else currency
+    amount.value = value
+    return amount
+
+
+def total(amounts):
+    """
+    Adds up an iterable of Amounts of a single currency. Equivalent to
+    sum(amounts, Amount.ZERO), but accumulates a plain integer rather than
+    creating an Amount at every step.
+
+    Returns Amount.ZERO if there are no (non-ZERO) amounts.
+    """
+    zero = _ZeroAmount.instance
+    currency = None
+    value = 0
+    for amount in amounts:
+        if amount is zero:
+            continue
+        if currency is None:
+            currency = amount.currency
+        elif amount.currency is not currency and amount.currency != currency:
+            raise ValueError("You cannot add amounts of different currencies (%s and %s)" % (currency, amount.currency))
+        value += amount.value
+    if currency is None:
+        return zero
+    return Amount._from_trusted(currency, value)
+
+
+def totals_by_currency(amounts):
+    """
+    Adds up an iterable of Amounts of any currencies, returning a dict of
+    currency code to the total Amount of that currency.
+    """
+    zero = _ZeroAmount.instance
+    sums = {}
+    currencies_by_code = {}
+    get = sums.get
+    for amount in amounts:
+        if amount is zero:
+            continue
+        code = amount.currency.code
+        value = get(code)
+        if value is None:
+            currencies_by_code[code] = amount.currency
+            sums[code] = amount.value
+        else:
+            sums[code] = value + amount.value
+    return dict(
+        (code, Amount._from_trusted(currencies_by_code[code], value))
+        for code, value in sums.items()
+    )
@@ -0,0 +1,611 @@
+from __future__ import absolute_import
+import array
+import operator
+import six
+from decimal import Decimal, ROUND_HALF_UP
+from .allocation import allocate_minor, normalise_weights
+from .amount import Amount, _ZeroAmount
+from .currency import (
+    _numeric_tables, _parse_numeric, codes_by_numeric, currencies, currency_codes, currency_indices, get_currency,
+)
+from .rate import Rate
+
+# NumPy takes several times longer to import than the rest of currint, so
+# it's only imported when an array first needs it; see _numpy()
+numpy = _NOT_LOADED = object()
+
+
+INT64_MAX = 2 ** 63 - 1
+
+# The array.array typecode for 64-bit integers. Python 2 has no "q", but
+# its "l" is 64 bits wide except on Windows, where there is no such
+# typecode and array.array storage isn't available.
+if six.PY3:
+    INT64_TYPECODE = "q"
+elif array.array("l").itemsize == 8:
+    INT64_TYPECODE = "l"
+else:  # pragma: no cover
+    INT64_TYPECODE = None
+
+
+def _numpy():
+    """
+    Returns the numpy module, importing it on first use, or None if it
+    isn't installed.
+    """
+    global numpy
+    if numpy is _NOT_LOADED:
+        try:
+            import numpy as module
+        except ImportError:  # pragma: no cover
+            module = None
+        numpy = module
+    return numpy
+
+
+def _as_buffer(values):
+    """
+    Turns an iterable of minor unit integers into our storage type; a
+    NumPy int64 array if NumPy is available, otherwise an array.array.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        if isinstance(values, numpy.ndarray):
+            if values.dtype.kind not in "iu":
+                raise ValueError("Values must be integers")
+            if values.dtype.kind == "u" and values.dtype.itemsize >= 8 and len(values) and int(values.max()) > INT64_MAX:
+                # astype would wrap these around to negative values
+                raise OverflowError("Values do not fit in 64-bit minor unit values")
+            return values.astype(numpy.int64, copy=False)
+        return numpy.array(_as_buffer_fallback(values), dtype=numpy.int64)
+    return _as_buffer_fallback(values)
+
+
+def _as_buffer_fallback(values):
+    if isinstance(values, (array.array, memoryview)) and _typecode(values) == INT64_TYPECODE:
+        # Memoryviews (e.g. over a memory-mapped file) are used as they are
+        return values
+    values = list(values)
+    for value in values:
+        if not isinstance(value, six.integer_types):
+            raise ValueError("Values must be integers")
+    return _int64_array(values)
+
+
+def _int64_array(values=()):
+    "Returns an array.array of 64-bit integers"
+    if INT64_TYPECODE is None:  # pragma: no cover
+        raise NotImplementedError("64-bit integer arrays need NumPy on this platform")
+    return array.array(INT64_TYPECODE, values)
+
+
+def _typecode(buffer):
+    "Returns the item type of an array.array or memoryview"
+    if isinstance(buffer, memoryview):
+        return buffer.format
+    return buffer.typecode
+
+
+def _tolist(values):
+    """
+    Returns the buffer as a list of Python integers.
+    """
+    return values.tolist()
+
+
+def _checked_add(left, right, subtract=False):
+    """
+    Adds (or subtracts) two buffers elementwise, raising OverflowError
+    rather than silently wrapping around.
+    """
+    numpy = _numpy()
+    if numpy is not None and isinstance(left, numpy.ndarray):
+        right = numpy.asarray(right, dtype=numpy.int64)
+        if subtract:
+            result = left - right
+            # Overflow happened if the operands differ in sign and the result
+            # does not have the sign of the left operand
+            overflowed = ((left ^ right) & (left ^ result)) < 0
+        else:
+            result = left + right
+            # Overflow happened if the result differs in sign from both operands
+            overflowed = ((left ^ result) & (right ^ result)) < 0
+        if overflowed.any():
+            raise OverflowError("Result does not fit in a 64-bit minor unit value")
+        return result
+    op = operator.sub if subtract else operator.add
+    return _int64_array(map(op, left, right))
+
+
+def _safe_sum(values):
+    """
+    Sums a buffer exactly, falling back to Python integers if the NumPy
+    int64 accumulator could overflow.
+    """
+    numpy = _numpy()
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        if not len(values):
+            return 0
+        bound = max(int(values.max()), -int(values.min()))
+        if bound * len(values) <= INT64_MAX:
+            return int(values.sum())
+    return sum(_tolist(values))
+
+
+class AmountArray(object):
+    """
+    A column of amounts that all share a single currency.
+
+    Values are held as a contiguous buffer of 64-bit minor unit integers
+    (a NumPy array if it's installed, otherwise an array.array), so
+    currency checks happen once per array rather than once per element.
+    """
+
+    def __init__(self, currency, values):
+        """
+        Initialises the array with a Currency object and an iterable
+        of integer values of its minor unit.
+        """
+        assert not isinstance(currency, six.string_types)
+        self.currency = currency
+        self.values = _as_buffer(values)
+
+    @classmethod
+    def from_code_and_minor(cls, currency_code, values):
+        """
+        Initialises the array with a currency code and integer values
+        of minor units
+        """
+        return cls(get_currency(currency_code), values)
+
+    @classmethod
+    def from_amounts(cls, amounts, currency=None):
+        """
+        Builds an array out of Amount objects, which must all be of the same
+        currency. Amount.ZERO entries are allowed and count as zero.
+
+        If the iterable is empty, `currency` must be provided.
+        """
+        values = []
+        for amount in amounts:
+            if amount is _ZeroAmount.instance:
+                values.append(0)
+                continue
+            if currency is None:
+                currency = amount.currency
+            elif amount.currency != currency:
+                raise ValueError(
+                    "You cannot mix amounts of different currencies (%s and %s)" % (currency, amount.currency)
+                )
+            values.append(amount.value)
+        if currency is None:
+            raise ValueError("You must provide a currency for an empty array")
+        return cls(currency, values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        currency = self.currency
+        for value in _tolist(self.values):
+            yield Amount(currency, value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(self.currency, self.values[index])
+        return Amount(self.currency, int(self.values[index]))
+
+    def __repr__(self):
+        return "<AmountArray %s, %s values>" % (self.currency, len(self))
+
+    def __eq__(self, other):
+        if not isinstance(other, AmountArray):
+            return False
+        return self.currency == other.currency and _tolist(self.values) == _tolist(other.values)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def tolist(self):
+        "Returns the minor unit values as a list of integers"
+        return _tolist(self.values)
+
+    def _other_values(self, other, verb):
+        """
+        Checks `other` is an AmountArray or Amount of our currency, and
+        returns something that can be combined elementwise with our values.
+        """
+        if isinstance(other, AmountArray):
+            if self.currency != other.currency:
+                raise ValueError(
+                    "You cannot %s amounts of different currencies (%s and %s)" % (verb, self.currency, other.currency)
+                )
+            if len(self) != len(other):
+                raise ValueError("You cannot %s arrays of different lengths (%s and %s)" % (verb, len(self), len(other)))
+            return other.values
+        if other is _ZeroAmount.instance:
+            return [0] * len(self)
+        if isinstance(other, Amount):
+            if self.currency != other.currency:
+                raise ValueError(
+                    "You cannot %s amounts of different currencies (%s and %s)" % (verb, self.currency, other.currency)
+                )
+            return [other.value] * len(self)
+        return NotImplemented
+
+    def __add__(self, other):
+        values = self._other_values(other, "add")
+        if values is NotImplemented:
+            return values
+        return AmountArray(self.currency, _checked_add(self.values, values))
+
+    def __sub__(self, other):
+        values = self._other_values(other, "subtract")
+        if values is NotImplemented:
+            return values
+        return AmountArray(self.currency, _checked_add(self.values, values, subtract=True))
+
+    __radd__ = __add__
+
+    def __rsub__(self, other):
+        values = self._other_values(other, "subtract")
+        if values is NotImplemented:
+            return values
+        return AmountArray(self.currency, _checked_add(_as_buffer(values), self.values, subtract=True))
+
+    def __neg__(self):
+        return AmountArray(self.currency, [-value for value in _tolist(self.values)])
+
+    def sum(self):
+        "Returns the total of the array as a single Amount"
+        return Amount(self.currency, _safe_sum(self.values))
+
+    def apply_factor(self, other):
+        """
+        Multiplies every value by the factor, with the same rounding
+        rules as Amount.apply_factor.
+        """
+        numpy = _numpy()
+        if isinstance(other, Rate):
+            return AmountArray(self.currency, other.apply_many(_tolist(self.values)))
+        if not isinstance(other, six.integer_types + (Decimal, )):
+            raise ValueError("You can only apply an integer, long, Decimal or Rate factor to an Amount")
+        if isinstance(other, six.integer_types):
+            if numpy is not None and isinstance(self.values, numpy.ndarray) and len(self.values):
+                bound = max(int(self.values.max()), -int(self.values.min()))
+                # The factor itself must fit in an int64 too (bound is 0 if
+                # every value is)
+                if abs(other) <= INT64_MAX and bound * abs(other) <= INT64_MAX:
+                    return AmountArray(self.currency, self.values * other)
+            return AmountArray(self.currency, [value * other for value in _tolist(self.values)])
+        return AmountArray(
+            self.currency,
+            [int(Decimal(value * other).to_integral(ROUND_HALF_UP)) for value in _tolist(self.values)],
+        )
+
+    def convert_currency(self, new_code, rate, major=False):
+        """
+        Converts every value into another currency at the given rate, with
+        the same semantics as Amount.convert_currency.
+        """
+        new_currency = get_currency(new_code)
+        if major:
+            rate = Rate(rate).minor_rate(self.currency, new_currency)
+        if isinstance(rate, Rate):
+            return AmountArray(new_currency, rate.apply_many(_tolist(self.values)))
+        if not isinstance(rate, six.integer_types + (float, Decimal)):
+            raise ValueError("You can only apply an integer, long, float, Decimal or Rate factor to an Amount")
+        return AmountArray(
+            new_currency,
+            [int(Decimal(value * rate).to_integral(ROUND_HALF_UP)) for value in _tolist(self.values)],
+        )
+
+    def divide_and_round(self, divisor, mode=ROUND_HALF_UP):
+        """
+        Divides every value through by the divisor provided, with the same
+        rounding rules as Amount.divide_and_round.
+        """
+        if not isinstance(divisor, six.integer_types + (float, Decimal)):
+            raise ValueError("You can only divide by an integer, long, float or Decimal")
+        divisor = Decimal(divisor)
+        return AmountArray(
+            self.currency,
+            [int((Decimal(value) / divisor).to_integral_exact(mode)) for value in _tolist(self.values)],
+        )
+
+    def allocate(self, weights):
+        """
+        Allocates every value against the same weights, as Amount.allocate
+        does, returning one AmountArray of parts per weight.
+        """
+        weights, total = normalise_weights(weights)
+        columns = [[] for weight in weights]
+        appends = [column.append for column in columns]
+        for value in _tolist(self.values):
+            for append, part in zip(appends, allocate_minor(value, weights, total)):
+                append(part)
+        return [AmountArray(self.currency, column) for column in columns]
+
+    def to_major_decimal(self):
+        "Returns our values as a list of Decimals of major units"
+        divisor = self.currency.divisor
+        return [Decimal(value) / divisor for value in _tolist(self.values)]
+
+
+def _as_index_buffer(indices):
+    """
+    Turns an iterable of currency indices into a compact unsigned 16-bit buffer.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        if isinstance(indices, numpy.ndarray):
+            return indices.astype(numpy.uint16, copy=False)
+        return numpy.array(_as_index_buffer_fallback(indices), dtype=numpy.uint16)
+    return _as_index_buffer_fallback(indices)
+
+
+def _as_index_buffer_fallback(indices):
+    if isinstance(indices, (array.array, memoryview)) and _typecode(indices) == "H":
+        return indices
+    return array.array("H", indices)
+
+
+_CACHEABLE_NUMERIC_TYPES = frozenset(six.integer_types + (str, six.text_type))
+
+
+def _numeric_table(kind):
+    """
+    Returns the table of numeric currency code to currency index, as a list
+    or (for kind "numpy") a NumPy array. Numeric codes have at most three
+    digits, so a flat table covers them; unassigned codes map to
+    len(currency_codes). Built once, until the registry changes.
+    """
+    numpy = _numpy()
+    table = _numeric_tables.get(kind)
+    if table is None:
+        table = [len(currency_codes)] * 1000
+        for numeric, code in codes_by_numeric.items():
+            if 0 <= numeric < 1000:
+                table[numeric] = currency_indices[code]
+        if kind == "numpy":
+            table = numpy.array(table, dtype=numpy.int64)
+        _numeric_tables[kind] = table
+    return table
+
+
+def indices_for_numeric(numeric_codes):
+    """
+    Resolves an iterable (or NumPy array) of ISO 4217 numeric currency codes,
+    as integers or strings of digits, to a buffer of currency indices for
+    MultiCurrencyAmountArray, in one pass.
+    """
+    numpy = _numpy()
+    if numpy is not None and isinstance(numeric_codes, numpy.ndarray):
+        if numeric_codes.dtype.kind not in "iu":
+            if numeric_codes.dtype.kind in "bfc":
+                raise ValueError("Invalid numeric currency codes of type %s" % numeric_codes.dtype)
+            # Strings (or objects) are checked one by one
+            return _as_index_buffer(_indices_for_numeric(numeric_codes.tolist()))
+        invalid = (numeric_codes < 0) | (numeric_codes >= 1000)
+        if invalid.any():
+            raise ValueError("Invalid numeric currency code %s" % numeric_codes[invalid][0])
+        indices = _numeric_table("numpy")[numeric_codes]
+        unknown = indices == len(currency_codes)
+        if unknown.any():
+            raise ValueError("Invalid numeric currency code %s" % numeric_codes[unknown][0])
+        return indices.astype(numpy.uint16)
+    return _as_index_buffer(_indices_for_numeric(numeric_codes))
+
+
+def _indices_for_numeric(numeric_codes):
+    table = _numeric_table("list")
+    unknown = len(currency_codes)
+
+    def resolve(numeric_code):
+        numeric = _parse_numeric(numeric_code)
+        index = table[numeric] if 0 <= numeric < 1000 else unknown
+        if index == unknown:
+            raise ValueError("Invalid numeric currency code %s" % (numeric_code, ))
+        return index
+
+    indices = []
+    append = indices.append
+    # Only exact ints and strings are remembered: 826.0 and True compare
+    # equal to valid codes, but must still be rejected
+    seen = {}
+    cacheable = _CACHEABLE_NUMERIC_TYPES
+    for numeric_code in numeric_codes:
+        if type(numeric_code) in cacheable:
+            index = seen.get(numeric_code)
+            if index is None:
+                index = seen[numeric_code] = resolve(numeric_code)
+        else:
+            index = resolve(numeric_code)
+        append(index)
+    return indices
+
+
+def _compress(values, mask, typecode):
+    """
+    Returns the entries of a buffer where mask is true.
+    """
+    numpy = _numpy()
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values[numpy.asarray(mask, dtype=bool)]
+    return array.array(typecode, [value for value, keep in zip(values, mask) if keep])
+
+
+class MultiCurrencyAmountArray(object):
+    """
+    A column of amounts in potentially many currencies.
+
+    Stored as two parallel buffers: a column of small integer indices into
+    `currint.currency.currency_codes`, and a column of minor unit values.
+    Grouping and totalling work directly on the columns without creating
+    any Amount objects.
+    """
+
+    def __init__(self, indices, values):
+        """
+        Initialises the array with an iterable of currency indices (as found
+        in `currint.currency.currency_indices`) and an iterable of integer
+        values of those currencies' minor units.
+        """
+        numpy = _numpy()
+        self.indices = _as_index_buffer(indices)
+        self.values = _as_buffer(values)
+        if len(self.indices) != len(self.values):
+            raise ValueError(
+                "Indices and values must be the same length (%s and %s)" % (len(self.indices), len(self.values))
+            )
+        if len(self.indices):
+            if numpy is not None and isinstance(self.indices, numpy.ndarray):
+                highest = int(self.indices.max())
+            else:
+                highest = max(self.indices)
+            if highest >= len(currency_codes):
+                raise ValueError("Invalid currency index %s" % highest)
+
+    @classmethod
+    def from_codes_and_minor(cls, codes, values):
+        """
+        Initialises the array with parallel iterables of currency codes and
+        integer values of minor units
+        """
+        indices = []
+        for currency_code in codes:
+            try:
+                indices.append(currency_indices[currency_code.upper()])
+            except KeyError:
+                raise ValueError("Invalid currency code %s" % currency_code)
+        return cls(indices, values)
+
+    @classmethod
+    def from_numeric_and_minor(cls, numeric_codes, values):
+        """
+        Initialises the array with parallel iterables of ISO 4217 numeric
+        currency codes and integer values of minor units
+        """
+        return cls(indices_for_numeric(numeric_codes), values)
+
+    @classmethod
+    def from_amounts(cls, amounts):
+        """
+        Builds an array out of Amount objects of any registered currency.
+        """
+        indices = []
+        values = []
+        for amount in amounts:
+            if amount is _ZeroAmount.instance:
+                raise ValueError("Amount.ZERO has no currency and cannot be stored in a MultiCurrencyAmountArray")
+            try:
+                indices.append(currency_indices[amount.currency.code])
+            except KeyError:
+                raise ValueError("Invalid currency code %s" % amount.currency.code)
+            values.append(amount.value)
+        return cls(indices, values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        for index, value in zip(_tolist(self.indices), _tolist(self.values)):
+            yield Amount(currencies[currency_codes[index]], value)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(self.indices[index], self.values[index])
+        return Amount(currencies[currency_codes[self.indices[index]]], int(self.values[index]))
+
+    def __repr__(self):
+        return "<MultiCurrencyAmountArray %s values>" % len(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, MultiCurrencyAmountArray):
+            return False
+        return (
+            _tolist(self.indices) == _tolist(other.indices) and
+            _tolist(self.values) == _tolist(other.values)
+        )
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def codes(self):
+        "Returns the currency codes present in the array, in index order"
+        numpy = _numpy()
+        if numpy is not None and isinstance(self.indices, numpy.ndarray):
+            present = numpy.unique(self.indices).tolist()
+        else:
+            present = sorted(set(self.indices))
+        return [currency_codes[index] for index in present]
+
+    def filter(self, mask):
+        """
+        Returns a new array containing only the rows where `mask` (an
+        iterable of booleans the same length as the array) is true.
+        """
+        if not hasattr(mask, "__len__"):
+            mask = list(mask)
+        if len(mask) != len(self):
+            raise ValueError("Mask must be the same length as the array (%s and %s)" % (len(mask), len(self)))
+        return self.__class__(
+            _compress(self.indices, mask, "H"),
+            _compress(self.values, mask, INT64_TYPECODE),
+        )
+
+    def for_currency(self, currency_code):
+        """
+        Returns the values of a single currency as an AmountArray.
+        """
+        numpy = _numpy()
+        try:
+            index = currency_indices[currency_code.upper()]
+        except KeyError:
+            raise ValueError("Invalid currency code %s" % currency_code)
+        if numpy is not None and isinstance(self.indices, numpy.ndarray):
+            values = self.values[self.indices == index]
+        else:
+            values = _compress(self.values, [i == index for i in self.indices], INT64_TYPECODE)
+        return AmountArray(currencies[currency_codes[index]], values)
+
+    def totals(self):
+        """
+        Returns a dict of currency code to the total Amount of that currency.
+        """
+        numpy = _numpy()
+        if numpy is not None and isinstance(self.indices, numpy.ndarray):
+            sums = {}
+            for index in numpy.unique(self.indices).tolist():
+                sums[index] = _safe_sum(self.values[self.indices == index])
+        else:
+            sums = {}
+            for index, value in zip(self.indices, self.values):
+                sums[index] = sums.get(index, 0) + value
+        return dict(
+            (currency_codes[index], Amount(currencies[currency_codes[index]], value))
+            for index, value in sums.items()
+        )
+
+    def group_totals(self, keys):
+        """
+        Totals the array by an arbitrary grouping column; `keys` is an
+        iterable of hashable group labels, one per row.
+
+        Returns a dict of (key, currency code) to the total Amount.
+        """
+        keys = list(keys)
+        if len(keys) != len(self):
+            raise ValueError("Keys must be the same length as the array (%s and %s)" % (len(keys), len(self)))
+        sums = {}
+        for key, index, value in zip(keys, _tolist(self.indices), _tolist(self.values)):
+            group = (key, index)
+            sums[group] = sums.get(group, 0) + value
+        return dict(
+            ((key, currency_codes[index]), Amount(currencies[currency_codes[index]], value))
+            for (key, index), value in sums.items()
+        )
@@ -0,0 +1,226 @@
+import six
+from .amount import Amount, _ZeroAmount
+from .currency import codes_by_numeric, currency_for_numeric, get_currency
+
+# Each record is a varint header followed by a zig-zag varint minor value.
+# An even header is an ISO 4217 numeric code shifted left by one bit; an
+# odd header is the length of an inline ASCII alpha code, shifted the same
+# way and followed by the code itself. A lone header of 1 (an empty code,
+# with no value) is Amount.ZERO.
+ZERO_RECORD = b"\x01"
+
+
+def _varint(value):
+    """
+    Encodes a non-negative integer as a little-endian base 128 varint.
+    """
+    if value < 0x80:
+        return six.int2byte(value)
+    parts = bytearray()
+    while value >= 0x80:
+        parts.append((value & 0x7f) | 0x80)
+        value >>= 7
+    parts.append(value)
+    return bytes(parts)
+
+
+def _header(currency):
+    """
+    Returns the encoded header for a Currency: its numeric code if that
+    resolves back to it, otherwise its alpha code inline.
+    """
+    numeric_code = currency.numeric_code
+    if numeric_code is not None:
+        try:
+            numeric = int(numeric_code)
+        except ValueError:
+            numeric = None
+        if numeric is not None and codes_by_numeric.get(numeric) == currency.code:
+            return _varint(numeric << 1)
+    code = currency.code.encode("ascii")
+    return _varint((len(code) << 1) | 1) + code
+
+
+def dumps(amount):
+    "Encodes a single Amount as bytes"
+    return dumps_many([amount])
+
+
+def dumps_many(amounts):
+    """
+    Encodes an iterable of Amounts (of any currencies) as one string of
+    bytes, which loads_many or a Decoder turns back into Amounts.
+    """
+    headers = {}
+    output = bytearray()
+    extend = output.extend
+    for amount in amounts:
+        if amount is _ZeroAmount.instance:
+            extend(ZERO_RECORD)
+            continue
+        currency = amount.currency
+        header = headers.get(currency)
+        if header is None:
+            header = headers[currency] = _header(currency)
+        value = amount.value
+        value = value << 1 if value >= 0 else ((-value) << 1) - 1
+        if value < 0x80:
+            extend(header)
+            output.append(value)
+        else:
+            extend(header + _varint(value))
+    return bytes(output)
+
+
+def loads(data):
+    "Decodes a single Amount encoded by dumps"
+    amounts = loads_many(data)
+    if len(amounts) != 1:
+        raise ValueError("Expected one encoded amount, found %s" % len(amounts))
+    return amounts[0]
+
+
+def loads_many(data):
+    """
+    Decodes bytes (or any buffer) encoded by dumps_many into a list of Amounts.
+    """
+    decoder = Decoder()
+    amounts = decoder.feed(data)
+    decoder.close()
+    return amounts
+
+
+def _view(data):
+    """
+    Returns a zero-copy view of a buffer that indexes as integers.
+    """
+    if six.PY2:  # pragma: no cover
+        # Python 2 memoryviews index as 1-character strings
+        return bytearray(data)
+    return memoryview(data)
+
+
+class Decoder(object):
+    """
+    Incrementally decodes a stream of encoded Amounts that may arrive in
+    arbitrary chunks (e.g. from a socket). Each chunk is read through a
+    memoryview; only a record split across two chunks is ever copied.
+    """
+
+    def __init__(self):
+        self._tail = b""
+        self._currencies = {}
+
+    def feed(self, data):
+        """
+        Decodes as many complete records as possible from the buffered data
+        and this chunk, returning them as a list of Amounts.
+        """
+        view = _view(data)
+        amounts = []
+        if self._tail:
+            # Finish the record split across chunks, copying only as many
+            # bytes of the new chunk as it might need.
+            take = 64
+            while True:
+                joined = self._tail + bytes(view[:take])
+                amounts, end = self._decode(_view(joined))
+                if end or take >= len(view):
+                    break
+                take *= 2
+            if not end:
+                self._tail = joined
+                return amounts
+            view = view[end - len(self._tail):]
+            self._tail = b""
+        more, end = self._decode(view)
+        amounts.extend(more)
+        self._tail = bytes(view[end:])
+        return amounts
+
+    def close(self):
+        """
+        Checks that the stream did not end part way through a record.
+        """
+        if self._tail:
+            raise ValueError("Truncated amount data (%s trailing bytes)" % len(self._tail))
+
+    def _currency(self, header, view, position):
+        """
+        Resolves a record header, returning (Currency or None for ZERO,
+        position after the header), or None if the header's code is
+        incomplete.
+        """
+        if not header & 1:
+            currency = self._currencies.get(header)
+            if currency is None:
+                currency = self._currencies[header] = currency_for_numeric(header >> 1)
+            return currency, position
+        length = header >> 1
+        if not length:
+            return None, position
+        if position + length > len(view):
+            return None
+        code = bytes(view[position:position + length])
+        currency = self._currencies.get(code)
+        if currency is None:
+            currency = self._currencies[code] = get_currency(code.decode("ascii"))
+        return currency, position + length
+
+    def _decode(self, view):
+        """
+        Decodes complete records from the view, returning (Amounts, offset
+        of the first byte not consumed).
+        """
+        amounts = []
+        append = amounts.append
+        zero = _ZeroAmount.instance
+        new = object.__new__
+        # Numeric headers resolve without touching the view again
+        currencies = self._currencies
+        size = len(view)
+        start = 0
+        while start < size:
+            position = start
+            # Header varint
+            byte = view[position]
+            position += 1
+            header = byte & 0x7f
+            shift = 7
+            while byte & 0x80:
+                if position >= size:
+                    return amounts, start
+                byte = view[position]
+                position += 1
+                header |= (byte & 0x7f) << shift
+                shift += 7
+            currency = currencies.get(header)
+            if currency is None:
+                resolved = self._currency(header, view, position)
+                if resolved is None:
+                    return amounts, start
+                currency, position = resolved
+                if currency is None:
+                    append(zero)
+                    start = position
+                    continue
+            # Zig-zag value varint
+            if position >= size:
+                return amounts, start
+            byte = view[position]
+            position += 1
+            value = byte & 0x7f
+            shift = 7
+            while byte & 0x80:
+                if position >= size:
+                    return amounts, start
+                byte = view[position]
+                position += 1
+                value |= (byte & 0x7f) << shift
+                shift += 7
+            amount = new(Amount)
+            amount.currency = currency
+            amount.value = -((value + 1) >> 1) if value & 1 else value >> 1
+            append(amount)
+            start = position
+        return amounts, start
@@ -1,7 +1,35 @@
 # encoding: utf8
 from __future__ import unicode_literals
+import io
+import json
+import operator
+import os
 import six
 from decimal import Decimal
+from itertools import islice
+
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping, MutableMapping
+
+# How many values Currency.format_many renders with each %-operation
+FORMAT_CHUNK_SIZE = 1024
+
+# How many distinct code spellings get_currency remembers
+CODE_CACHE_SIZE = 1024
+
+# Spelling to Currency (or _invalid), for get_currency
+_code_cache = {}
+_invalid = object()
+
+# Lookup tables derived from the registry (e.g. arrays' flat table of numeric
+# code to currency index), built on first use and dropped whenever a code
+# is registered or removed
+_numeric_tables = {}
+
+# The columns a currency data file may have, in Currency argument order
+DATA_FIELDS = ("code", "numeric_code", "exponent", "name", "divisor", "prefix", "suffix")
 
 
 @six.python_2_unicode_compatible
@@ -10,6 +38,10 @@ class Currency(object):
     Represents a currency (unit of account).
     """
 
+    __slots__ = ("code", "numeric_code", "name", "prefix", "suffix", "exponent", "divisor", "_format_cache")
+
+    _fields = ("code", "numeric_code", "name", "prefix", "suffix", "exponent", "divisor")
+
     def __init__(self, code, numeric_code, exponent=2, name=None, divisor=None, prefix=None, suffix=None):
         self.code = code
         self.numeric_code = numeric_code
@@ -32,8 +64,12 @@ class Currency(object):
                 self.divisor = divisor
             else:
                 raise ValueError("You cannot provide a value for both divisor and exponent")
+        self._format_cache = None
 
     def __eq__(self, other):
+        # Registry currencies are singletons, so this is the common case
+        if self is other:
+            return True
         if not isinstance(other, Currency):
             return False
         return self.code == other.code
@@ -41,6 +77,42 @@ class Currency(object):
     def __ne__(self, other):
         return not (self == other)
 
+    def __hash__(self):
+        return hash(self.code)
+
+    def __reduce_ex__(self, protocol):
+        # Registry currencies pickle as just their code, and unpickle to the
+        # registry's Currency, so identity fast paths keep working.
+        if type(self) is Currency:
+            if get_currency(self.code, None) is self:
+                return (get_currency, (self.code, ))
+            return (Currency, self._arguments())
+        return super(Currency, self).__reduce_ex__(protocol)
+
+    def __copy__(self):
+        if get_currency(self.code, None) is self:
+            return self
+        return type(self)(*self._arguments())
+
+    def __deepcopy__(self, memo):
+        # Every field is immutable, so a copy is as deep as it gets
+        return self.__copy__()
+
+    def _arguments(self):
+        "Returns the arguments that construct an identical Currency"
+        return (
+            self.code, self.numeric_code, self.exponent, self.name,
+            self.divisor if self.exponent is None else None, self.prefix, self.suffix,
+        )
+
+    def __getstate__(self):
+        return dict((name, getattr(self, name)) for name in self._fields)
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._format_cache = None
+
     def __str__(self):
         return self.code
 
@@ -90,6 +162,11 @@ class Currency(object):
         Formats a value (in the minor unit as an integer) as a string,
         with the local prefix/suffix.
         """
+        cache = self._format_cache or self._compile_formatters()
+        if cache[1] is not None:
+            if not isinstance(value, six.integer_types):
+                raise ValueError("The value passed in must be either an integer or a long")
+            return cache[1](value)
         return "%s%s%s" % (
             self.prefix,
             self.format_decimal(value),
@@ -101,6 +178,12 @@ class Currency(object):
         Formats a value (in the minor unit as an integer) as a string,
         with no local prefix/suffix.  Can be cast into a Decimal value as needed.
         """
+        cache = self._format_cache or self._compile_formatters()
+        if cache[0] is not None:
+            if not isinstance(value, six.integer_types):
+                raise ValueError("The value passed in must be either an integer or a long")
+            return cache[0](value)
+
         major_value = self.minor_to_major(value)
 
         if self.exponent is not None:
@@ -113,173 +196,455 @@ class Currency(object):
 
         return format_str.format(major_value, **format_kwargs)
 
+    def _compile_formatters(self):
+        """
+        Builds (and caches) the integer-only formatting machinery for
+        currencies with an exponent, as a tuple of:
+
+            (format_decimal function, format function,
+             format_decimal %-template, format %-template)
+
+        The functions render a minor unit integer using only divmod and
+        %-formatting; the templates take (sign, major, minor) arguments
+        (or just the value, for exponent 0) and are used by format_many.
+        Currencies with a custom divisor get Nones and use Decimal instead.
+
+        The cache assumes prefix and suffix don't change after first use.
+        """
+        if self.exponent is None:
+            self._format_cache = (None, None, None, None)
+            return self._format_cache
+        prefix = self.prefix.replace("%", "%%")
+        suffix = self.suffix.replace("%", "%%")
+        divisor = self.divisor
+        if self.exponent == 0:
+            def make_formatter(template):
+                def formatter(value):
+                    return template % value
+                return formatter
+            number = "%d"
+        else:
+            def make_formatter(template):
+                def formatter(value):
+                    if value < 0:
+                        major, minor = divmod(-value, divisor)
+                        return template % ("-", major, minor)
+                    major, minor = divmod(value, divisor)
+                    return template % ("", major, minor)
+                return formatter
+            number = "%%s%%d.%%0%dd" % self.exponent
+        self._format_cache = (
+            make_formatter(number),
+            make_formatter(prefix + number + suffix),
+            number,
+            prefix + number + suffix,
+        )
+        return self._format_cache
+
+    def format_many(self, values, sep="\n", stream=None, decimal=False):
+        """
+        Formats an iterable of values (in the minor unit as integers) as they
+        would be by format() (or format_decimal(), if decimal is True),
+        separated by sep.
+
+        Writes the result to stream (a text file-like object) if one is
+        given, otherwise returns it as a string.
+        """
+        output = io.StringIO() if stream is None else stream
+        for chunk in self._format_chunks(values, sep, decimal):
+            output.write(chunk)
+        if stream is None:
+            return output.getvalue()
+
+    def format_many_bytes(self, values, sep=b"\n", stream=None, decimal=False, encoding="utf-8"):
+        """
+        As format_many, but produces bytes in the given encoding, for writing
+        straight to binary files or sockets.
+        """
+        output = io.BytesIO() if stream is None else stream
+        for chunk in self._format_chunks(values, sep.decode(encoding), decimal):
+            output.write(chunk.encode(encoding))
+        if stream is None:
+            return output.getvalue()
+
+    def _format_chunks(self, values, sep, decimal):
+        """
+        Yields the formatted values in chunks of FORMAT_CHUNK_SIZE, each
+        rendered by a single %-operation rather than one string per value.
+        """
+        cache = self._format_cache or self._compile_formatters()
+        values = iter(values)
+        separator = ""
+        if cache[0] is None:
+            format = self.format_decimal if decimal else self.format
+            while True:
+                chunk = list(islice(values, FORMAT_CHUNK_SIZE))
+                if not chunk:
+                    return
+                yield separator + sep.join([format(value) for value in chunk])
+                separator = sep
+        template = cache[2] if decimal else cache[3]
+        escaped_sep = sep.replace("%", "%%")
+        full_template = None
+        divisor = self.divisor
+        while True:
+            chunk = list(islice(values, FORMAT_CHUNK_SIZE))
+            if not chunk:
+                return
+            for value in chunk:
+                if not isinstance(value, six.integer_types):
+                    raise ValueError("The value passed in must be either an integer or a long")
+            if self.exponent == 0:
+                args = tuple(chunk)
+            else:
+                args = []
+                extend = args.extend
+                for value in chunk:
+                    if value < 0:
+                        major, minor = divmod(-value, divisor)
+                        extend(("-", major, minor))
+                    else:
+                        major, minor = divmod(value, divisor)
+                        extend(("", major, minor))
+                args = tuple(args)
+            if len(chunk) == FORMAT_CHUNK_SIZE:
+                if full_template is None:
+                    full_template = escaped_sep.join([template] * FORMAT_CHUNK_SIZE)
+                chunk_template = full_template
+            else:
+                chunk_template = escaped_sep.join([template] * len(chunk))
+            yield separator + chunk_template % args
+            separator = sep
+
+
+class _LazyCurrencies(MutableMapping):
+    """
+    The currency registry: a mapping of code to Currency that builds each
+    Currency from its definition the first time it is looked up, so that
+    importing currint doesn't have to build the whole table.
+
+    It is a wrapper rather than a dict subclass, since C code (json, dict
+    union, dict methods called directly) reads a dict's storage without
+    going through our methods, and would see only the currencies built so
+    far. Anything that needs the whole table (iteration, len, comparison)
+    builds it all first.
+    """
+
+    def __init__(self, definitions, version=None):
+        self._currencies = {}
+        self._pending = dict(definitions)
+        self.version = version
+
+    def __getitem__(self, code):
+        try:
+            return self._currencies[code]
+        except KeyError:
+            args = self._pending.get(code)
+            if args is None:
+                # Another thread may have built it since we looked; entries
+                # are always stored before their definitions are removed
+                try:
+                    return self._currencies[code]
+                except KeyError:
+                    raise KeyError(code)
+        # setdefault, so that racing threads still agree on one Currency
+        currency = self._currencies.setdefault(code, Currency(*args))
+        self._pending.pop(code, None)
+        return currency
+
+    def _load_all(self):
+        for code, args in list(self._pending.items()):
+            self._currencies.setdefault(code, Currency(*args))
+            self._pending.pop(code, None)
+
+    def __contains__(self, code):
+        return code in self._currencies or code in self._pending
+
+    def __setitem__(self, code, currency):
+        _index_code(code, currency.numeric_code)
+        self._currencies[code] = currency
+        self._pending.pop(code, None)
+
+    def _define(self, code, args):
+        """
+        Sets (or replaces) the definition a Currency will be built from.
+        """
+        _index_code(code, args[1] if len(args) > 1 else None)
+        self._pending[code] = args
+        self._currencies.pop(code, None)
+
+    def __delitem__(self, code):
+        if self._pending.pop(code, None) is None:
+            del self._currencies[code]
+        else:
+            self._currencies.pop(code, None)
+        _unindex_code(code)
+
+    def __len__(self):
+        if self._pending:
+            self._load_all()
+        return len(self._currencies)
+
+    def __iter__(self):
+        if self._pending:
+            self._load_all()
+        return iter(self._currencies)
+
+    def __reversed__(self):
+        return reversed(list(self))
+
+    def copy(self):
+        "Returns the whole table as a plain dict"
+        return dict(self.items())
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        result = dict(other)
+        result.update(self.items())
+        return result
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyCurrencies):
+            other = other.copy()
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.copy())
+
+    def __reduce__(self):
+        return (_LazyCurrencies, ({}, self.version), None, None, iter(self.items()))
+
+
+def _index_code(code, numeric_code):
+    """
+    Gives a newly registered code the next currency index, and points its
+    numeric code at it. Also forgets cached lookups, which may be stale.
+    """
+    _code_cache.clear()
+    _numeric_tables.clear()
+    if code not in currency_indices:
+        currency_indices[code] = len(currency_codes)
+        currency_codes.append(code)
+    _forget_numeric(code)
+    try:
+        codes_by_numeric[_parse_numeric(numeric_code)] = code
+    except ValueError:
+        # No (or a non-ISO) numeric code
+        pass
+
+
+def _unindex_code(code):
+    """
+    Forgets a deleted code's numeric code and cached lookups. Its currency
+    index is kept, as indices never change.
+    """
+    _code_cache.clear()
+    _numeric_tables.clear()
+    if code not in currencies:
+        # Unless it was only deleted from another registry (e.g. in tests)
+        _forget_numeric(code)
+
+
+def _forget_numeric(code):
+    "Removes a code from codes_by_numeric"
+    for numeric, indexed_code in list(codes_by_numeric.items()):
+        if indexed_code == code:
+            del codes_by_numeric[numeric]
+
+
+def get_currency(code, default=_invalid):
+    """
+    Returns the registered Currency for a currency code, in any case (e.g.
+    "GBP" or "gbp").
+
+    Raises ValueError for unknown codes, or returns default if one is given.
+    Every spelling seen is cached, unknown ones included, so repeated
+    lookups skip upper-casing and never raise internally.
+    """
+    currency = _code_cache.get(code)
+    if currency is None:
+        try:
+            currency = currencies[code.upper()]
+        except KeyError:
+            currency = _invalid
+        if len(_code_cache) >= CODE_CACHE_SIZE:
+            # Simpler and cheaper than an LRU; real inputs have few spellings
+            _code_cache.clear()
+        _code_cache[code] = currency
+    if currency is _invalid:
+        if default is _invalid:
+            raise ValueError("Invalid currency code %s" % code)
+        return default
+    return currency
+
+
+def currency_for_numeric(numeric_code):
+    """
+    Returns the registered Currency with an ISO 4217 numeric code, given as
+    an integer or a string (leading zeros are optional, so 8, "8", "008"
+    and "0008" are all ALL).
+    """
+    try:
+        return currencies[codes_by_numeric[_parse_numeric(numeric_code)]]
+    except KeyError:
+        raise ValueError("Invalid numeric currency code %s" % (numeric_code, ))
+
+
+def _parse_numeric(numeric_code):
+    """
+    Returns a numeric currency code, given as an integer or a string of
+    digits, as an integer. Raises ValueError for anything else, including
+    booleans, floats and strings int() would also accept (e.g. "8_26").
+    """
+    if isinstance(numeric_code, six.string_types):
+        if not numeric_code or numeric_code.strip("0123456789"):
+            raise ValueError("Invalid numeric currency code %s" % (numeric_code, ))
+        return int(numeric_code)
+    if isinstance(numeric_code, bool):
+        raise ValueError("Invalid numeric currency code %s" % (numeric_code, ))
+    try:
+        # Integers, including NumPy's, but not floats
+        return operator.index(numeric_code)
+    except TypeError:
+        raise ValueError("Invalid numeric currency code %s" % (numeric_code, ))
+
+
+def read_currency_data(data):
+    """
+    Parses the contents of a currency data file (bytes or text), returning
+    (version, definitions), where definitions maps each currency code to
+    the arguments to build its Currency with.
+
+    The file is JSON: an object with a "version" string, a "fields" list
+    naming the columns (a prefix of DATA_FIELDS), and a "currencies" list of
+    rows, whose trailing null columns may be left out.
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf8")
+    try:
+        table = json.loads(data)
+        version = table["version"]
+        fields = tuple(table["fields"])
+        rows = table["currencies"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid currency data")
+    if not fields or fields != DATA_FIELDS[:len(fields)]:
+        raise ValueError("Invalid currency data fields %s" % ", ".join(fields))
+    if not isinstance(rows, list):
+        raise ValueError("Invalid currency data")
+    definitions = {}
+    for row in rows:
+        if not _valid_row(row, len(fields)):
+            raise ValueError("Invalid currency data row %r" % (row, ))
+        if row[0] in definitions:
+            raise ValueError("Duplicate currency code %s in currency data" % row[0])
+        definitions[row[0]] = tuple(row)
+    return version, definitions
+
+
+def _valid_row(row, width):
+    """
+    Returns True if a currency data row has the shape and types of the
+    arguments to Currency, so that a bad file fails when it's read rather
+    than on later lookups.
+    """
+    if not isinstance(row, list) or not 0 < len(row) <= width:
+        return False
+    row = row + [None] * (len(DATA_FIELDS) - len(row))
+    code, numeric_code, exponent, name, divisor, prefix, suffix = row
+    # Lookups upper-case the code, so anything else could never be found
+    if not isinstance(code, six.string_types) or not code or code != code.upper():
+        return False
+    if numeric_code is not None:
+        if not isinstance(numeric_code, six.string_types):
+            return False
+        try:
+            _parse_numeric(numeric_code)
+        except ValueError:
+            return False
+    if (exponent is None) == (divisor is None):
+        return False
+    for value, minimum in ((exponent, 0), (divisor, 1)):
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, six.integer_types) or value < minimum:
+                return False
+    return all(value is None or isinstance(value, six.string_types) for value in (name, prefix, suffix))
+
+
+def load_currency_data(source, replace=True):
+    """
+    Registers every currency in a currency data file (a path, or a file
+    object), so that ISO 4217 updates can be picked up by a running process.
+    Returns the file's version.
+
+    Currencies already registered are replaced with the file's definitions
+    unless replace is False, in which case only new codes are added.
+    Registered codes missing from the file are left alone.
+    """
+    if isinstance(source, six.string_types):
+        with io.open(source, "rb") as fh:
+            data = fh.read()
+    else:
+        data = source.read()
+    version, definitions = read_currency_data(data)
+    for code, args in definitions.items():
+        if replace or code not in currencies:
+            currencies._define(code, args)
+    currencies.version = version
+    return version
+
+
+def register_currency(currency, replace=False):
+    """
+    Adds a Currency to the registry, so it can be looked up by its code
+    like the built-in currencies. Raises ValueError if the code is already
+    registered, unless replace is True.
+    """
+    if not isinstance(currency, Currency):
+        raise ValueError("You can only register a Currency")
+    if not replace and currency.code in currencies:
+        raise ValueError("Currency %s is already registered" % currency.code)
+    currencies[currency.code] = currency
+
+
+def _read_package_data(name):
+    """
+    Returns the contents of a file in currint/data, as pkgutil.get_data
+    does (including from zipped packages), but without importing pkgutil,
+    which costs more than the rest of this module.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", name)
+    loader = globals().get("__loader__")
+    if hasattr(loader, "get_data"):
+        return loader.get_data(path)
+    with io.open(path, "rb") as fh:  # pragma: no cover
+        return fh.read()
+
+
+# A fixed ordering of the registry, so that columnar containers can refer
+# to currencies by small integer index rather than by Currency object.
+# Built-in codes are sorted; codes registered later are appended, so that
+# existing indices never change.
+_version, _definitions = read_currency_data(_read_package_data("iso4217.json"))
+currency_codes = sorted(_definitions)
+currency_indices = dict((code, index) for index, code in enumerate(currency_codes))
+
+# ISO 4217 numeric codes, as integers, to alpha codes
+codes_by_numeric = dict(
+    (int(args[1]), code) for code, args in _definitions.items() if len(args) > 1 and args[1] is not None
+)
 
-currencies = {
-    "AED": Currency("AED", "784", 2, 'UAE Dirham'),
-    "AFN": Currency("AFN", "971", 2, 'Afghani'),
-    "ALL": Currency("ALL", "008", 2, 'Lek'),
-    "AMD": Currency("AMD", "051", 2, 'Armenian Dram'),
-    "ANG": Currency("ANG", "532", 2, 'Netherlands Antillean Guilder'),
-    "AOA": Currency("AOA", "973", 2, 'Kwanza'),
-    "ARS": Currency("ARS", "032", 2, 'Argentine Peso'),
-    "AUD": Currency("AUD", "036", 2, 'Australian Dollar'),
-    "AWG": Currency("AWG", "533", 2, 'Aruban Florin'),
-    "AZN": Currency("AZN", "944", 2, 'Azerbaijanian Manat'),
-    "BAM": Currency("BAM", "977", 2, 'Convertible Mark'),
-    "BBD": Currency("BBD", "052", 2, 'Barbados Dollar'),
-    "BDT": Currency("BDT", "050", 2, 'Taka'),
-    "BGN": Currency("BGN", "975", 2, 'Bulgarian Lev'),
-    "BHD": Currency("BHD", "048", 3, 'Bahraini Dinar'),
-    "BIF": Currency("BIF", "108", 0, 'Burundi Franc'),
-    "BMD": Currency("BMD", "060", 2, 'Bermudian Dollar'),
-    "BND": Currency("BND", "096", 2, 'Brunei Dollar'),
-    "BOB": Currency("BOB", "068", 2, 'Boliviano'),
-    "BOV": Currency("BOV", "984", 2, 'Mvdol'),
-    "BRL": Currency("BRL", "986", 2, 'Brazilian Real'),
-    "BSD": Currency("BSD", "044", 2, 'Bahamian Dollar'),
-    "BTN": Currency("BTN", "064", 2, 'Ngultrum'),
-    "BWP": Currency("BWP", "072", 2, 'Pula'),
-    "BYR": Currency("BYR", "974", 0, 'Belarussian Ruble'),
-    "BZD": Currency("BZD", "084", 2, 'Belize Dollar'),
-    "CAD": Currency("CAD", "124", 2, 'Canadian Dollar'),
-    "CDF": Currency("CDF", "976", 2, 'Congolese Franc'),
-    "CHE": Currency("CHE", "947", 2, 'WIR Euro'),
-    "CHF": Currency("CHF", "756", 2, 'Swiss Franc'),
-    "CHW": Currency("CHW", "948", 2, 'WIR Franc'),
-    "CLF": Currency("CLF", "990", 0, 'Unidad de Fomento'),
-    "CLP": Currency("CLP", "152", 0, 'Chilean Peso'),
-    "CNY": Currency("CNY", "156", 2, 'Yuan Renminbi'),
-    "COP": Currency("COP", "170", 2, 'Colombian Peso'),
-    "COU": Currency("COU", "970", 2, 'Unidad de Valor Real'),
-    "CRC": Currency("CRC", "188", 2, 'Costa Rican Colon'),
-    "CUC": Currency("CUC", "931", 2, 'Peso Convertible'),
-    "CUP": Currency("CUP", "192", 2, 'Cuban Peso'),
-    "CVE": Currency("CVE", "132", 2, 'Cape Verde Escudo'),
-    "CZK": Currency("CZK", "203", 2, 'Czech Koruna'),
-    "DJF": Currency("DJF", "262", 0, 'Djibouti Franc'),
-    "DKK": Currency("DKK", "208", 2, 'Danish Krone'),
-    "DOP": Currency("DOP", "214", 2, 'Dominican Peso'),
-    "DZD": Currency("DZD", "012", 2, 'Algerian Dinar'),
-    "EGP": Currency("EGP", "818", 2, 'Egyptian Pound'),
-    "ERN": Currency("ERN", "232", 2, 'Nakfa'),
-    "ETB": Currency("ETB", "230", 2, 'Ethiopian Birr'),
-    "EUR": Currency("EUR", "978", 2, 'Euro'),
-    "FJD": Currency("FJD", "242", 2, 'Fiji Dollar'),
-    "FKP": Currency("FKP", "238", 2, 'Falkland Islands Pound'),
-    "GBP": Currency("GBP", "826", 2, 'Pound Sterling'),
-    "GEL": Currency("GEL", "981", 2, 'Lari'),
-    "GHS": Currency("GHS", "936", 2, 'Ghana Cedi'),
-    "GIP": Currency("GIP", "292", 2, 'Gibraltar Pound'),
-    "GMD": Currency("GMD", "270", 2, 'Dalasi'),
-    "GNF": Currency("GNF", "324", 0, 'Guinea Franc'),
-    "GTQ": Currency("GTQ", "320", 2, 'Quetzal'),
-    "GYD": Currency("GYD", "328", 2, 'Guyana Dollar'),
-    "HKD": Currency("HKD", "344", 2, 'Hong Kong Dollar'),
-    "HNL": Currency("HNL", "340", 2, 'Lempira'),
-    "HRK": Currency("HRK", "191", 2, 'Croatian Kuna'),
-    "HTG": Currency("HTG", "332", 2, 'Gourde'),
-    "HUF": Currency("HUF", "348", 2, 'Forint'),
-    "IDR": Currency("IDR", "360", 2, 'Rupiah'),
-    "ILS": Currency("ILS", "376", 2, 'New Israeli Sheqel'),
-    "INR": Currency("INR", "356", 2, 'Indian Rupee'),
-    "IQD": Currency("IQD", "368", 3, 'Iraqi Dinar'),
-    "IRR": Currency("IRR", "364", 2, 'Iranian Rial'),
-    "ISK": Currency("ISK", "352", 0, 'Iceland Krona'),
-    "JMD": Currency("JMD", "388", 2, 'Jamaican Dollar'),
-    "JOD": Currency("JOD", "400", 3, 'Jordanian Dinar'),
-    "JPY": Currency("JPY", "392", 0, 'Yen'),
-    "KES": Currency("KES", "404", 2, 'Kenyan Shilling'),
-    "KGS": Currency("KGS", "417", 2, 'Som'),
-    "KHR": Currency("KHR", "116", 2, 'Riel'),
-    "KMF": Currency("KMF", "174", 0, 'Comoro Franc'),
-    "KPW": Currency("KPW", "408", 2, 'North Korean Won'),
-    "KRW": Currency("KRW", "410", 0, 'Won'),
-    "KWD": Currency("KWD", "414", 3, 'Kuwaiti Dinar'),
-    "KYD": Currency("KYD", "136", 2, 'Cayman Islands Dollar'),
-    "KZT": Currency("KZT", "398", 2, 'Tenge'),
-    "LAK": Currency("LAK", "418", 2, 'Kip'),
-    "LBP": Currency("LBP", "422", 2, 'Lebanese Pound'),
-    "LKR": Currency("LKR", "144", 2, 'Sri Lanka Rupee'),
-    "LRD": Currency("LRD", "430", 2, 'Liberian Dollar'),
-    "LSL": Currency("LSL", "426", 2, 'Loti'),
-    "LTL": Currency("LTL", "440", 2, 'Lithuanian Litas'),
-    "LYD": Currency("LYD", "434", 3, 'Libyan Dinar'),
-    "MAD": Currency("MAD", "504", 2, 'Moroccan Dirham'),
-    "MDL": Currency("MDL", "498", 2, 'Moldovan Leu'),
-    "MGA": Currency("MGA", "969", None, 'Malagasy Ariary', divisor=5),
-    "MKD": Currency("MKD", "807", 2, 'Denar'),
-    "MMK": Currency("MMK", "104", 2, 'Kyat'),
-    "MNT": Currency("MNT", "496", 2, 'Tugrik'),
-    "MOP": Currency("MOP", "446", 2, 'Pataca'),
-    "MRO": Currency("MRO", "478", None, 'Ouguiya', divisor=5),
-    "MUR": Currency("MUR", "480", 2, 'Mauritius Rupee'),
-    "MVR": Currency("MVR", "462", 2, 'Rufiyaa'),
-    "MWK": Currency("MWK", "454", 2, 'Kwacha'),
-    "MXN": Currency("MXN", "484", 2, 'Mexican Peso'),
-    "MXV": Currency("MXV", "979", 2, 'Mexican Unidad de Inversion (UDI)'),
-    "MYR": Currency("MYR", "458", 2, 'Malaysian Ringgit'),
-    "MZN": Currency("MZN", "943", 2, 'Mozambique Metical'),
-    "NAD": Currency("NAD", "516", 2, 'Namibia Dollar'),
-    "NGN": Currency("NGN", "566", 2, 'Naira'),
-    "NIO": Currency("NIO", "558", 2, 'Cordoba Oro'),
-    "NOK": Currency("NOK", "578", 2, 'Norwegian Krone'),
-    "NPR": Currency("NPR", "524", 2, 'Nepalese Rupee'),
-    "NZD": Currency("NZD", "554", 2, 'New Zealand Dollar'),
-    "OMR": Currency("OMR", "512", 3, 'Rial Omani'),
-    "PAB": Currency("PAB", "590", 2, 'Balboa'),
-    "PEN": Currency("PEN", "604", 2, 'Sol'),
-    "PGK": Currency("PGK", "598", 2, 'Kina'),
-    "PHP": Currency("PHP", "608", 2, 'Philippine Peso'),
-    "PKR": Currency("PKR", "586", 2, 'Pakistan Rupee'),
-    "PLN": Currency("PLN", "985", 2, 'Zloty'),
-    "PYG": Currency("PYG", "600", 0, 'Guarani'),
-    "QAR": Currency("QAR", "634", 2, 'Qatari Rial'),
-    "RON": Currency("RON", "946", 2, 'New Romanian Leu'),
-    "RSD": Currency("RSD", "941", 2, 'Serbian Dinar'),
-    "RUB": Currency("RUB", "643", 2, 'Russian Ruble'),
-    "RWF": Currency("RWF", "646", 0, 'Rwanda Franc'),
-    "SAR": Currency("SAR", "682", 2, 'Saudi Riyal'),
-    "SBD": Currency("SBD", "090", 2, 'Solomon Islands Dollar'),
-    "SCR": Currency("SCR", "690", 2, 'Seychelles Rupee'),
-    "SDG": Currency("SDG", "938", 2, 'Sudanese Pound'),
-    "SEK": Currency("SEK", "752", 2, 'Swedish Krona'),
-    "SGD": Currency("SGD", "702", 2, 'Singapore Dollar'),
-    "SHP": Currency("SHP", "654", 2, 'Saint Helena Pound'),
-    "SLL": Currency("SLL", "694", 2, 'Leone'),
-    "SOS": Currency("SOS", "706", 2, 'Somali Shilling'),
-    "SRD": Currency("SRD", "968", 2, 'Surinam Dollar'),
-    "SSP": Currency("SSP", "728", 2, 'South Sudanese Pound'),
-    "STD": Currency("STD", "678", 2, 'Dobra'),
-    "SVC": Currency("SVC", "222", 2, 'El Salvador Colon'),
-    "SYP": Currency("SYP", "760", 2, 'Syrian Pound'),
-    "SZL": Currency("SZL", "748", 2, 'Lilangeni'),
-    "THB": Currency("THB", "764", 2, 'Baht'),
-    "TJS": Currency("TJS", "972", 2, 'Somoni'),
-    "TMT": Currency("TMT", "934", 2, 'Turkmenistan New Manat'),
-    "TND": Currency("TND", "788", 3, 'Tunisian Dinar'),
-    "TOP": Currency("TOP", "776", 2, 'Pa\'anga'),
-    "TRY": Currency("TRY", "949", 2, 'Turkish Lira'),
-    "TTD": Currency("TTD", "780", 2, 'Trinidad and Tobago Dollar'),
-    "TWD": Currency("TWD", "901", 2, 'New Taiwan Dollar'),
-    "TZS": Currency("TZS", "834", 2, 'Tanzanian Shilling'),
-    "UAH": Currency("UAH", "980", 2, 'Hryvnia'),
-    "UGX": Currency("UGX", "800", 0, 'Uganda Shilling'),
-    "USD": Currency("USD", "840", 2, 'US Dollar'),
-    "UYI": Currency("UYI", "940", 0, 'Uruguay Peso en Unidades Indexadas (URUIURUI)'),
-    "UYU": Currency("UYU", "858", 2, 'Peso Uruguayo'),
-    "UZS": Currency("UZS", "860", 2, 'Uzbekistan Sum'),
-    "VEF": Currency("VEF", "937", 2, 'Bolivar'),
-    "VND": Currency("VND", "704", 0, 'Dong'),
-    "VUV": Currency("VUV", "548", 0, 'Vatu'),
-    "WST": Currency("WST", "882", 2, 'Tala'),
-    "XAF": Currency("XAF", "950", 0, 'CFA Franc BEAC'),
-    "XCD": Currency("XCD", "951", 2, 'East Caribbean Dollar'),
-    "XOF": Currency("XOF", "952", 0, 'CFA Franc BCEAO'),
-    "XPF": Currency("XPF", "953", 0, 'CFP Franc'),
-    "YER": Currency("YER", "886", 2, 'Yemeni Rial'),
-    "ZAR": Currency("ZAR", "710", 2, 'Rand'),
-    "ZMW": Currency("ZMW", "967", 2, 'Zambian Kwacha'),
-    "ZWL": Currency("ZWL", "932", 2, 'Zimbabwe Dollar'),
-    # Why not?
-    "XBT": Currency("XBT", None, 8, "Bitcoin"),
-}
+currencies = _LazyCurrencies(_definitions, _version)
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from .amount import Amount, _ZeroAmount
+from .arrays import AmountArray
+from .currency import Currency, get_currency
+from .rate import Rate
+
+
+def _resolve(currency):
+    """
+    Returns the registry Currency for a Currency or currency code.
+    """
+    if isinstance(currency, Currency):
+        return currency
+    return get_currency(currency)
+
+
+class RateTable(object):
+    """
+    A table of spot exchange rates keyed by currency pair.
+
+    Rates have the same meaning as the rate passed to
+    Amount.convert_currency: new = old * rate. Rates for pairs that were
+    not set directly are derived from the inverse pair, or as a cross rate
+    through the pivot currency, and kept in a bounded LRU cache until a
+    rate they might depend on changes.
+
+    If major is True, rates are quoted between major units instead (as
+    with Amount.convert_currency's major argument), and converting
+    accounts for each pair's differing minor units.
+    """
+
+    def __init__(self, pivot="USD", max_cached=1024, major=False):
+        if max_cached < 1:
+            raise ValueError("max_cached must be at least 1")
+        self.pivot = _resolve(pivot)
+        self.max_cached = max_cached
+        self.major = major
+        self._spot = {}
+        self._cache = OrderedDict()
+
+    def __repr__(self):
+        return "<RateTable %s spot rates, pivot %s>" % (len(self._spot), self.pivot)
+
+    def set_rate(self, from_currency, to_currency, rate):
+        """
+        Sets the spot rate between two currencies (codes or Currency objects).
+        """
+        self.update({(from_currency, to_currency): rate})
+
+    def update(self, rates):
+        """
+        Sets many spot rates at once, from a dict of
+        (from_currency, to_currency): rate.
+        """
+        changed = set()
+        for (from_currency, to_currency), rate in rates.items():
+            source = _resolve(from_currency)
+            target = _resolve(to_currency)
+            if source == target:
+                raise ValueError("You cannot set a rate from %s to itself" % source)
+            self._spot[(source, target)] = Rate(rate)
+            changed.update((source, target))
+        self.invalidate(*changed)
+
+    def invalidate(self, *changed):
+        """
+        Drops cached rates involving any of the given currencies (codes or
+        Currency objects), or every cached rate if none are given.
+        """
+        if not changed:
+            self._cache.clear()
+            return
+        changed = set(_resolve(currency) for currency in changed)
+        if self.pivot in changed:
+            # Every cross rate goes through the pivot
+            self._cache.clear()
+            return
+        for key in list(self._cache):
+            if key[0] in changed or key[1] in changed:
+                del self._cache[key]
+
+    def _leg(self, source, target):
+        """
+        Returns a rate set directly or as its inverse, or None.
+        """
+        rate = self._spot.get((source, target))
+        if rate is not None:
+            return rate
+        rate = self._spot.get((target, source))
+        if rate is not None:
+            return rate.inverse()
+        return None
+
+    def get_rate(self, from_currency, to_currency):
+        """
+        Returns the Rate converting from one currency to another, as quoted
+        (so between major units, if the table is in major mode).
+        """
+        return self._rates(_resolve(from_currency), _resolve(to_currency))[0]
+
+    def get_minor_rate(self, from_currency, to_currency):
+        """
+        Returns the Rate that converts minor unit values from one currency
+        to another, as convert applies it (the same as get_rate unless the
+        table is in major mode).
+        """
+        return self._rates(_resolve(from_currency), _resolve(to_currency))[1]
+
+    def _rates(self, source, target):
+        """
+        Returns a cached (quoted rate, rate between minor units) pair.
+        """
+        key = (source, target)
+        cache = self._cache
+        rates = cache.pop(key, None)
+        if rates is None:
+            rate = self._derive(source, target)
+            rates = (rate, rate.minor_rate(source, target) if self.major else rate)
+            if len(cache) >= self.max_cached:
+                cache.popitem(last=False)
+        cache[key] = rates
+        return rates
+
+    def _derive(self, source, target):
+        if source == target:
+            return Rate(1)
+        rate = self._leg(source, target)
+        if rate is not None:
+            return rate
+        first = self._leg(source, self.pivot)
+        second = self._leg(self.pivot, target)
+        if first is None or second is None:
+            raise ValueError("No rate available from %s to %s" % (source, target))
+        return first * second
+
+    def convert(self, amount, to_currency):
+        """
+        Converts an Amount into another currency.
+        """
+        if amount is _ZeroAmount.instance:
+            return amount
+        target = _resolve(to_currency)
+        rate = self._rates(amount.currency, target)[1]
+        return Amount._from_trusted(target, rate.apply(amount.value))
+
+    def convert_many(self, amounts, to_currency):
+        """
+        Converts a batch into another currency. Given an AmountArray, returns
+        an AmountArray; given any other iterable of Amounts, returns a list.
+
+        The target currency is resolved, and each source currency's rate
+        looked up, only once per batch.
+        """
+        target = _resolve(to_currency)
+        if isinstance(amounts, AmountArray):
+            rate = self._rates(amounts.currency, target)[1]
+            return AmountArray(target, rate.apply_many(amounts.tolist()))
+        rates = {}
+        converted = []
+        append = converted.append
+        for amount in amounts:
+            if amount is _ZeroAmount.instance:
+                append(amount)
+                continue
+            currency = amount.currency
+            rate = rates.get(currency)
+            if rate is None:
+                rate = rates[currency] = self._rates(currency, target)[1]
+            append(Amount._from_trusted(target, rate.apply(amount.value)))
+        return converted
@@ -0,0 +1,295 @@
+from __future__ import absolute_import
+import array
+import io
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import six
+from . import arrays
+from .amount import _ZeroAmount
+from .arrays import AmountArray, MultiCurrencyAmountArray
+from .currency import currency_codes, currency_indices
+
+# A ledger file is, in order:
+#
+#   a 32-byte header (see HEADER),
+#   the value column: one little-endian int64 minor unit value per row,
+#   the index column: one little-endian uint16 currency index per row,
+#   zero padding to a multiple of 8 bytes,
+#   the codes table: one NUL-padded 8-byte ASCII currency code per index.
+#
+# Every column is fixed width, so a reader can map the file and use the
+# columns in place.
+MAGIC = b"CURRINT\x00"
+VERSION = 1
+# Magic, version, unused, number of codes, number of rows, unused
+HEADER = struct.Struct("<8sHHIQ8x")
+CODE_SIZE = 8
+INVALID_INDEX = 0xffff
+
+# How many rows the writer buffers before writing them out
+WRITE_CHUNK_SIZE = 65536
+
+
+def _column_bytes(buffer, typecode):
+    """
+    Returns the bytes of a buffer of integers as a little-endian column of
+    the given array typecode.
+    """
+    numpy = arrays._numpy()
+    if numpy is not None and isinstance(buffer, numpy.ndarray):
+        return buffer.astype("<u2" if typecode == "H" else "<i8", copy=False).tobytes()
+    if not isinstance(buffer, array.array) or buffer.typecode != typecode:
+        buffer = array.array(typecode, buffer)
+    if sys.byteorder == "big":  # pragma: no cover
+        buffer = array.array(typecode, buffer)
+        buffer.byteswap()
+    return buffer.tobytes() if six.PY3 else buffer.tostring()
+
+
+class LedgerWriter(object):
+    """
+    Writes Amounts to a ledger file, a columnar on-disk format that
+    LedgerReader can memory-map.
+
+    Rows are streamed to disk as they are written; the index column is
+    spooled to a temporary file until close(), when it is appended. Used
+    as a context manager, the file is only finalised if the block
+    succeeds; if it raises, the partial file is removed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._file = io.open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._index_file = tempfile.TemporaryFile()
+        self._values = arrays._int64_array()
+        self._indices = array.array("H")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, amount):
+        "Writes a single Amount"
+        self.write_many([amount])
+
+    def write_many(self, amounts):
+        """
+        Writes an iterable of Amounts, an AmountArray or a
+        MultiCurrencyAmountArray. Arrays are written column by column,
+        without creating any Amounts.
+        """
+        if isinstance(amounts, MultiCurrencyAmountArray):
+            self._flush()
+            self._write_columns(amounts.values, amounts.indices)
+            return
+        if isinstance(amounts, AmountArray):
+            self._flush()
+            index = self._index(amounts.currency)
+            self._write_columns(amounts.values, array.array("H", [index]) * len(amounts))
+            return
+        values = self._values
+        indices = self._indices
+        last_currency = None
+        for amount in amounts:
+            if amount is _ZeroAmount.instance:
+                raise ValueError("Amount.ZERO has no currency and cannot be stored in a ledger")
+            if amount.currency is not last_currency:
+                last_currency = amount.currency
+                index = self._index(last_currency)
+            values.append(amount.value)
+            indices.append(index)
+            if len(values) >= WRITE_CHUNK_SIZE:
+                self._flush()
+
+    def _index(self, currency):
+        """
+        Returns the currency index to store for a Currency.
+        """
+        try:
+            return currency_indices[currency.code]
+        except KeyError:
+            raise ValueError("Invalid currency code %s" % currency.code)
+
+    def _write_columns(self, values, indices):
+        self._file.write(_column_bytes(values, arrays.INT64_TYPECODE))
+        self._index_file.write(_column_bytes(indices, "H"))
+        self.rows += len(values)
+
+    def _flush(self):
+        if self._values:
+            self._write_columns(self._values, self._indices)
+            del self._values[:]
+            del self._indices[:]
+
+    def close(self):
+        """
+        Writes out the index column, codes table and header, and closes the file.
+        """
+        if self._file.closed:
+            return
+        self._flush()
+        self._index_file.seek(0)
+        shutil.copyfileobj(self._index_file, self._file)
+        self._index_file.close()
+        self._file.write(b"\x00" * (-self.rows * 2 % 8))
+        codes = list(currency_codes)
+        for code in codes:
+            encoded = code.encode("ascii")
+            if len(encoded) > CODE_SIZE:
+                raise ValueError("Currency code %s is too long to store in a ledger" % code)
+            self._file.write(encoded.ljust(CODE_SIZE, b"\x00"))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(codes), self.rows))
+        self._file.close()
+
+    def discard(self):
+        """
+        Closes and removes the file without finalising it.
+        """
+        if self._file.closed:
+            return
+        self._index_file.close()
+        self._file.close()
+        os.remove(self.path)
+
+
+class LedgerReader(object):
+    """
+    Reads a ledger file by memory-mapping it.
+
+    The columns are used in place: `values` and `indices` are NumPy arrays
+    (or, without NumPy, memoryviews) over the mapped file, and `array` is a
+    MultiCurrencyAmountArray over them, so totals and filters run straight
+    over the file. Amounts are only created for rows that are accessed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with io.open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError("%s is not a ledger file" % self.path)
+        magic, version, _, code_count, rows = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a ledger file" % self.path)
+        if version != VERSION:
+            raise ValueError("Unsupported ledger version %s" % version)
+        values_offset = HEADER.size
+        indices_offset = values_offset + rows * 8
+        codes_offset = indices_offset + rows * 2 + (-rows * 2 % 8)
+        if len(self._map) != codes_offset + code_count * CODE_SIZE:
+            raise ValueError("%s is truncated or corrupt" % self.path)
+        self.codes = [
+            self._map[position:position + CODE_SIZE].rstrip(b"\x00").decode("ascii")
+            for position in range(codes_offset, codes_offset + code_count * CODE_SIZE, CODE_SIZE)
+        ]
+        self.values = self._column(values_offset, rows, arrays.INT64_TYPECODE)
+        self.indices = self._column(indices_offset, rows, "H")
+        if self.codes != currency_codes[:len(self.codes)]:
+            # Written by a process with a different registry; translate to
+            # ours. Codes we don't know are only an error if rows use them.
+            table = [currency_indices.get(code, INVALID_INDEX) for code in self.codes]
+            numpy = arrays._numpy()
+            if numpy is not None and isinstance(self.indices, numpy.ndarray):
+                present = numpy.unique(self.indices).tolist()
+            else:
+                present = sorted(set(self.indices))
+            if present and present[-1] >= code_count:
+                raise ValueError("%s is truncated or corrupt" % self.path)
+            missing = [self.codes[index] for index in present if table[index] == INVALID_INDEX]
+            if missing:
+                raise ValueError("Unknown currency codes in %s: %s" % (self.path, ", ".join(missing)))
+            if numpy is not None and isinstance(self.indices, numpy.ndarray):
+                self.indices = numpy.array(table, dtype=numpy.uint16)[self.indices]
+            else:
+                self.indices = array.array("H", [table[index] for index in self.indices])
+        self.array = MultiCurrencyAmountArray(self.indices, self.values)
+
+    def _column(self, offset, count, typecode):
+        """
+        Returns a view of a column of the mapped file.
+        """
+        numpy = arrays._numpy()
+        if numpy is not None:
+            dtype = numpy.dtype("<u2" if typecode == "H" else "<i8")
+            column = numpy.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+            return column.astype(dtype.newbyteorder("="), copy=False)
+        size = array.array(typecode).itemsize
+        data = self._map[offset:offset + count * size] if six.PY2 else memoryview(self._map)[offset:offset + count * size]
+        if six.PY2 or sys.byteorder == "big":  # pragma: no cover
+            column = array.array(typecode, bytes(data))
+            if sys.byteorder == "big":
+                column.byteswap()
+            return column
+        return data.cast(typecode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Releases our views of the file and unmaps it. If views handed out
+        (e.g. `values`) are still referenced, the mapping stays alive until
+        they are garbage collected.
+        """
+        for name in ("array", "values", "indices"):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                try:
+                    view.release()
+                except BufferError:
+                    # Still in use by a slice taken from it
+                    pass
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __repr__(self):
+        return "<LedgerReader %s (%s rows)>" % (self.path, len(self))
+
+    def codes_present(self):
+        "Returns the currency codes present in the ledger"
+        return self.array.codes()
+
+    def totals(self):
+        "Returns a dict of currency code to the total Amount of that currency"
+        return self.array.totals()
+
+    def for_currency(self, currency_code):
+        "Returns the values of a single currency as an AmountArray"
+        return self.array.for_currency(currency_code)
+
+    def filter(self, mask):
+        "Returns the rows where mask is true as a MultiCurrencyAmountArray"
+        return self.array.filter(mask)
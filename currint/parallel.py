@@ -0,0 +1,190 @@
+from __future__ import absolute_import
+import array
+from . import arrays
+from .arrays import AmountArray, MultiCurrencyAmountArray
+from .amount import Amount
+from .currency import Currency, currencies, currency_codes, currency_indices
+from .fx import _resolve
+from .rate import Rate
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:  # pragma: no cover
+    # Python 2 needs the "futures" backport
+    ProcessPoolExecutor = None
+
+# How many rows go to a worker in each task
+SHARD_SIZE = 262144
+
+
+def _as_array(amounts):
+    """
+    Returns a batch as a MultiCurrencyAmountArray; it can be one already,
+    or an iterable of (currency code, minor value) pairs.
+    """
+    if isinstance(amounts, MultiCurrencyAmountArray):
+        return amounts
+    pairs = list(amounts)
+    return MultiCurrencyAmountArray.from_codes_and_minor(
+        [code for code, _ in pairs],
+        [value for _, value in pairs],
+    )
+
+
+def _to_bytes(buffer):
+    "Returns the raw bytes of a NumPy array, array.array or memoryview"
+    if isinstance(buffer, array.array):
+        return buffer.tobytes() if hasattr(buffer, "tobytes") else buffer.tostring()
+    return buffer.tobytes()
+
+
+def _from_bytes(typecode, data):
+    "Rebuilds an array.array from bytes made by _to_bytes"
+    buffer = array.array(typecode)
+    if hasattr(buffer, "frombytes"):
+        buffer.frombytes(data)
+    else:  # pragma: no cover
+        buffer.fromstring(data)
+    return buffer
+
+
+def _shards(batch, shard_size):
+    """
+    Yields (index bytes, value bytes) for each shard of a batch; workers
+    get compact int16/int64 columns rather than pickled Amounts.
+    """
+    for start in range(0, len(batch), shard_size):
+        yield (
+            _to_bytes(batch.indices[start:start + shard_size]),
+            _to_bytes(batch.values[start:start + shard_size]),
+        )
+
+
+def _run(function, batch, extra, executor, workers, shard_size):
+    """
+    Runs function(index bytes, value bytes, *extra) over every shard in the
+    executor (or a new process pool), returning the results in shard order.
+    """
+    shards = list(_shards(batch, shard_size))
+    if not shards:
+        return []
+    arguments = [list(column) for column in zip(*shards)]
+    arguments.extend([argument] * len(shards) for argument in extra)
+    if executor is not None:
+        return list(executor.map(function, *arguments))
+    if ProcessPoolExecutor is None:  # pragma: no cover
+        raise ImportError("Parallel operations need concurrent.futures (the futures package on Python 2)")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, *arguments))
+
+
+def _total_shard(index_data, value_data):
+    """
+    Worker: returns a dict of currency index to the exact total of a shard.
+    """
+    numpy = arrays._numpy()
+    if numpy is not None:
+        indices = numpy.frombuffer(index_data, dtype=numpy.uint16)
+        values = numpy.frombuffer(value_data, dtype=numpy.int64)
+        return dict(
+            (index, arrays._safe_sum(values[indices == index]))
+            for index in numpy.unique(indices).tolist()
+        )
+    indices = _from_bytes("H", index_data)
+    values = _from_bytes(arrays.INT64_TYPECODE, value_data)
+    sums = {}
+    get = sums.get
+    for index, value in zip(indices, values):
+        sums[index] = get(index, 0) + value
+    return sums
+
+
+def totals(amounts, executor=None, workers=None, shard_size=SHARD_SIZE):
+    """
+    Returns a dict of currency code to the total Amount of that currency,
+    like MultiCurrencyAmountArray.totals, with the shards totalled in
+    parallel.
+
+    amounts is a MultiCurrencyAmountArray or an iterable of (currency code,
+    minor value) pairs. Work runs in the given concurrent.futures executor,
+    or a new process pool of `workers` processes.
+    """
+    batch = _as_array(amounts)
+    sums = {}
+    for shard_sums in _run(_total_shard, batch, (), executor, workers, shard_size):
+        for index, value in shard_sums.items():
+            sums[index] = sums.get(index, 0) + value
+    return dict(
+        (currency_codes[index], Amount(currencies[currency_codes[index]], value))
+        for index, value in sums.items()
+    )
+
+
+def _convert_shard(index_data, value_data, rates):
+    """
+    Worker: converts a shard with a (numerator, denominator) minor unit
+    rate per currency index, returning int64 bytes.
+    """
+    indices = _from_bytes("H", index_data)
+    values = _from_bytes(arrays.INT64_TYPECODE, value_data)
+    positions = {}
+    for position, index in enumerate(indices):
+        positions.setdefault(index, []).append(position)
+    converted = arrays._int64_array([0]) * len(values)
+    for index, rows in positions.items():
+        rate = Rate._from_fraction(*rates[index])
+        results = rate.apply_many([values[row] for row in rows])
+        try:
+            for row, result in zip(rows, results):
+                converted[row] = result
+        except OverflowError:
+            raise OverflowError("Result does not fit in a 64-bit minor unit value")
+    return _to_bytes(converted)
+
+
+def convert(amounts, rate_table, to_currency, executor=None, workers=None, shard_size=SHARD_SIZE):
+    """
+    Converts a batch (as for totals) into one currency using a RateTable,
+    returning an AmountArray. Rates are looked up once, up front, so every
+    worker uses exactly the same ones.
+    """
+    batch = _as_array(amounts)
+    target = _resolve(to_currency)
+    rates = {}
+    for code in batch.codes():
+        rate = rate_table.get_minor_rate(currencies[code], target)
+        rates[currency_indices[code]] = (rate.numerator, rate.denominator)
+    converted = arrays._int64_array()
+    for data in _run(_convert_shard, batch, (rates, ), executor, workers, shard_size):
+        converted.extend(_from_bytes(arrays.INT64_TYPECODE, data))
+    return AmountArray(target, converted)
+
+
+def _format_shard(index_data, value_data, formats, sep):
+    """
+    Worker: formats a shard, given (prefix, suffix, exponent, divisor) for
+    each index. Plain tuples rather than Currencies, since those unpickle
+    through the worker's own (possibly different) registry.
+    """
+    indices = _from_bytes("H", index_data)
+    values = _from_bytes(arrays.INT64_TYPECODE, value_data)
+    formatters = {}
+    for index, (prefix, suffix, exponent, divisor) in formats.items():
+        currency = Currency(
+            "", None, exponent, divisor=None if exponent is not None else divisor, prefix=prefix, suffix=suffix,
+        )
+        formatters[index] = currency.format
+    return sep.join([formatters[index](value) for index, value in zip(indices, values)])
+
+
+def format_many(amounts, sep="\n", executor=None, workers=None, shard_size=SHARD_SIZE):
+    """
+    Formats a batch (as for totals) as Currency.format would, separated by
+    sep, returning a single string.
+    """
+    batch = _as_array(amounts)
+    formats = {}
+    for code in batch.codes():
+        currency = currencies[code]
+        formats[currency_indices[code]] = (currency.prefix, currency.suffix, currency.exponent, currency.divisor)
+    return sep.join(_run(_format_shard, batch, (formats, sep), executor, workers, shard_size))
@@ -0,0 +1,62 @@
+# encoding: utf8
+import six
+from decimal import Decimal, InvalidOperation
+from .currency import get_currency
+
+
+def _parse_decimal(currency, value):
+    """
+    Converts a major unit value to minor units the same way as
+    Amount.from_code_and_major, via Decimal.
+    """
+    try:
+        return currency.major_to_minor(Decimal(value))
+    except InvalidOperation:
+        raise ValueError("Invalid currency value %s" % value)
+
+
+def parse_major_stream(currency_code, values):
+    """
+    Parses an iterable of major unit values (e.g. "1.43") of a single currency
+    into integer values of its minor unit, yielding one integer per value.
+
+    Plain decimal strings are split on the decimal point and converted with
+    integer arithmetic; anything else (exponents, non-decimal currencies,
+    non-string values) goes through the same Decimal path as
+    Amount.from_code_and_major, so errors are identical.
+    """
+    currency = get_currency(currency_code)
+    exponent = currency.exponent
+    if exponent is None:
+        # Custom divisors don't map onto decimal digits
+        for value in values:
+            yield _parse_decimal(currency, value)
+        return
+    divisor = currency.divisor
+    # Multiplier for a fraction with a given number of digits
+    scales = [10 ** (exponent - length) for length in range(exponent + 1)]
+    for value in values:
+        if not isinstance(value, six.string_types):
+            yield _parse_decimal(currency, value)
+            continue
+        text = value.strip()
+        sign = text[:1]
+        if sign == "-" or sign == "+":
+            text = text[1:]
+        whole, _, fraction = text.partition(".")
+        if len(fraction) > exponent:
+            # Trailing zeros beyond the exponent are fine ("1.230" GBP)
+            fraction = fraction.rstrip("0")
+        if len(fraction) <= exponent and (whole + fraction).isdigit():
+            try:
+                minor = int(whole or "0") * divisor
+                if fraction:
+                    minor += int(fraction) * scales[len(fraction)]
+            except ValueError:
+                # isdigit() accepts some characters int() doesn't, like "²"
+                yield _parse_decimal(currency, value)
+                continue
+            yield -minor if sign == "-" else minor
+        else:
+            # Leave every error (and every unusual format) to Decimal
+            yield _parse_decimal(currency, value)
@@ -0,0 +1,176 @@
+import six
+from decimal import (
+    Decimal, InvalidOperation, ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
+    ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP,
+)
+from fractions import Fraction
+
+
+def round_divide(numerator, denominator, rounding=ROUND_HALF_UP):
+    """
+    Divides two integers, rounding the result to an integer using one of
+    the decimal module's rounding modes. Uses only integer arithmetic.
+    """
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    if not remainder:
+        return quotient
+    # The exact result lies strictly between quotient and quotient + 1
+    negative = numerator < 0
+    if rounding == ROUND_HALF_UP or rounding == ROUND_HALF_DOWN or rounding == ROUND_HALF_EVEN:
+        twice = remainder * 2
+        if twice < denominator:
+            return quotient
+        if twice > denominator:
+            return quotient + 1
+        if rounding == ROUND_HALF_UP:
+            return quotient if negative else quotient + 1
+        if rounding == ROUND_HALF_DOWN:
+            return quotient + 1 if negative else quotient
+        return quotient + (quotient & 1)
+    if rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + 1
+    toward_zero, away_from_zero = (quotient + 1, quotient) if negative else (quotient, quotient + 1)
+    if rounding == ROUND_DOWN:
+        return toward_zero
+    if rounding == ROUND_UP:
+        return away_from_zero
+    if rounding == ROUND_05UP:
+        return away_from_zero if toward_zero % 5 == 0 else toward_zero
+    raise ValueError("Unknown rounding mode %s" % rounding)
+
+
+@six.python_2_unicode_compatible
+class Rate(object):
+    """
+    An exact multiplier (e.g. an exchange rate), held as an integer
+    numerator and denominator so that applying it only needs integer
+    multiplication and a rounding division.
+    """
+
+    __slots__ = ("numerator", "denominator")
+
+    def __init__(self, value):
+        """
+        Initialises the Rate from an integer, Decimal, Fraction, another
+        Rate, or a string in any format Decimal accepts (e.g. "1.2734").
+        Floats are rejected as imprecise; pass their string form instead.
+        """
+        if isinstance(value, Rate):
+            fraction = Fraction(value.numerator, value.denominator)
+        elif isinstance(value, six.integer_types + (Decimal, Fraction)):
+            if isinstance(value, Decimal) and not value.is_finite():
+                raise ValueError("Invalid rate %s" % value)
+            fraction = Fraction(value)
+        elif isinstance(value, six.string_types):
+            try:
+                decimal = Decimal(value)
+            except InvalidOperation:
+                raise ValueError("Invalid rate %s" % value)
+            if not decimal.is_finite():
+                raise ValueError("Invalid rate %s" % value)
+            fraction = Fraction(decimal)
+        else:
+            raise ValueError("A Rate can only be made from an integer, long, Decimal, Fraction or string")
+        self.numerator = fraction.numerator
+        self.denominator = fraction.denominator
+
+    @classmethod
+    def _from_fraction(cls, numerator, denominator):
+        """
+        Initialises the Rate from an integer ratio, reducing it.
+        """
+        fraction = Fraction(numerator, denominator)
+        rate = cls.__new__(cls)
+        rate.numerator = fraction.numerator
+        rate.denominator = fraction.denominator
+        return rate
+
+    def __eq__(self, other):
+        if not isinstance(other, Rate):
+            return False
+        return self.numerator == other.numerator and self.denominator == other.denominator
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        return hash((self.numerator, self.denominator))
+
+    def __getstate__(self):
+        return (self.numerator, self.denominator)
+
+    def __setstate__(self, state):
+        self.numerator, self.denominator = state
+
+    def __str__(self):
+        return "%s/%s" % (self.numerator, self.denominator)
+
+    def __repr__(self):
+        return "<Rate %s/%s>" % (self.numerator, self.denominator)
+
+    def __mul__(self, other):
+        if not isinstance(other, Rate):
+            return NotImplemented
+        return Rate._from_fraction(self.numerator * other.numerator, self.denominator * other.denominator)
+
+    def inverse(self):
+        "Returns the Rate that undoes this one (1 / rate)"
+        if not self.numerator:
+            raise ZeroDivisionError("A zero rate has no inverse")
+        return Rate._from_fraction(self.denominator, self.numerator)
+
+    def minor_rate(self, from_currency, to_currency):
+        """
+        Treating this as a rate between major units (e.g. 150 JPY per USD),
+        returns the equivalent rate between the two Currencies' minor units
+        (1.5 JPY per cent), scaling by their divisors exactly.
+        """
+        return Rate._from_fraction(
+            self.numerator * to_currency.divisor,
+            self.denominator * from_currency.divisor,
+        )
+
+    def to_decimal(self):
+        "Returns the rate as a Decimal (rounded to the current context if inexact)"
+        return Decimal(self.numerator) / self.denominator
+
+    def apply(self, value, rounding=ROUND_HALF_UP):
+        """
+        Multiplies an integer value by the rate and rounds the result to an
+        integer with the given decimal rounding mode.
+        """
+        if not isinstance(value, six.integer_types):
+            raise ValueError("You can only apply a Rate to an integer or a long")
+        if self.denominator == 1:
+            return value * self.numerator
+        return round_divide(value * self.numerator, self.denominator, rounding)
+
+    def apply_many(self, values, rounding=ROUND_HALF_UP):
+        """
+        Applies the rate to every integer in an iterable, returning a list.
+        """
+        numerator = self.numerator
+        denominator = self.denominator
+        values = list(values)
+        for value in values:
+            if not isinstance(value, six.integer_types):
+                raise ValueError("You can only apply a Rate to an integer or a long")
+        if denominator == 1:
+            return [value * numerator for value in values]
+        if rounding == ROUND_HALF_UP:
+            # The common case, inlined: floor((2 * |x| + d) / 2d), signed
+            twice = denominator * 2
+            result = []
+            append = result.append
+            for value in values:
+                product = value * numerator
+                if product < 0:
+                    append(-((-product * 2 + denominator) // twice))
+                else:
+                    append((product * 2 + denominator) // twice)
+            return result
+        return [round_divide(value * numerator, denominator, rounding) for value in values]
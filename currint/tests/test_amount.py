@@ -1,10 +1,14 @@
 # encoding: utf8
 from __future__ import unicode_literals
+import copy
+import pickle
+import random
 import six
 from decimal import Decimal
+from fractions import Fraction
 from unittest import TestCase
 from ..currency import currencies, Currency
-from ..amount import Amount, _ZeroAmount
+from ..amount import Amount, _ZeroAmount, total, totals_by_currency
 
 
 class AmountTests(TestCase):
@@ -34,6 +38,10 @@ class AmountTests(TestCase):
         )
         with self.assertRaises(ValueError):
             Amount(currencies["GBP"], 132) + Amount(currencies["USD"], 100)
+        with self.assertRaises(TypeError):
+            Amount(currencies["GBP"], 132) + 100
+        with self.assertRaises(TypeError):
+            Amount.ZERO + 100
 
     def test_subtract(self):
         self.assertEqual(
@@ -114,6 +122,18 @@ class AmountTests(TestCase):
         with self.assertRaises(ValueError):
             Amount.from_code_and_minor("WAITWHAT", 100)
 
+    def test_from_numeric_and_minor(self):
+        for numeric_code in (826, "826", "0826"):
+            amount = Amount.from_numeric_and_minor(numeric_code, 300)
+            self.assertEqual(amount, Amount(currencies["GBP"], 300))
+            self.assertIs(amount.currency, currencies["GBP"])
+        self.assertEqual(Amount.from_numeric_and_minor("008", 1), Amount(currencies["ALL"], 1))
+        for numeric_code in (999, "WAT", None):
+            with self.assertRaises(ValueError):
+                Amount.from_numeric_and_minor(numeric_code, 100)
+        with self.assertRaises(NotImplementedError):
+            Amount.ZERO.from_numeric_and_minor(826, 1)
+
     def test_from_code_and_major(self):
         self.assertEqual(
             Amount.from_code_and_major("GBP", "3.00"),
@@ -138,6 +158,26 @@ class AmountTests(TestCase):
         with self.assertRaises(ValueError):
             Amount.from_code_and_major("GBP", "aaaaaaah")
 
+    def test_from_minor_many(self):
+        amounts = Amount.from_minor_many("gbp", [300, -5, 0])
+        self.assertEqual(
+            amounts,
+            [
+                Amount(currencies["GBP"], 300),
+                Amount(currencies["GBP"], -5),
+                Amount(currencies["GBP"], 0),
+            ],
+        )
+        self.assertIs(amounts[0].currency, currencies["GBP"])
+        self.assertEqual(Amount.from_minor_many("GBP", iter([])), [])
+        with self.assertRaises(ValueError):
+            Amount.from_minor_many("WAITWHAT", [100])
+
+    def test_from_trusted(self):
+        amount = Amount._from_trusted(currencies["GBP"], 300)
+        self.assertIs(type(amount), Amount)
+        self.assertEqual(amount, Amount(currencies["GBP"], 300))
+
     def test_to_major_decimal(self):
         self.assertEqual(
             Amount(currencies["GBP"], 300).to_major_decimal(),
@@ -188,6 +228,138 @@ class AmountTests(TestCase):
         with self.assertRaises(ValueError):
             Amount(currencies["GBP"], 300).integral_division(301)
 
+    def test_integral_division_large(self):
+        # Above 2**53 a float round-trip loses precision
+        value = 2 ** 60 + 3
+        self.assertEqual(
+            Amount(currencies["XBT"], value * 3).integral_division(3),
+            Amount(currencies["XBT"], value),
+        )
+        with self.assertRaises(ValueError):
+            Amount(currencies["XBT"], value * 3 + 1).integral_division(3)
+        self.assertEqual(
+            Amount(currencies["XBT"], -value * 7).integral_division(-7),
+            Amount(currencies["XBT"], value),
+        )
+        with self.assertRaises(ZeroDivisionError):
+            Amount(currencies["GBP"], 300).integral_division(0)
+
+    def test_integral_division_matches_reference(self):
+        rng = random.Random(4217)
+        for _ in range(1000):
+            divisor = rng.choice([-1, 1]) * rng.randrange(1, 10 ** rng.randrange(1, 12))
+            quotient = rng.randrange(-10 ** 30, 10 ** 30)
+            value = quotient * divisor + rng.choice([0, 0, rng.randrange(abs(divisor))])
+            reference = Fraction(value, divisor)
+            if reference.denominator == 1:
+                self.assertEqual(
+                    Amount(currencies["GBP"], value).integral_division(divisor).value,
+                    reference.numerator,
+                )
+            else:
+                with self.assertRaises(ValueError):
+                    Amount(currencies["GBP"], value).integral_division(divisor)
+
+    def test_divmod(self):
+        self.assertEqual(
+            divmod(Amount(currencies["GBP"], 301), 3),
+            (Amount(currencies["GBP"], 100), Amount(currencies["GBP"], 1)),
+        )
+        self.assertEqual(
+            divmod(Amount(currencies["GBP"], -301), 3),
+            (Amount(currencies["GBP"], -101), Amount(currencies["GBP"], 2)),
+        )
+        with self.assertRaises(ValueError):
+            divmod(Amount(currencies["GBP"], 301), 2.5)
+        with self.assertRaises(ZeroDivisionError):
+            divmod(Amount(currencies["GBP"], 301), 0)
+        rng = random.Random(4217)
+        for _ in range(1000):
+            value = rng.randrange(-10 ** 30, 10 ** 30)
+            divisor = rng.choice([-1, 1]) * rng.randrange(1, 10 ** rng.randrange(1, 20))
+            quotient, remainder = divmod(Amount(currencies["XBT"], value), divisor)
+            self.assertEqual(quotient.value * divisor + remainder.value, value)
+            reference = Fraction(value, divisor)
+            self.assertEqual(quotient.value, reference.numerator // reference.denominator)
+            self.assertIs(quotient.currency, currencies["XBT"])
+
+    def test_allocate(self):
+        gbp = currencies["GBP"]
+        self.assertEqual(
+            Amount(gbp, 100).allocate([1, 1, 1]),
+            [Amount(gbp, 34), Amount(gbp, 33), Amount(gbp, 33)],
+        )
+        self.assertEqual(
+            Amount(gbp, -100).allocate([1, 1, 1]),
+            [Amount(gbp, -34), Amount(gbp, -33), Amount(gbp, -33)],
+        )
+        # Leftovers go to the largest remainders, not just the first parts
+        self.assertEqual(
+            Amount(gbp, 100).allocate([1, 2, 3, 0]),
+            [Amount(gbp, 17), Amount(gbp, 33), Amount(gbp, 50), Amount(gbp, 0)],
+        )
+        self.assertEqual(
+            Amount(gbp, 1000).allocate([Decimal("0.5"), Decimal("0.25"), 1]),
+            [Amount(gbp, 286), Amount(gbp, 143), Amount(gbp, 571)],
+        )
+        self.assertEqual(
+            Amount(gbp, 5).allocate([0, 3]),
+            [Amount(gbp, 0), Amount(gbp, 5)],
+        )
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).allocate([])
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).allocate([0, 0])
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).allocate([1, -1])
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).allocate([0.5, 0.5])
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).allocate([Decimal("NaN"), 1])
+
+    def test_allocate_sums_exactly(self):
+        rng = random.Random(4217)
+        for _ in range(500):
+            value = rng.randrange(-10 ** 12, 10 ** 12)
+            weights = [rng.randrange(10 ** rng.randrange(1, 6)) for _ in range(rng.randrange(1, 12))]
+            if not any(weights):
+                weights[0] = 1
+            parts = Amount(currencies["GBP"], value).allocate(weights)
+            self.assertEqual(sum(part.value for part in parts), value)
+            for part, weight in zip(parts, weights):
+                # Each part is within one minor unit of its exact share
+                self.assertLess(abs(part.value - Fraction(value * weight, sum(weights))), 1)
+
+    def test_split(self):
+        gbp = currencies["GBP"]
+        self.assertEqual(
+            Amount(gbp, 100).split(3),
+            [Amount(gbp, 34), Amount(gbp, 33), Amount(gbp, 33)],
+        )
+        self.assertEqual(
+            Amount(gbp, -5).split(2),
+            [Amount(gbp, -3), Amount(gbp, -2)],
+        )
+        self.assertEqual(Amount(gbp, 7).split(7), [Amount(gbp, 1)] * 7)
+        self.assertEqual(Amount(gbp, 100).split(7), Amount(gbp, 100).allocate([1] * 7))
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).split(0)
+        with self.assertRaises(ValueError):
+            Amount(gbp, 100).split(1.5)
+
+    def test_allocate_many(self):
+        gbp = currencies["GBP"]
+        usd = currencies["USD"]
+        self.assertEqual(
+            Amount.allocate_many([Amount(gbp, 100), Amount(usd, 10), Amount.ZERO], [1, 2]),
+            [
+                [Amount(gbp, 33), Amount(gbp, 67)],
+                [Amount(usd, 3), Amount(usd, 7)],
+                [Amount.ZERO, Amount.ZERO],
+            ],
+        )
+        self.assertEqual(Amount.allocate_many([], [1, 2]), [])
+
     def test_divide_and_round(self):
         self.assertEqual(
             Amount(currencies["GBP"], 300).divide_and_round(1),
@@ -206,6 +378,91 @@ class AmountTests(TestCase):
             Amount(currencies["GBP"], 1),
         )
 
+    def test_hash(self):
+        self.assertEqual(
+            hash(Amount(currencies["GBP"], 132)),
+            hash(Amount(currencies["GBP"], 132)),
+        )
+        self.assertEqual(
+            len(set([
+                Amount(currencies["GBP"], 132),
+                Amount(currencies["GBP"], 132),
+                Amount(currencies["USD"], 132),
+                Amount(currencies["GBP"], 99),
+            ])),
+            3,
+        )
+        lookup = {Amount(currencies["GBP"], 132): "found"}
+        self.assertEqual(lookup[Amount.from_code_and_major("GBP", "1.32")], "found")
+        # A custom Currency instance is equal to (and hashes like) the registry one
+        self.assertEqual(
+            hash(Amount(Currency("GBP", "826", 2, 'Pound Sterling', prefix="£"), 132)),
+            hash(Amount(currencies["GBP"], 132)),
+        )
+
+    def test_slots(self):
+        amount = Amount(currencies["GBP"], 300)
+        self.assertFalse(hasattr(amount, "__dict__"))
+        with self.assertRaises(AttributeError):
+            amount.foo = "bar"
+
+    def test_pickle(self):
+        amount = Amount(currencies["GBP"], 300)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(amount, protocol))
+            self.assertEqual(unpickled, amount)
+            self.assertEqual(repr(unpickled), "<Amount GBP, 300>")
+            self.assertIs(unpickled.currency, currencies["GBP"])
+        custom = Amount(Currency("GBP", "826", 2, 'Pound Sterling', prefix="£"), 300)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(custom, protocol))
+            self.assertEqual(unpickled, custom)
+            self.assertEqual(six.text_type(unpickled), "£3.00")
+            self.assertIsNot(unpickled.currency, currencies["GBP"])
+
+    def test_pickle_compatibility(self):
+        # As pickled by earlier versions, with a full copy of the Currency
+        data = (
+            b'\x80\x02ccurrint.amount\nAmount\nq\x00)\x81q\x01}q\x02(X\x08\x00\x00\x00currencyq\x03'
+            b'ccurrint.currency\nCurrency\nq\x04)\x81q\x05}q\x06(X\x04\x00\x00\x00codeq\x07X\x03\x00\x00\x00'
+            b'JPYq\x08X\x0c\x00\x00\x00numeric_codeq\tX\x03\x00\x00\x00392q\nX\x04\x00\x00\x00nameq\x0b'
+            b'X\x03\x00\x00\x00Yenq\x0cX\x06\x00\x00\x00prefixq\rX\x00\x00\x00\x00q\x0eX\x06\x00\x00\x00'
+            b'suffixq\x0fX\x04\x00\x00\x00 JPYq\x10X\x08\x00\x00\x00exponentq\x11K\x00X\x07\x00\x00\x00'
+            b'divisorq\x12K\x01ubX\x05\x00\x00\x00valueq\x13M,\x01ub.'
+        )
+        self.assertEqual(pickle.loads(data), Amount(currencies["JPY"], 300))
+        self.assertEqual(six.text_type(pickle.loads(data)), "300 JPY")
+
+    def test_pickle_subclass(self):
+        amount = LabelledAmount(currencies["GBP"], 300)
+        amount.label = "fees"
+        unpickled = pickle.loads(pickle.dumps(amount, pickle.HIGHEST_PROTOCOL))
+        self.assertIsInstance(unpickled, LabelledAmount)
+        self.assertEqual(unpickled, amount)
+        self.assertEqual(unpickled.label, "fees")
+
+    def test_copy(self):
+        amount = Amount(currencies["GBP"], 300)
+        for copier in (copy.copy, copy.deepcopy):
+            copied = copier(amount)
+            self.assertIsNot(copied, amount)
+            self.assertEqual(copied, amount)
+            self.assertIs(copied.currency, currencies["GBP"])
+            self.assertIs(copier(Amount.ZERO), Amount.ZERO)
+
+class LabelledAmount(Amount):
+    __slots__ = ("label", )
+
+    def __getstate__(self):
+        state = super(LabelledAmount, self).__getstate__()
+        state["label"] = self.label
+        return state
+
+    def __setstate__(self, state):
+        self.label = state.pop("label")
+        super(LabelledAmount, self).__setstate__(state)
+
+
 class ZeroAmountTests(TestCase):
     def setUp(self):
         self.nonzero = Amount(currencies["GBP"], 300)
@@ -262,6 +519,37 @@ class ZeroAmountTests(TestCase):
     def test_to_major_decimal(self):
         self.assertEqual(Amount.ZERO.to_major_decimal(), Decimal('0'))
 
+    def test_convert_currency(self):
+        for major in (False, True):
+            converted = Amount.ZERO.convert_currency("JPY", 150, major=major)
+            self.assertEqual(converted, Amount(currencies["JPY"], 0))
+            self.assertIs(converted.currency, currencies["JPY"])
+        with self.assertRaises(ValueError):
+            Amount.ZERO.convert_currency("JPY", 1.5, major=True)
+
+    def test_allocate(self):
+        self.assertEqual(Amount.ZERO.allocate([1, 2]), [Amount.ZERO, Amount.ZERO])
+        self.assertEqual(Amount.ZERO.split(3), [Amount.ZERO] * 3)
+        with self.assertRaises(ValueError):
+            Amount.ZERO.split(0)
+
+    def test_divmod(self):
+        self.assertEqual(divmod(Amount.ZERO, 3), (Amount.ZERO, Amount.ZERO))
+        with self.assertRaises(ZeroDivisionError):
+            divmod(Amount.ZERO, 0)
+
+    def test_hash(self):
+        # Amount.ZERO is equal to a zero amount of any currency, so must hash the same
+        self.assertEqual(hash(Amount.ZERO), hash(Amount(currencies["GBP"], 0)))
+        self.assertEqual(hash(Amount.ZERO), hash(Amount(currencies["USD"], 0)))
+        self.assertIn(Amount(currencies["GBP"], 0), set([Amount.ZERO]))
+        self.assertIn(Amount.ZERO, {Amount(currencies["JPY"], 0): True})
+        self.assertNotIn(Amount.ZERO, set([self.nonzero]))
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            self.assertIs(pickle.loads(pickle.dumps(Amount.ZERO, protocol)), Amount.ZERO)
+
     def test_str(self):
         try:
             six.text_type(Amount.ZERO)
@@ -281,3 +569,50 @@ class ZeroAmountTests(TestCase):
     def test_forbidden_from_code_and_major(self):
         with self.assertRaises(NotImplementedError):
             _ZeroAmount.from_code_and_minor('USD', Decimal('1.00'))
+
+    def test_forbidden_from_minor_many(self):
+        with self.assertRaises(NotImplementedError):
+            _ZeroAmount.from_minor_many('USD', [100])
+
+
+class TotalTests(TestCase):
+
+    def test_total(self):
+        amounts = [Amount(currencies["GBP"], value) for value in (300, -50, 7)]
+        self.assertEqual(total(amounts), Amount(currencies["GBP"], 257))
+        self.assertEqual(total(iter(amounts)), sum(amounts, Amount.ZERO))
+        self.assertEqual(
+            total([Amount.ZERO] + amounts + [Amount.ZERO]),
+            Amount(currencies["GBP"], 257),
+        )
+        self.assertIs(total(amounts).currency, currencies["GBP"])
+
+    def test_total_empty(self):
+        self.assertIs(total([]), Amount.ZERO)
+        self.assertIs(total([Amount.ZERO, Amount.ZERO]), Amount.ZERO)
+        self.assertEqual(total([Amount(currencies["GBP"], 0)]), Amount(currencies["GBP"], 0))
+
+    def test_total_mixed_currencies(self):
+        amounts = [Amount(currencies["GBP"], 300), Amount(currencies["USD"], 100)]
+        with self.assertRaises(ValueError) as reference:
+            sum(amounts, Amount.ZERO)
+        with self.assertRaises(ValueError) as totalled:
+            total(amounts)
+        self.assertEqual(str(totalled.exception), str(reference.exception))
+
+    def test_totals_by_currency(self):
+        self.assertEqual(
+            totals_by_currency([
+                Amount(currencies["GBP"], 300),
+                Amount(currencies["USD"], 100),
+                Amount.ZERO,
+                Amount(currencies["GBP"], -50),
+                Amount(Currency("USD", "840", 2, 'US Dollar', prefix="$"), 1),
+            ]),
+            {
+                "GBP": Amount(currencies["GBP"], 250),
+                "USD": Amount(currencies["USD"], 101),
+            },
+        )
+        self.assertEqual(totals_by_currency([]), {})
+        self.assertEqual(totals_by_currency([Amount.ZERO]), {})
@@ -0,0 +1,364 @@
+# encoding: utf8
+from __future__ import unicode_literals
+from decimal import Decimal, ROUND_DOWN
+from unittest import TestCase, skipIf
+from .. import arrays
+from ..currency import Currency, codes_by_numeric, currencies, currency_indices, register_currency
+from ..amount import Amount
+from ..arrays import AmountArray, MultiCurrencyAmountArray, indices_for_numeric
+
+
+class AmountArrayTests(TestCase):
+
+    def setUp(self):
+        self.gbp = AmountArray(currencies["GBP"], [100, -250, 0, 7])
+
+    def test_construction(self):
+        self.assertEqual(len(self.gbp), 4)
+        self.assertEqual(self.gbp.tolist(), [100, -250, 0, 7])
+        self.assertEqual(
+            AmountArray.from_code_and_minor("gbp", [100, -250, 0, 7]),
+            self.gbp,
+        )
+        with self.assertRaises(ValueError):
+            AmountArray.from_code_and_minor("WAITWHAT", [1])
+        with self.assertRaises(ValueError):
+            AmountArray(currencies["GBP"], [1, 1.5])
+        with self.assertRaises(OverflowError):
+            AmountArray(currencies["GBP"], [2 ** 64])
+        numpy = arrays._numpy()
+        if numpy is not None:
+            self.assertEqual(AmountArray(currencies["GBP"], numpy.array([5], dtype=numpy.uint64)).tolist(), [5])
+            # Rather than wrapping around to a negative value
+            with self.assertRaises(OverflowError):
+                AmountArray(currencies["GBP"], numpy.array([2 ** 63], dtype=numpy.uint64))
+
+    def test_from_amounts(self):
+        self.assertEqual(
+            AmountArray.from_amounts([
+                Amount(currencies["GBP"], 100),
+                Amount.ZERO,
+                Amount(currencies["GBP"], 7),
+            ]),
+            AmountArray(currencies["GBP"], [100, 0, 7]),
+        )
+        self.assertEqual(
+            AmountArray.from_amounts([], currency=currencies["USD"]),
+            AmountArray(currencies["USD"], []),
+        )
+        with self.assertRaises(ValueError):
+            AmountArray.from_amounts([])
+        with self.assertRaises(ValueError):
+            AmountArray.from_amounts([
+                Amount(currencies["GBP"], 100),
+                Amount(currencies["USD"], 100),
+            ])
+
+    def test_item_access(self):
+        self.assertEqual(self.gbp[1], Amount(currencies["GBP"], -250))
+        self.assertEqual(self.gbp[1:3], AmountArray(currencies["GBP"], [-250, 0]))
+        self.assertEqual(list(self.gbp)[3], Amount(currencies["GBP"], 7))
+
+    def test_equality(self):
+        self.assertEqual(self.gbp, AmountArray(currencies["GBP"], [100, -250, 0, 7]))
+        self.assertNotEqual(self.gbp, AmountArray(currencies["USD"], [100, -250, 0, 7]))
+        self.assertNotEqual(self.gbp, AmountArray(currencies["GBP"], [100, -250, 0, 8]))
+        self.assertNotEqual(self.gbp, object())
+
+    def test_add(self):
+        self.assertEqual(
+            self.gbp + AmountArray(currencies["GBP"], [1, 2, 3, 4]),
+            AmountArray(currencies["GBP"], [101, -248, 3, 11]),
+        )
+        self.assertEqual(
+            self.gbp + Amount(currencies["GBP"], 10),
+            AmountArray(currencies["GBP"], [110, -240, 10, 17]),
+        )
+        self.assertEqual(self.gbp + Amount.ZERO, self.gbp)
+        with self.assertRaises(ValueError):
+            self.gbp + AmountArray(currencies["USD"], [1, 2, 3, 4])
+        with self.assertRaises(ValueError):
+            self.gbp + Amount(currencies["USD"], 1)
+        with self.assertRaises(ValueError):
+            self.gbp + AmountArray(currencies["GBP"], [1, 2])
+        with self.assertRaises(OverflowError):
+            AmountArray(currencies["GBP"], [2 ** 63 - 1]) + AmountArray(currencies["GBP"], [1])
+
+    def test_subtract(self):
+        self.assertEqual(
+            self.gbp - AmountArray(currencies["GBP"], [1, 2, 3, 4]),
+            AmountArray(currencies["GBP"], [99, -252, -3, 3]),
+        )
+        with self.assertRaises(ValueError):
+            self.gbp - AmountArray(currencies["USD"], [1, 2, 3, 4])
+        with self.assertRaises(OverflowError):
+            AmountArray(currencies["GBP"], [-2 ** 63]) - AmountArray(currencies["GBP"], [1])
+
+    def test_reflected(self):
+        # Amount hands these to the array, rather than making an Amount of an array
+        self.assertEqual(
+            Amount(currencies["GBP"], 10) + self.gbp,
+            AmountArray(currencies["GBP"], [110, -240, 10, 17]),
+        )
+        self.assertEqual(
+            Amount(currencies["GBP"], 10) - self.gbp,
+            AmountArray(currencies["GBP"], [-90, 260, 10, 3]),
+        )
+        self.assertEqual(Amount.ZERO + self.gbp, self.gbp)
+        self.assertEqual(Amount.ZERO - self.gbp, AmountArray(currencies["GBP"], [-100, 250, 0, -7]))
+        self.assertEqual(sum([self.gbp, self.gbp], Amount.ZERO), self.gbp + self.gbp)
+        with self.assertRaises(ValueError):
+            Amount(currencies["USD"], 1) + self.gbp
+        with self.assertRaises(OverflowError):
+            Amount(currencies["GBP"], -2) - AmountArray(currencies["GBP"], [2 ** 63 - 1])
+
+    def test_sum(self):
+        self.assertEqual(self.gbp.sum(), Amount(currencies["GBP"], -143))
+        self.assertEqual(AmountArray(currencies["GBP"], []).sum(), Amount(currencies["GBP"], 0))
+        # Totals larger than 64 bits are still exact
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [2 ** 62] * 4).sum(),
+            Amount(currencies["GBP"], 2 ** 64),
+        )
+
+    def test_apply_factor(self):
+        self.assertEqual(
+            self.gbp.apply_factor(2),
+            AmountArray(currencies["GBP"], [200, -500, 0, 14]),
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [100, 100]).apply_factor(Decimal("1.005")),
+            AmountArray(currencies["GBP"], [101, 101]),
+        )
+        with self.assertRaises(ValueError):
+            self.gbp.apply_factor(1.005)
+        with self.assertRaises(OverflowError):
+            AmountArray(currencies["GBP"], [2 ** 62]).apply_factor(2)
+        # As with Amount.apply_factor, zero times anything is zero
+        for factor in (2 ** 63, -2 ** 63 - 1, 2 ** 100):
+            self.assertEqual(
+                AmountArray(currencies["GBP"], [0, 0]).apply_factor(factor),
+                AmountArray(currencies["GBP"], [0, 0]),
+            )
+            self.assertEqual(Amount(currencies["GBP"], 0).apply_factor(factor), Amount(currencies["GBP"], 0))
+        with self.assertRaises(OverflowError):
+            AmountArray(currencies["GBP"], [0, 1]).apply_factor(2 ** 63)
+
+    def test_divide_and_round(self):
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [300, 1, -1]).divide_and_round(2),
+            AmountArray(currencies["GBP"], [150, 1, -1]),
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [300]).divide_and_round(4.5),
+            AmountArray(currencies["GBP"], [67]),
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [299]).divide_and_round(2, ROUND_DOWN),
+            AmountArray(currencies["GBP"], [149]),
+        )
+        with self.assertRaises(ValueError):
+            self.gbp.divide_and_round("2")
+
+    def test_matches_amount(self):
+        values = [1, -1, 5, 149, -150, 12345]
+        array = AmountArray(currencies["USD"], values)
+        for factor in (3, Decimal("0.333"), Decimal("-1.5")):
+            self.assertEqual(
+                list(array.apply_factor(factor)),
+                [Amount(currencies["USD"], value).apply_factor(factor) for value in values],
+            )
+        for divisor in (3, 0.7, Decimal("-2")):
+            self.assertEqual(
+                list(array.divide_and_round(divisor)),
+                [Amount(currencies["USD"], value).divide_and_round(divisor) for value in values],
+            )
+
+    def test_allocate(self):
+        parts = AmountArray(currencies["GBP"], [100, -100, 0, 7]).allocate([1, 1, 1])
+        self.assertEqual(
+            parts,
+            [
+                AmountArray(currencies["GBP"], [34, -34, 0, 3]),
+                AmountArray(currencies["GBP"], [33, -33, 0, 2]),
+                AmountArray(currencies["GBP"], [33, -33, 0, 2]),
+            ],
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], []).allocate([1, 2]),
+            [AmountArray(currencies["GBP"], []), AmountArray(currencies["GBP"], [])],
+        )
+
+    def test_to_major_decimal(self):
+        self.assertEqual(
+            self.gbp.to_major_decimal(),
+            [Decimal("1.00"), Decimal("-2.50"), Decimal("0"), Decimal("0.07")],
+        )
+        self.assertEqual(
+            AmountArray(currencies["MRO"], [7]).to_major_decimal(),
+            [Decimal("1.4")],
+        )
+
+
+class MultiCurrencyAmountArrayTests(TestCase):
+
+    def setUp(self):
+        self.mixed = MultiCurrencyAmountArray.from_codes_and_minor(
+            ["GBP", "USD", "gbp", "JPY", "USD"],
+            [100, 250, -30, 1000, 5],
+        )
+
+    def test_construction(self):
+        self.assertEqual(len(self.mixed), 5)
+        self.assertEqual(
+            MultiCurrencyAmountArray.from_amounts([
+                Amount(currencies["GBP"], 100),
+                Amount(currencies["USD"], 250),
+                Amount(currencies["GBP"], -30),
+                Amount(currencies["JPY"], 1000),
+                Amount(currencies["USD"], 5),
+            ]),
+            self.mixed,
+        )
+        with self.assertRaises(ValueError):
+            MultiCurrencyAmountArray.from_codes_and_minor(["WAITWHAT"], [1])
+        with self.assertRaises(ValueError):
+            MultiCurrencyAmountArray.from_codes_and_minor(["GBP", "USD"], [1])
+        with self.assertRaises(ValueError):
+            MultiCurrencyAmountArray.from_amounts([Amount.ZERO])
+        with self.assertRaises(ValueError):
+            MultiCurrencyAmountArray([60000], [1])
+
+    def test_from_numeric_and_minor(self):
+        self.assertEqual(
+            MultiCurrencyAmountArray.from_numeric_and_minor(
+                [826, "840", "0826", 392, 840],
+                [100, 250, -30, 1000, 5],
+            ),
+            self.mixed,
+        )
+        for numeric_codes in ([826, 999], ["826", "WAT"], [1000], [-1]):
+            with self.assertRaises(ValueError):
+                MultiCurrencyAmountArray.from_numeric_and_minor(numeric_codes, [1, 2][:len(numeric_codes)])
+
+    def test_indices_for_numeric(self):
+        self.assertEqual(
+            list(indices_for_numeric(["826", 840, "0978"])),
+            [currency_indices["GBP"], currency_indices["USD"], currency_indices["EUR"]],
+        )
+        self.assertEqual(list(indices_for_numeric([])), [])
+        numpy = arrays._numpy()
+        if numpy is not None:
+            for numeric_codes in (numpy.array([826, 840, 978]), numpy.array(["826", "0840", "978"])):
+                self.assertEqual(
+                    indices_for_numeric(numeric_codes).tolist(),
+                    [currency_indices["GBP"], currency_indices["USD"], currency_indices["EUR"]],
+                )
+            for numeric_codes in (
+                numpy.array([826, 999]), numpy.array([1000]), numpy.array(["WAT"]),
+                numpy.array([826.9]), numpy.array([True]), numpy.array(["8_26"]),
+            ):
+                with self.assertRaises(ValueError):
+                    indices_for_numeric(numeric_codes)
+        for numeric_codes in ([True], [826, 826.0], [8.9], ["8_26"], [(826, )]):
+            with self.assertRaises(ValueError):
+                indices_for_numeric(numeric_codes)
+
+    def test_indices_for_numeric_registered(self):
+        # The prebuilt table picks up codes registered after it was built
+        indices_for_numeric([826])
+        register_currency(Currency("XTS", "963", 3, "Testing"))
+        try:
+            self.assertEqual(list(indices_for_numeric([963, "826"])), [currency_indices["XTS"], currency_indices["GBP"]])
+        finally:
+            del currencies["XTS"]
+        self.assertNotIn(963, codes_by_numeric)
+        with self.assertRaises(ValueError):
+            indices_for_numeric([963])
+
+    def test_item_access(self):
+        self.assertEqual(self.mixed[3], Amount(currencies["JPY"], 1000))
+        self.assertEqual(
+            list(self.mixed[1:3]),
+            [Amount(currencies["USD"], 250), Amount(currencies["GBP"], -30)],
+        )
+        self.assertEqual(list(self.mixed)[4], Amount(currencies["USD"], 5))
+
+    def test_codes(self):
+        self.assertEqual(self.mixed.codes(), ["GBP", "JPY", "USD"])
+
+    def test_totals(self):
+        self.assertEqual(
+            self.mixed.totals(),
+            {
+                "GBP": Amount(currencies["GBP"], 70),
+                "USD": Amount(currencies["USD"], 255),
+                "JPY": Amount(currencies["JPY"], 1000),
+            },
+        )
+        self.assertEqual(MultiCurrencyAmountArray([], []).totals(), {})
+
+    def test_group_totals(self):
+        self.assertEqual(
+            self.mixed.group_totals(["a", "a", "b", "a", "a"]),
+            {
+                ("a", "GBP"): Amount(currencies["GBP"], 100),
+                ("a", "USD"): Amount(currencies["USD"], 255),
+                ("a", "JPY"): Amount(currencies["JPY"], 1000),
+                ("b", "GBP"): Amount(currencies["GBP"], -30),
+            },
+        )
+        with self.assertRaises(ValueError):
+            self.mixed.group_totals(["a"])
+
+    def test_filter(self):
+        self.assertEqual(
+            self.mixed.filter([True, False, True, False, False]),
+            MultiCurrencyAmountArray.from_codes_and_minor(["GBP", "GBP"], [100, -30]),
+        )
+        self.assertEqual(
+            self.mixed.filter(value > 0 for value in self.mixed.values.tolist()).totals(),
+            {
+                "GBP": Amount(currencies["GBP"], 100),
+                "USD": Amount(currencies["USD"], 255),
+                "JPY": Amount(currencies["JPY"], 1000),
+            },
+        )
+        with self.assertRaises(ValueError):
+            self.mixed.filter([True])
+
+    def test_for_currency(self):
+        self.assertEqual(
+            self.mixed.for_currency("usd"),
+            AmountArray(currencies["USD"], [250, 5]),
+        )
+        self.assertEqual(
+            self.mixed.for_currency("EUR"),
+            AmountArray(currencies["EUR"], []),
+        )
+        with self.assertRaises(ValueError):
+            self.mixed.for_currency("WAITWHAT")
+
+
+class NumPyToggleMixin(object):
+    """
+    Runs the same tests with the array.array fallback when NumPy is installed.
+    """
+
+    def setUp(self):
+        self.numpy = arrays._numpy()
+        arrays.numpy = None
+        super(NumPyToggleMixin, self).setUp()
+
+    def tearDown(self):
+        arrays.numpy = self.numpy
+
+
+@skipIf(arrays._numpy() is None, "NumPy is not installed")
+class PurePythonAmountArrayTests(NumPyToggleMixin, AmountArrayTests):
+    pass
+
+
+@skipIf(arrays._numpy() is None, "NumPy is not installed")
+class PurePythonMultiCurrencyAmountArrayTests(NumPyToggleMixin, MultiCurrencyAmountArrayTests):
+    pass
@@ -0,0 +1,73 @@
+from __future__ import unicode_literals
+from unittest import TestCase
+from ..amount import Amount
+from ..codec import Decoder, dumps, dumps_many, loads, loads_many
+from ..currency import Currency, currencies
+
+
+class CodecTests(TestCase):
+
+    def setUp(self):
+        self.amounts = [
+            Amount(currencies["GBP"], 123),
+            Amount(currencies["USD"], -1),
+            Amount.ZERO,
+            Amount(currencies["JPY"], 0),
+            Amount(currencies["XBT"], 2 ** 70),
+            Amount(currencies["GBP"], -(2 ** 63)),
+        ]
+
+    def test_round_trip(self):
+        decoded = loads_many(dumps_many(self.amounts))
+        self.assertEqual(decoded, self.amounts)
+        self.assertIs(decoded[2], Amount.ZERO)
+        for amount in decoded:
+            if amount is not Amount.ZERO:
+                self.assertIs(amount.currency, currencies[amount.currency.code])
+        self.assertEqual(loads_many(b""), [])
+        self.assertEqual(loads_many(bytearray(dumps_many(self.amounts))), self.amounts)
+
+    def test_single(self):
+        for amount in self.amounts:
+            self.assertEqual(loads(dumps(amount)), amount)
+        with self.assertRaises(ValueError):
+            loads(dumps_many(self.amounts[:2]))
+
+    def test_format(self):
+        # GBP is numeric 826, so its header is 826 << 1 as a varint
+        self.assertEqual(dumps(Amount(currencies["GBP"], 1)), b"\xf4\x0c\x02")
+        self.assertEqual(dumps(Amount(currencies["GBP"], -1)), b"\xf4\x0c\x01")
+        self.assertEqual(dumps(Amount.ZERO), b"\x01")
+        # XBT has no numeric code, so it is written inline
+        self.assertEqual(dumps(Amount(currencies["XBT"], 64)), b"\x07XBT\x80\x01")
+
+    def test_custom_currency(self):
+        # Currencies that aren't the registry's holder of their numeric code
+        # are written by alpha code, and decode to the registry currency.
+        amount = Amount(Currency("GBP", "999", 2, "Not Sterling"), 5)
+        self.assertEqual(loads(dumps(amount)), Amount(currencies["GBP"], 5))
+        self.assertIs(loads(dumps(amount)).currency, currencies["GBP"])
+
+    def test_chunks(self):
+        data = dumps_many(self.amounts * 20)
+        for size in (1, 2, 3, 7, 64, 1000):
+            decoder = Decoder()
+            decoded = []
+            for start in range(0, len(data), size):
+                decoded.extend(decoder.feed(memoryview(data)[start:start + size]))
+            decoder.close()
+            self.assertEqual(decoded, self.amounts * 20)
+
+    def test_invalid(self):
+        data = dumps_many(self.amounts)
+        with self.assertRaises(ValueError):
+            loads_many(data[:-1])
+        decoder = Decoder()
+        decoder.feed(data[:3])
+        with self.assertRaises(ValueError):
+            decoder.close()
+        # Numeric code 999 is not registered
+        with self.assertRaises(ValueError):
+            loads_many(b"\xce\x0f\x02")
+        with self.assertRaises(ValueError):
+            loads_many(b"\x07WAT\x02")
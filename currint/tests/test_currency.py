@@ -1,8 +1,17 @@
 # encoding: utf8
 from __future__ import unicode_literals
+import copy
+import io
+import json
+import pickle
+import random
 from decimal import Decimal
 from unittest import TestCase
-from ..currency import currencies, Currency
+from ..currency import (
+    codes_by_numeric, currencies, currency_codes, currency_indices, Currency, FORMAT_CHUNK_SIZE, _LazyCurrencies,
+    _definitions, currency_for_numeric, get_currency, load_currency_data, read_currency_data, register_currency,
+    CODE_CACHE_SIZE, DATA_FIELDS, _code_cache,
+)
 
 
 class CurrencyTests(TestCase):
@@ -92,6 +101,86 @@ class CurrencyTests(TestCase):
             "100",
         )
 
+    def test_format_matches_decimal(self):
+        """
+        The integer formatter must render exactly what the Decimal-based
+        formatting does.
+        """
+        rng = random.Random(4217)
+        values = [0, 1, -1, 9, 10, -10, 99, 100, -100, 101, 10 ** 20 + 7, -(10 ** 20) - 7]
+        values += [rng.randrange(-10 ** 12, 10 ** 12) for _ in range(200)]
+        for currency in currencies.values():
+            if currency.exponent is None:
+                continue
+            for value in values:
+                major = Decimal(value) / currency.divisor
+                decimal = "{:.{precision}f}".format(major, precision=currency.exponent)
+                self.assertEqual(currency.format_decimal(value), decimal)
+                self.assertEqual(currency.format(value), "%s%s%s" % (currency.prefix, decimal, currency.suffix))
+
+    def test_format_errors(self):
+        with self.assertRaises(ValueError):
+            currencies["USD"].format(1.5)
+        with self.assertRaises(ValueError):
+            currencies["USD"].format_decimal(Decimal("1"))
+        with self.assertRaises(ValueError):
+            currencies["MRO"].format(1.5)
+
+    def test_format_percent_prefix(self):
+        self.assertEqual(
+            Currency("PCT", None, 1, prefix="%", suffix=" %s").format(-15),
+            "%-1.5 %s",
+        )
+
+    def test_format_many(self):
+        self.assertEqual(
+            currencies["USD"].format_many([43, -60, 100]),
+            "0.43 USD\n-0.60 USD\n1.00 USD",
+        )
+        self.assertEqual(
+            currencies["USD"].format_many(iter([43, -60]), sep=",", decimal=True),
+            "0.43,-0.60",
+        )
+        self.assertEqual(
+            currencies["JPY"].format_many([100, -5], sep="%"),
+            "100 JPY%-5 JPY",
+        )
+        self.assertEqual(
+            currencies["MRO"].format_many([7, 5], sep=";"),
+            "1.4 MRO;1 MRO",
+        )
+        self.assertEqual(currencies["USD"].format_many([]), "")
+        with self.assertRaises(ValueError):
+            currencies["USD"].format_many([1, 1.5])
+
+    def test_format_many_chunks(self):
+        values = list(range(-FORMAT_CHUNK_SIZE, FORMAT_CHUNK_SIZE * 2 + 3))
+        for currency in [currencies["USD"], currencies["JPY"], currencies["BHD"], currencies["MRO"]]:
+            self.assertEqual(
+                currency.format_many(values, sep="|"),
+                "|".join(currency.format(value) for value in values),
+            )
+            self.assertEqual(
+                currency.format_many(values, decimal=True),
+                "\n".join(currency.format_decimal(value) for value in values),
+            )
+
+    def test_format_many_stream(self):
+        stream = io.StringIO()
+        stream.write("amount\n")
+        currencies["USD"].format_many([43, 1], stream=stream)
+        self.assertEqual(stream.getvalue(), "amount\n0.43 USD\n0.01 USD")
+
+    def test_format_many_bytes(self):
+        currency = Currency("GBP", "826", 2, 'Pound Sterling', prefix="£")
+        self.assertEqual(
+            currency.format_many_bytes([100, -1]),
+            "£1.00\n£-0.01".encode("utf-8"),
+        )
+        stream = io.BytesIO()
+        currencies["USD"].format_many_bytes([43, 1], sep=b",", stream=stream, decimal=True)
+        self.assertEqual(stream.getvalue(), b"0.43,0.01")
+
     def test_equality(self):
         self.assertEqual(
             currencies['GBP'],
@@ -105,3 +194,287 @@ class CurrencyTests(TestCase):
             currencies['GBP'],
             object(),
         )
+
+    def test_hash(self):
+        self.assertEqual(
+            hash(currencies["GBP"]),
+            hash(Currency("GBP", "826", 2, 'Pound Sterling', prefix="£")),
+        )
+        self.assertEqual(
+            len(set([currencies["GBP"], currencies["GBP"], currencies["USD"]])),
+            2,
+        )
+        lookup = {currencies["GBP"]: "sterling"}
+        self.assertEqual(lookup[Currency("GBP", "826", 2, 'Pound Sterling')], "sterling")
+
+    def test_registry_singletons(self):
+        self.assertIs(currencies["GBP"], currencies["GBP"])
+
+    def test_get_currency(self):
+        for code in ("GBP", "gbp", "Gbp", "GBP"):
+            self.assertIs(get_currency(code), currencies["GBP"])
+        for code in ("WAITWHAT", "waitwhat", "WAITWHAT"):
+            with self.assertRaises(ValueError) as raised:
+                get_currency(code)
+            self.assertEqual(str(raised.exception), "Invalid currency code %s" % code)
+        self.assertIsNone(get_currency("WAITWHAT", None))
+        self.assertIs(get_currency("gbp", None), currencies["GBP"])
+
+    def test_get_currency_cache_bounded(self):
+        for number in range(CODE_CACHE_SIZE * 2):
+            get_currency("X%s" % number, None)
+            self.assertLessEqual(len(_code_cache), CODE_CACHE_SIZE)
+        self.assertIs(get_currency("usd"), currencies["USD"])
+
+    def test_numeric_lookup(self):
+        self.assertIs(currency_for_numeric(826), currencies["GBP"])
+        self.assertIs(currency_for_numeric("0840"), currencies["USD"])
+        for code, args in _definitions.items():
+            if len(args) > 1 and args[1] is not None:
+                self.assertEqual(currency_for_numeric(args[1]).code, code)
+        with self.assertRaises(ValueError):
+            currency_for_numeric(None)
+        with self.assertRaises(ValueError):
+            currency_for_numeric("1000")
+        # Only integers and strings of digits, not anything int() takes
+        for numeric_code in (True, 826.0, 8.9, "8_26", " 826", "", (826, )):
+            with self.assertRaises(ValueError):
+                currency_for_numeric(numeric_code)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(currencies["GBP"], "__dict__"))
+
+    def test_pickle(self):
+        currency = Currency("GBP", "826", 2, 'Pound Sterling', prefix="£")
+        # Populate the formatter cache, which is not pickled
+        currency.format(100)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(currency, protocol))
+            self.assertEqual(unpickled, currency)
+            self.assertEqual(unpickled.format(100), "£1.00")
+            self.assertEqual(unpickled.divisor, 100)
+            self.assertEqual(unpickled.name, 'Pound Sterling')
+            self.assertIsNot(unpickled, currencies["GBP"])
+        custom = Currency("MRX", "999", None, 'Custom', divisor=5)
+        unpickled = pickle.loads(pickle.dumps(custom, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual((unpickled.exponent, unpickled.divisor, unpickled.suffix), (None, 5, " MRX"))
+
+    def test_pickle_registry_currency(self):
+        for code in ("GBP", "MRO", "XBT"):
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                data = pickle.dumps(currencies[code], protocol)
+                self.assertIs(pickle.loads(data), currencies[code])
+                self.assertNotIn(b"numeric_code", data)
+
+    def test_copy(self):
+        for copier in (copy.copy, copy.deepcopy):
+            self.assertIs(copier(currencies["GBP"]), currencies["GBP"])
+            custom = Currency("GBP", "826", 2, 'Pound Sterling', prefix="£")
+            copied = copier(custom)
+            self.assertIsNot(copied, custom)
+            self.assertEqual(
+                [getattr(copied, name) for name in Currency._fields],
+                [getattr(custom, name) for name in Currency._fields],
+            )
+
+
+class RegistryTests(TestCase):
+
+    def setUp(self):
+        self.registry = _LazyCurrencies({
+            "GBP": ("GBP", "826", 2, 'Pound Sterling', None, "£"),
+            "MRO": ("MRO", "478", None, 'Ouguiya', 5),
+        })
+
+    def test_lazy(self):
+        self.assertEqual(len(self.registry._currencies), 0)
+        self.assertIn("GBP", self.registry)
+        self.assertNotIn("USD", self.registry)
+        gbp = self.registry["GBP"]
+        self.assertEqual(gbp.format(150), "£1.50")
+        self.assertIs(self.registry["GBP"], gbp)
+        self.assertEqual(len(self.registry._currencies), 1)
+        self.assertEqual(self.registry["MRO"].divisor, 5)
+        with self.assertRaises(KeyError):
+            self.registry["USD"]
+        self.assertIsNone(self.registry.get("USD"))
+        self.assertIs(self.registry.get("GBP"), gbp)
+
+    def test_lookup_race(self):
+        # Another thread builds GBP between our missing it and looking for
+        # its definition
+        registry = self.registry
+
+        class RacingDict(dict):
+            def __missing__(self, code):
+                self[code] = Currency(*registry._pending[code])
+                del registry._pending[code]
+                raise KeyError(code)
+
+        registry._currencies = RacingDict()
+        gbp = registry["GBP"]
+        self.assertEqual(gbp.code, "GBP")
+        self.assertIs(registry["GBP"], gbp)
+        with self.assertRaises(KeyError):
+            registry["USD"]
+
+    def test_whole_table(self):
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(sorted(self.registry), ["GBP", "MRO"])
+        self.assertEqual(sorted(currency.code for currency in self.registry.values()), ["GBP", "MRO"])
+        self.assertEqual(self.registry, {"GBP": self.registry["GBP"], "MRO": self.registry["MRO"]})
+        self.assertEqual(len(currencies), len(_definitions))
+
+    def test_whole_table_before_lookups(self):
+        # Paths that would read a dict's storage directly still see every
+        # currency, however few have been looked up
+        self.assertEqual(sorted(self.registry | {}), ["GBP", "MRO"])
+        self.assertEqual(sorted({"XBT": None} | self.registry), ["GBP", "MRO", "XBT"])
+        self.assertEqual(list(reversed(self.registry)), list(self.registry)[::-1])
+        # json can't read a partial table behind the registry's back
+        with self.assertRaises(TypeError):
+            json.dumps(self.registry)
+        self.assertEqual(
+            json.loads(json.dumps(self.registry.copy(), default=lambda currency: currency.code)),
+            {"GBP": "GBP", "MRO": "MRO"},
+        )
+        self.assertEqual(len(dict(currencies)), len(_definitions))
+
+    def test_mutation(self):
+        replacement = Currency("GBP", "826", 2, 'Pound Sterling')
+        self.registry["GBP"] = replacement
+        self.assertIs(self.registry["GBP"], replacement)
+        self.assertEqual(len(self.registry), 2)
+        self.assertIs(self.registry["GBP"], replacement)
+        del self.registry["MRO"]
+        self.assertNotIn("MRO", self.registry)
+        with self.assertRaises(KeyError):
+            del self.registry["MRO"]
+        self.assertEqual(list(self.registry), ["GBP"])
+        self.registry.update({"XBT": Currency("XBT", None, 8)})
+        self.assertEqual(self.registry["XBT"].exponent, 8)
+        self.assertIs(self.registry.setdefault("XBT", None), self.registry["XBT"])
+
+    def test_pickle(self):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            unpickled = pickle.loads(pickle.dumps(self.registry, protocol))
+            self.assertEqual(sorted(unpickled), ["GBP", "MRO"])
+            self.assertEqual(unpickled["MRO"].divisor, 5)
+
+
+class CurrencyDataTests(TestCase):
+
+    data = (
+        '{"version": "2", "fields": ["code", "numeric_code", "exponent", "name", "divisor", "prefix"],'
+        ' "currencies": [["GBP", "826", 2, "Pound Sterling", null, "\u00a3"], ["XTS", "963", 3]]}'
+    )
+
+    def setUp(self):
+        self.gbp = currencies["GBP"]
+        self.version = currencies.version
+
+    def tearDown(self):
+        currencies["GBP"] = self.gbp
+        currencies.pop("XTS", None)
+        currencies.version = self.version
+
+    def test_read(self):
+        version, definitions = read_currency_data(self.data.encode("utf8"))
+        self.assertEqual(version, "2")
+        self.assertEqual(definitions, {
+            "GBP": ("GBP", "826", 2, "Pound Sterling", None, "£"),
+            "XTS": ("XTS", "963", 3),
+        })
+
+    def test_read_invalid(self):
+        for data in (
+            "not json",
+            '{"version": "1"}',
+            '{"version": "1", "fields": ["name"], "currencies": []}',
+            '{"version": "1", "fields": ["code", "numeric_code"], "currencies": [["GBP", "826", 2]]}',
+            '{"version": "1", "fields": ["code"], "currencies": [[]]}',
+        ):
+            with self.assertRaises(ValueError):
+                read_currency_data(data)
+        for row in (
+            '"AED"',
+            '["AED", "784", 2, "UAE Dirham", 5]',
+            '["AED", "784", null, "UAE Dirham"]',
+            '["AED", "784", "2"]',
+            '["AED", "784", -1]',
+            '["AED", "784", true]',
+            '["aed", "784", 2]',
+            '[784, "784", 2]',
+            '["AED", 784, 2]',
+            '["AED", "7x4", 2]',
+            '["AED", "784", null, null, 0]',
+            '["AED", "784", 2, 5]',
+        ):
+            with self.assertRaises(ValueError):
+                read_currency_data('{"version": "1", "fields": %s, "currencies": [%s]}' % (
+                    json.dumps(DATA_FIELDS), row,
+                ))
+        with self.assertRaises(ValueError):
+            read_currency_data('{"version": "1", "fields": ["code"], "currencies": [["AED"], ["AED"]]}')
+
+    def test_load_invalid(self):
+        # One bad row means nothing in the file is loaded
+        data = self.data.replace('["XTS", "963", 3]', '["XTS", "963", 3], ["XXX", "999", "2"]')
+        with self.assertRaises(ValueError):
+            load_currency_data(io.BytesIO(data.encode("utf8")))
+        self.assertNotIn("XTS", currencies)
+        self.assertIs(currencies["GBP"], self.gbp)
+        self.assertEqual(currencies.version, self.version)
+        self.assertEqual(len(currencies), len(list(currencies)))
+
+    def test_package_data(self):
+        self.assertEqual(currencies.version, "1")
+        self.assertEqual(currency_codes[:len(_definitions)], sorted(_definitions))
+        self.assertEqual(currencies["MRO"].divisor, 5)
+        self.assertIsNone(currencies["XBT"].numeric_code)
+
+    def test_load(self):
+        self.assertIs(get_currency("gbp"), self.gbp)
+        self.assertEqual(load_currency_data(io.BytesIO(self.data.encode("utf8"))), "2")
+        self.assertEqual(currencies.version, "2")
+        self.assertEqual(currencies["GBP"].format(100), "£1.00")
+        self.assertIsNot(currencies["GBP"], self.gbp)
+        self.assertIs(get_currency("gbp"), currencies["GBP"])
+        self.assertEqual(currencies["XTS"].format(1500), "1.500 XTS")
+        self.assertEqual(codes_by_numeric[963], "XTS")
+        self.assertEqual(currency_codes[currency_indices["XTS"]], "XTS")
+        # Codes missing from the file are kept
+        self.assertIn("USD", currencies)
+
+    def test_load_no_replace(self):
+        load_currency_data(io.BytesIO(self.data.encode("utf8")), replace=False)
+        self.assertIs(currencies["GBP"], self.gbp)
+        self.assertIn("XTS", currencies)
+
+    def test_register(self):
+        self.assertIsNone(get_currency("xts", None))
+        currency = Currency("XTS", "963", 3, "Testing")
+        register_currency(currency)
+        self.assertIs(currencies["XTS"], currency)
+        self.assertIs(get_currency("xts"), currency)
+        index = currency_indices["XTS"]
+        self.assertEqual(currency_codes[index], "XTS")
+        with self.assertRaises(ValueError):
+            register_currency(Currency("XTS", "963", 2))
+        replacement = Currency("XTS", "963", 2)
+        register_currency(replacement, replace=True)
+        self.assertIs(currencies["XTS"], replacement)
+        self.assertEqual(currency_indices["XTS"], index)
+        self.assertIs(currency_for_numeric(963), replacement)
+        self.assertIs(get_currency("xts"), replacement)
+        register_currency(Currency("XTS", None, 2), replace=True)
+        self.assertNotIn(963, codes_by_numeric)
+        with self.assertRaises(ValueError):
+            register_currency("XTS")
+        # Deleting a currency forgets its numeric code, but keeps its index
+        register_currency(Currency("XTS", "963", 2), replace=True)
+        del currencies["XTS"]
+        self.assertNotIn(963, codes_by_numeric)
+        with self.assertRaises(ValueError):
+            currency_for_numeric(963)
+        self.assertEqual(currency_indices["XTS"], index)
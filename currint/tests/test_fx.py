@@ -0,0 +1,106 @@
+# encoding: utf8
+from __future__ import unicode_literals
+from decimal import Decimal
+from unittest import TestCase
+from ..amount import Amount
+from ..arrays import AmountArray
+from ..currency import currencies
+from ..fx import RateTable
+from ..rate import Rate
+
+
+class RateTableTests(TestCase):
+
+    def setUp(self):
+        self.table = RateTable(pivot="USD")
+        self.table.update({
+            ("GBP", "USD"): "1.25",
+            ("USD", "JPY"): "150",
+            ("EUR", "USD"): Decimal("1.1"),
+        })
+
+    def test_direct_and_inverse(self):
+        self.assertEqual(self.table.get_rate("GBP", "USD"), Rate("1.25"))
+        self.assertEqual(self.table.get_rate("usd", "gbp"), Rate("0.8"))
+        self.assertEqual(self.table.get_rate(currencies["GBP"], "GBP"), Rate(1))
+
+    def test_cross_rates(self):
+        self.assertEqual(self.table.get_rate("GBP", "JPY"), Rate("187.5"))
+        self.assertEqual(self.table.get_rate("GBP", "EUR"), Rate("1.25") * Rate("1.1").inverse())
+        with self.assertRaises(ValueError):
+            self.table.get_rate("GBP", "CHF")
+        with self.assertRaises(ValueError):
+            self.table.get_rate("GBP", "WAITWHAT")
+
+    def test_invalidation(self):
+        self.assertEqual(self.table.get_rate("GBP", "JPY"), Rate("187.5"))
+        self.table.set_rate("GBP", "USD", "1.3")
+        self.assertEqual(self.table.get_rate("GBP", "JPY"), Rate("195"))
+        self.table.set_rate("USD", "JPY", "100")
+        self.assertEqual(self.table.get_rate("GBP", "JPY"), Rate("130"))
+        # A direct rate takes precedence over the cross rate
+        self.table.set_rate("GBP", "JPY", "131")
+        self.assertEqual(self.table.get_rate("GBP", "JPY"), Rate("131"))
+        self.assertEqual(self.table.get_rate("JPY", "GBP"), Rate("131").inverse())
+        with self.assertRaises(ValueError):
+            self.table.set_rate("GBP", "GBP", "1")
+
+    def test_lru_bound(self):
+        table = RateTable(pivot="USD", max_cached=2)
+        table.update({("GBP", "USD"): "1.25", ("EUR", "USD"): "1.1", ("USD", "JPY"): "150"})
+        table.get_rate("GBP", "JPY")
+        table.get_rate("EUR", "JPY")
+        table.get_rate("GBP", "JPY")
+        table.get_rate("GBP", "EUR")
+        self.assertEqual(list(table._cache), [
+            (currencies["GBP"], currencies["JPY"]),
+            (currencies["GBP"], currencies["EUR"]),
+        ])
+        with self.assertRaises(ValueError):
+            RateTable(pivot="USD", max_cached=0)
+
+    def test_convert(self):
+        self.assertEqual(
+            self.table.convert(Amount(currencies["GBP"], 300), "USD"),
+            Amount(currencies["USD"], 375),
+        )
+        self.assertIs(self.table.convert(Amount(currencies["GBP"], 300), "usd").currency, currencies["USD"])
+        self.assertIs(self.table.convert(Amount.ZERO, "USD"), Amount.ZERO)
+        # Matches Amount.convert_currency with the same rate
+        self.assertEqual(
+            self.table.convert(Amount(currencies["EUR"], 1001), "GBP"),
+            Amount(currencies["EUR"], 1001).convert_currency("GBP", self.table.get_rate("EUR", "GBP")),
+        )
+
+    def test_convert_many(self):
+        self.assertEqual(
+            self.table.convert_many(
+                [Amount(currencies["GBP"], 300), Amount(currencies["EUR"], 100), Amount.ZERO, Amount(currencies["USD"], 5)],
+                "USD",
+            ),
+            [Amount(currencies["USD"], 375), Amount(currencies["USD"], 110), Amount.ZERO, Amount(currencies["USD"], 5)],
+        )
+        self.assertEqual(
+            self.table.convert_many(AmountArray(currencies["GBP"], [300, -1, 2]), "USD"),
+            AmountArray(currencies["USD"], [375, -1, 3]),
+        )
+
+    def test_major_rates(self):
+        table = RateTable(pivot="USD", major=True)
+        table.update({("USD", "JPY"): "150", ("USD", "BHD"): "0.377"})
+        self.assertEqual(table.get_rate("USD", "JPY"), Rate(150))
+        # Between minor units, JPY has no decimal places and USD has two
+        self.assertEqual(table.get_minor_rate("USD", "JPY"), Rate("1.5"))
+        self.assertEqual(self.table.get_minor_rate("GBP", "USD"), self.table.get_rate("GBP", "USD"))
+        self.assertEqual(
+            table.convert(Amount(currencies["USD"], 1234), "JPY"),
+            Amount(currencies["JPY"], 1851),
+        )
+        self.assertEqual(
+            table.convert_many([Amount(currencies["JPY"], 1500), Amount(currencies["USD"], 100)], "BHD"),
+            [Amount(currencies["BHD"], 3770), Amount(currencies["BHD"], 377)],
+        )
+        self.assertEqual(
+            table.convert_many(AmountArray(currencies["USD"], [1234]), "JPY"),
+            AmountArray(currencies["JPY"], [1851]),
+        )
@@ -0,0 +1,165 @@
+from __future__ import unicode_literals
+import os
+import shutil
+import struct
+import tempfile
+from unittest import TestCase, skipIf
+from .. import arrays, ledger
+from ..amount import Amount
+from ..arrays import AmountArray, MultiCurrencyAmountArray
+from ..currency import currencies, currency_codes
+from ..ledger import LedgerReader, LedgerWriter
+from .test_arrays import NumPyToggleMixin
+
+
+class LedgerTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "ledger.bin")
+        self.amounts = [
+            Amount(currencies["GBP"], 100),
+            Amount(currencies["USD"], 250),
+            Amount(currencies["GBP"], -30),
+            Amount(currencies["JPY"], 1000),
+            Amount(currencies["USD"], 2 ** 62),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, *batches):
+        with LedgerWriter(self.path) as writer:
+            for batch in batches:
+                writer.write_many(batch)
+
+    def test_round_trip(self):
+        self.write(self.amounts)
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), 5)
+            self.assertEqual(list(reader), self.amounts)
+            self.assertEqual(reader[3], Amount(currencies["JPY"], 1000))
+            self.assertIs(reader[3].currency, currencies["JPY"])
+            self.assertEqual(reader.values.tolist(), [100, 250, -30, 1000, 2 ** 62])
+            # The array uses the mapped columns in place
+            self.assertIs(reader.array.values, reader.values)
+            self.assertIs(reader.array.indices, reader.indices)
+
+    def test_empty(self):
+        self.write([])
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader), [])
+            self.assertEqual(reader.totals(), {})
+
+    def test_arrays(self):
+        self.write(
+            AmountArray(currencies["EUR"], [1, 2]),
+            [Amount(currencies["GBP"], 3)],
+            MultiCurrencyAmountArray.from_codes_and_minor(["USD", "EUR"], [4, 5]),
+        )
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(
+                reader.array,
+                MultiCurrencyAmountArray.from_codes_and_minor(["EUR", "EUR", "GBP", "USD", "EUR"], [1, 2, 3, 4, 5]),
+            )
+
+    def test_chunks(self):
+        old_size = ledger.WRITE_CHUNK_SIZE
+        ledger.WRITE_CHUNK_SIZE = 2
+        try:
+            self.write(self.amounts, self.amounts)
+        finally:
+            ledger.WRITE_CHUNK_SIZE = old_size
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(list(reader), self.amounts * 2)
+
+    def test_columns(self):
+        self.write(self.amounts)
+        with LedgerReader(self.path) as reader:
+            self.assertEqual(reader.totals(), {
+                "GBP": Amount(currencies["GBP"], 70),
+                "USD": Amount(currencies["USD"], 250 + 2 ** 62),
+                "JPY": Amount(currencies["JPY"], 1000),
+            })
+            self.assertEqual(reader.for_currency("gbp"), AmountArray(currencies["GBP"], [100, -30]))
+            self.assertEqual(list(reader.filter([True, False, False, True, False])), [self.amounts[0], self.amounts[3]])
+            self.assertEqual(reader.codes_present(), ["GBP", "JPY", "USD"])
+
+    def test_other_registry(self):
+        # Rewrite the codes table as if the writer's registry was ordered
+        # differently, with an extra code
+        self.write(self.amounts)
+        size = os.path.getsize(self.path)
+        with open(self.path, "r+b") as fh:
+            fh.seek(size - len(currency_codes) * ledger.CODE_SIZE)
+            table = [code.encode("ascii").ljust(ledger.CODE_SIZE, b"\x00") for code in currency_codes]
+            table[currency_codes.index("GBP")], table[currency_codes.index("USD")] = (
+                table[currency_codes.index("USD")], table[currency_codes.index("GBP")]
+            )
+            fh.write(b"".join(table) + b"XTS".ljust(ledger.CODE_SIZE, b"\x00"))
+            fh.seek(0)
+            header = list(ledger.HEADER.unpack(fh.read(ledger.HEADER.size)))
+            header[3] += 1
+            fh.seek(0)
+            fh.write(ledger.HEADER.pack(*header))
+        with LedgerReader(self.path) as reader:
+            self.assertEqual([amount.currency.code for amount in reader], ["USD", "GBP", "USD", "JPY", "GBP"])
+        # Unused codes we don't know are fine, but rows using them aren't
+        self.write([Amount(currencies["GBP"], 1), Amount(currencies["USD"], 2)])
+        with open(self.path, "r+b") as fh:
+            fh.seek(ledger.HEADER.size + 2 * 8 + 2)
+            fh.write(struct.pack("<H", len(currency_codes)))
+            fh.seek(0)
+            header = list(ledger.HEADER.unpack(fh.read(ledger.HEADER.size)))
+            header[3] += 1
+            fh.seek(0)
+            fh.write(ledger.HEADER.pack(*header))
+            fh.seek(0, os.SEEK_END)
+            fh.write(b"QQQ".ljust(ledger.CODE_SIZE, b"\x00"))
+        with self.assertRaises(ValueError) as context:
+            LedgerReader(self.path)
+        self.assertIn("QQQ", str(context.exception))
+
+    def test_failed_write(self):
+        # A with block that raises leaves no partial ledger behind
+        with self.assertRaises(RuntimeError):
+            with LedgerWriter(self.path) as writer:
+                writer.write_many(self.amounts)
+                raise RuntimeError("failed")
+        self.assertFalse(os.path.exists(self.path))
+        writer = LedgerWriter(self.path)
+        writer.write_many(self.amounts)
+        writer.discard()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            with LedgerWriter(self.path) as writer:
+                writer.write(Amount.ZERO)
+        with self.assertRaises(OverflowError):
+            with LedgerWriter(self.path) as writer:
+                writer.write(Amount(currencies["GBP"], 2 ** 63))
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path, "wb") as fh:
+            fh.write(b"not a ledger file, but long enough")
+        with self.assertRaises(ValueError):
+            LedgerReader(self.path)
+        self.write(self.amounts)
+        with open(self.path, "r+b") as fh:
+            fh.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(ValueError):
+            LedgerReader(self.path)
+        with open(self.path, "r+b") as fh:
+            fh.seek(8)
+            fh.write(struct.pack("<H", 99))
+        with self.assertRaises(ValueError):
+            LedgerReader(self.path)
+
+
+@skipIf(arrays._numpy() is None, "NumPy is not installed")
+class PurePythonLedgerTests(NumPyToggleMixin, LedgerTests):
+
+    def tearDown(self):
+        super(PurePythonLedgerTests, self).tearDown()
+        LedgerTests.tearDown(self)
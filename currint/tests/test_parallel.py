@@ -0,0 +1,78 @@
+from __future__ import unicode_literals
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+from .. import parallel
+from ..amount import Amount
+from ..arrays import AmountArray, MultiCurrencyAmountArray
+from ..currency import Currency, currencies, register_currency
+from ..fx import RateTable
+
+
+class ParallelTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def setUp(self):
+        codes = ["GBP", "USD", "JPY", "GBP", "EUR"] * 7
+        values = [value * 1234567 - 20000000 for value in range(len(codes))]
+        self.batch = MultiCurrencyAmountArray.from_codes_and_minor(codes, values)
+        self.table = RateTable(pivot="USD")
+        self.table.update({("GBP", "USD"): "1.2734", ("USD", "JPY"): "0.0151", ("EUR", "USD"): "1.0841"})
+
+    def test_totals(self):
+        for shard_size in (1, 4, 1000):
+            self.assertEqual(
+                parallel.totals(self.batch, executor=self.executor, shard_size=shard_size),
+                self.batch.totals(),
+            )
+        self.assertEqual(parallel.totals([], executor=self.executor), {})
+
+    def test_totals_pairs(self):
+        self.assertEqual(
+            parallel.totals([("GBP", 2 ** 62), ("gbp", 2 ** 62), ("USD", -1)], executor=self.executor, shard_size=1),
+            {"GBP": Amount(currencies["GBP"], 2 ** 63), "USD": Amount(currencies["USD"], -1)},
+        )
+        with self.assertRaises(ValueError):
+            parallel.totals([("WAITWHAT", 1)], executor=self.executor)
+
+    def test_convert(self):
+        converted = parallel.convert(self.batch, self.table, "usd", executor=self.executor, shard_size=4)
+        self.assertEqual(
+            converted,
+            AmountArray(currencies["USD"], [amount.value for amount in self.table.convert_many(list(self.batch), "USD")]),
+        )
+        self.assertEqual(
+            parallel.convert([], self.table, "USD", executor=self.executor),
+            AmountArray(currencies["USD"], []),
+        )
+        with self.assertRaises(OverflowError):
+            parallel.convert([("JPY", 2 ** 62)], self.table, "USD", executor=self.executor)
+
+    def test_format_many(self):
+        self.assertEqual(
+            parallel.format_many(self.batch, sep="|", executor=self.executor, shard_size=3),
+            "|".join(str(amount) for amount in self.batch),
+        )
+        self.assertEqual(parallel.format_many([], executor=self.executor), "")
+
+    def test_registered_after_start(self):
+        # Workers don't have currencies registered after they started, so
+        # formatting can't rely on their registries
+        self.executor.submit(int).result()
+        register_currency(Currency("XTS", "963", 3, "Testing", prefix="T"))
+        try:
+            self.assertEqual(
+                parallel.format_many([("XTS", 1500), ("GBP", 150)], sep="|", executor=self.executor),
+                "T1.500|" + currencies["GBP"].format(150),
+            )
+        finally:
+            currencies.pop("XTS", None)
+
+    def test_own_pool(self):
+        self.assertEqual(parallel.totals(self.batch, workers=2, shard_size=10), self.batch.totals())
@@ -0,0 +1,79 @@
+# encoding: utf8
+from __future__ import unicode_literals
+import random
+import six
+from decimal import Decimal, InvalidOperation
+from unittest import TestCase
+from ..amount import Amount
+from ..parsing import parse_major_stream
+
+
+class ParseMajorStreamTests(TestCase):
+
+    def assertParses(self, code, values, expected):
+        self.assertEqual(list(parse_major_stream(code, values)), expected)
+
+    def assertRaisesSameError(self, code, value):
+        """
+        Checks the stream raises exactly what from_code_and_major does.
+        """
+        with self.assertRaises(ValueError) as reference:
+            Amount.from_code_and_major(code, value)
+        with self.assertRaises(ValueError) as parsed:
+            list(parse_major_stream(code, [value]))
+        self.assertEqual(six.text_type(parsed.exception), six.text_type(reference.exception))
+
+    def test_parse(self):
+        self.assertParses(
+            "GBP",
+            ["3.00", ".10", "10", "10.01", "-1.5", "+2.", "0.00", "-0.01", " 7.1 ", "1.230"],
+            [300, 10, 1000, 1001, -150, 200, 0, -1, 710, 123],
+        )
+        self.assertParses("gbp", iter(["1"]), [100])
+        self.assertParses("JPY", ["100", "5.000"], [100, 5])
+        self.assertParses("BHD", ["1.5", "0.001"], [1500, 1])
+        self.assertParses("XBT", ["0.00000001", "21000000"], [1, 2100000000000000])
+
+    def test_unusual_formats(self):
+        # These aren't plain decimal strings, but Decimal accepts them
+        self.assertParses("GBP", ["1e2", "1E-2"], [10000, 1])
+        try:
+            Decimal("1_000")
+        except InvalidOperation:
+            # Decimal only accepts underscores from Python 3.6
+            self.assertRaisesSameError("GBP", "1_000.5")
+        else:
+            self.assertParses("GBP", ["1_000.5"], [100050])
+        self.assertParses("GBP", [10, Decimal("10.01")], [1000, 1001])
+        # Non-decimal currency
+        self.assertParses("MRO", ["5", "1.2"], [25, 6])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            list(parse_major_stream("WAITWHAT", ["1.00"]))
+        for value in ["12.432", "aaaaaaah", "", ".", "1.2.3", "--1", "1.-2", "0.001", "²"]:
+            self.assertRaisesSameError("GBP", value)
+        self.assertRaisesSameError("JPY", "1.5")
+        self.assertRaisesSameError("MRO", "1.1")
+
+    def test_matches_decimal(self):
+        rng = random.Random(4217)
+        for code in ["GBP", "JPY", "BHD", "XBT"]:
+            values = []
+            for _ in range(500):
+                value = "%s%d.%s" % (
+                    rng.choice(["", "-", "+"]),
+                    rng.randrange(10 ** rng.randrange(1, 20)),
+                    "".join(rng.choice("0123456789") for _ in range(rng.randrange(9))),
+                )
+                try:
+                    Amount.from_code_and_major(code, value)
+                except ValueError:
+                    self.assertRaisesSameError(code, value)
+                else:
+                    values.append(value)
+            self.assertParses(
+                code,
+                values,
+                [Amount.from_code_and_major(code, value).value for value in values],
+            )
@@ -0,0 +1,185 @@
+# encoding: utf8
+from __future__ import unicode_literals
+import pickle
+import random
+from decimal import (
+    Decimal, ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
+    ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP, localcontext,
+)
+from fractions import Fraction
+from unittest import TestCase
+from ..amount import Amount
+from ..arrays import AmountArray
+from ..currency import currencies
+from ..rate import Rate, round_divide
+
+ROUNDING_MODES = [
+    ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
+    ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP,
+]
+
+
+class RoundDivideTests(TestCase):
+
+    def test_matches_decimal(self):
+        rng = random.Random(4217)
+        cases = [(n, d) for n in range(-25, 26) for d in (-10, -4, -3, -2, 1, 2, 3, 4, 10)]
+        cases += [(rng.randrange(-10 ** 20, 10 ** 20), rng.randrange(1, 10 ** 6)) for _ in range(300)]
+        for numerator, denominator in cases:
+            # Enough precision that Decimal's division can't disturb the integral rounding
+            with localcontext() as context:
+                context.prec = 100
+                exact = Decimal(numerator) / Decimal(denominator)
+            for rounding in ROUNDING_MODES:
+                self.assertEqual(
+                    round_divide(numerator, denominator, rounding),
+                    int(exact.to_integral_value(rounding)),
+                    "%s / %s with %s" % (numerator, denominator, rounding),
+                )
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            round_divide(1, 2, "ROUND_SIDEWAYS")
+
+
+class RateTests(TestCase):
+
+    def test_construction(self):
+        self.assertEqual((Rate("1.2734").numerator, Rate("1.2734").denominator), (6367, 5000))
+        self.assertEqual(Rate(Decimal("0.50")), Rate("1e-1") * Rate(5))
+        self.assertEqual(Rate(Fraction(1, 3)), Rate(3).inverse())
+        self.assertEqual(Rate(Rate("2.5")), Rate("2.5"))
+        for value in [1.5, "abc", "NaN", Decimal("Infinity"), None]:
+            with self.assertRaises(ValueError):
+                Rate(value)
+
+    def test_equality_and_hash(self):
+        self.assertEqual(Rate("0.5"), Rate(Fraction(1, 2)))
+        self.assertNotEqual(Rate("0.5"), Rate("0.25"))
+        self.assertNotEqual(Rate("0.5"), Decimal("0.5"))
+        self.assertEqual(len(set([Rate("0.5"), Rate("0.50"), Rate(2)])), 2)
+
+    def test_arithmetic(self):
+        self.assertEqual(Rate("1.25") * Rate("0.8"), Rate(1))
+        self.assertEqual(Rate("1.25").inverse(), Rate("0.8"))
+        with self.assertRaises(ZeroDivisionError):
+            Rate(0).inverse()
+        self.assertEqual(Rate("1.2734").to_decimal(), Decimal("1.2734"))
+
+    def test_pickle(self):
+        rate = Rate("1.2734")
+        self.assertEqual(pickle.loads(pickle.dumps(rate, pickle.HIGHEST_PROTOCOL)), rate)
+
+    def test_apply(self):
+        self.assertEqual(Rate("1.005").apply(100), 101)
+        self.assertEqual(Rate("1.004").apply(100), 100)
+        self.assertEqual(Rate("1.005").apply(-100), -101)
+        self.assertEqual(Rate("1.005").apply(100, ROUND_DOWN), 100)
+        self.assertEqual(Rate(3).apply(7), 21)
+        with self.assertRaises(ValueError):
+            Rate(3).apply(1.5)
+
+    def test_apply_many(self):
+        rng = random.Random(4217)
+        values = [rng.randrange(-10 ** 15, 10 ** 15) for _ in range(500)] + [0, 1, -1, 5, -5]
+        for rate in [Rate("1.2734"), Rate("-0.5"), Rate(7), Rate(Fraction(1, 3))]:
+            for rounding in ROUNDING_MODES:
+                self.assertEqual(
+                    rate.apply_many(values, rounding),
+                    [rate.apply(value, rounding) for value in values],
+                )
+        with self.assertRaises(ValueError):
+            Rate(3).apply_many([1, 1.5])
+
+    def test_matches_decimal_factor(self):
+        rng = random.Random(4217)
+        for _ in range(500):
+            factor = Decimal(rng.randrange(-10 ** 6, 10 ** 6)).scaleb(-rng.randrange(8))
+            value = rng.randrange(-10 ** 12, 10 ** 12)
+            amount = Amount(currencies["GBP"], value)
+            self.assertEqual(amount.apply_factor(Rate(factor)), amount.apply_factor(factor))
+            self.assertEqual(
+                amount.convert_currency("USD", Rate(factor)),
+                amount.convert_currency("USD", factor),
+            )
+
+    def test_amount_integration(self):
+        self.assertEqual(
+            Amount(currencies["GBP"], 100).apply_factor(Rate("1.005")),
+            Amount(currencies["GBP"], 101),
+        )
+        self.assertEqual(
+            Amount(currencies["GBP"], 300).convert_currency("eur", Rate("0.91")),
+            Amount(currencies["EUR"], 273),
+        )
+        with self.assertRaises(ValueError):
+            Amount(currencies["GBP"], 300).convert_currency("WAITWHAT", Rate("0.91"))
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [100, -100, 3]).apply_factor(Rate("1.005")),
+            AmountArray(currencies["GBP"], [101, -101, 3]),
+        )
+
+    def test_minor_rate(self):
+        self.assertEqual(Rate(150).minor_rate(currencies["USD"], currencies["JPY"]), Rate("1.5"))
+        self.assertEqual(Rate("0.377").minor_rate(currencies["USD"], currencies["BHD"]), Rate("3.77"))
+        self.assertEqual(Rate(1).minor_rate(currencies["MRO"], currencies["USD"]), Rate(20))
+
+
+class MajorConversionTests(TestCase):
+
+    def test_convert_currency(self):
+        # 12.34 USD at 150 JPY per USD is 1851 JPY
+        self.assertEqual(
+            Amount(currencies["USD"], 1234).convert_currency("jpy", 150, major=True),
+            Amount(currencies["JPY"], 1851),
+        )
+        self.assertEqual(
+            Amount(currencies["JPY"], 1851).convert_currency("USD", Rate(150).inverse(), major=True),
+            Amount(currencies["USD"], 1234),
+        )
+        # 1.00 USD at 0.377 BHD per USD is 0.377 BHD
+        self.assertEqual(
+            Amount(currencies["USD"], 100).convert_currency("BHD", "0.377", major=True),
+            Amount(currencies["BHD"], 377),
+        )
+        # Non-decimal currencies: 1 MRO is 5 minor units
+        self.assertEqual(
+            Amount(currencies["MRO"], 7).convert_currency("USD", Decimal("0.01"), major=True),
+            Amount(currencies["USD"], 1),
+        )
+        with self.assertRaises(ValueError):
+            Amount(currencies["USD"], 100).convert_currency("WAITWHAT", 1, major=True)
+        with self.assertRaises(ValueError):
+            Amount(currencies["USD"], 100).convert_currency("JPY", 150.0, major=True)
+
+    def test_matches_minor_conversion(self):
+        rng = random.Random(4217)
+        for _ in range(200):
+            source, target = rng.sample(["USD", "JPY", "BHD", "XBT", "GBP"], 2)
+            rate = Decimal(rng.randrange(1, 10 ** 6)).scaleb(-rng.randrange(6))
+            amount = Amount(currencies[source], rng.randrange(-10 ** 9, 10 ** 9))
+            with localcontext() as context:
+                context.prec = 100
+                minor_rate = rate * currencies[target].divisor / currencies[source].divisor
+            self.assertEqual(
+                amount.convert_currency(target, rate, major=True),
+                amount.convert_currency(target, Rate(minor_rate)),
+            )
+
+    def test_amount_array(self):
+        self.assertEqual(
+            AmountArray(currencies["USD"], [1234, -1234, 1]).convert_currency("JPY", "150", major=True),
+            AmountArray(currencies["JPY"], [1851, -1851, 2]),
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [300]).convert_currency("USD", 1.5),
+            AmountArray(currencies["USD"], [450]),
+        )
+        self.assertEqual(
+            AmountArray(currencies["GBP"], [300]).convert_currency("EUR", Rate("0.91")),
+            AmountArray(currencies["EUR"], [273]),
+        )
+        with self.assertRaises(ValueError):
+            AmountArray(currencies["GBP"], [300]).convert_currency("WAITWHAT", 1)
+        with self.assertRaises(ValueError):
+            AmountArray(currencies["GBP"], [300]).convert_currency("USD", "1")
@@ -0,0 +1,56 @@
+from __future__ import unicode_literals
+import os
+import six
+import subprocess
+import sys
+from decimal import InvalidOperation
+from unittest import TestCase, skipIf
+from .. import amount
+from ..amount import Amount
+from ..currency import currencies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class BackendTests(TestCase):
+
+    def test_selected(self):
+        if os.environ.get("CURRINT_PURE_PYTHON"):
+            self.assertIsNone(amount._speedups)
+        if amount._speedups is None:
+            self.assertIs(Amount.__bases__[0], amount._AmountCore)
+            self.assertEqual(Amount.__bases__[0].__module__, "currint.amount")
+        else:
+            self.assertIs(Amount.__bases__[0], amount._speedups.AmountCore)
+
+    def test_results_are_amounts(self):
+        # Even from subclasses, as Amount._from_trusted makes them
+        from .test_amount import LabelledAmount
+        labelled = LabelledAmount(currencies["GBP"], 5)
+        for result in (labelled + labelled, labelled - Amount.ZERO, Amount(currencies["GBP"], 1) + labelled):
+            self.assertIs(type(result), Amount)
+        self.assertIs(type(Amount.ZERO + labelled), Amount)
+
+    def test_invalid_major_value(self):
+        with self.assertRaises(ValueError) as context:
+            Amount.from_code_and_major("GBP", "1.2.3")
+        self.assertEqual(str(context.exception), "Invalid currency value 1.2.3")
+        if six.PY3:
+            self.assertIsInstance(context.exception.__context__, InvalidOperation)
+
+
+@skipIf(amount._speedups is None, "Already running on the pure Python backend")
+class PurePythonBackendTests(TestCase):
+
+    def test_suite(self):
+        # The whole suite runs against the pure Python fallback too
+        environment = dict(os.environ, CURRINT_PURE_PYTHON="1")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "unittest", "discover", "-s", os.path.join(ROOT, "currint", "tests"), "-t", ROOT],
+            cwd=ROOT,
+            env=environment,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        output = process.communicate()[0].decode("utf8", "replace")
+        self.assertEqual(process.returncode, 0, output)
@@ -1,16 +1,71 @@
-from setuptools import setup, find_packages
+import os
+import platform
+import sys
+from setuptools import Extension, setup, find_packages
+from setuptools.command.build_ext import build_ext
 from currint import __version__
+try:
+    from setuptools.errors import CCompilerError, ExecError, PlatformError
+except ImportError:
+    # setuptools < 59 (e.g. on Python 2), where distutils is still present
+    from distutils.errors import (
+        CCompilerError, DistutilsExecError as ExecError, DistutilsPlatformError as PlatformError,
+    )
+
+
+class optional_build_ext(build_ext):
+    """
+    Builds the compiled Amount core if possible; currint falls back to pure
+    Python without it, so a failed build only warns.
+    """
+
+    def run(self):
+        self.failed = []
+        try:
+            build_ext.run(self)
+        except PlatformError as error:
+            self.warn_fallback(error)
+
+    def build_extension(self, ext):
+        try:
+            build_ext.build_extension(self, ext)
+        except (CCompilerError, ExecError, PlatformError, ValueError) as error:
+            self.failed.append(ext)
+            self.warn_fallback(error)
+
+    def copy_extensions_to_source(self):
+        # For --inplace builds; there's nothing to copy for a failed build
+        self.extensions = [ext for ext in self.extensions if ext not in self.failed]
+        build_ext.copy_extensions_to_source(self)
+
+    def warn_fallback(self, error):
+        sys.stderr.write("WARNING: could not build currint._speedups (%s); using pure Python\n" % error)
+
+
+# The extension uses the CPython 3 C API; set CURRINT_PURE_PYTHON to skip it
+if platform.python_implementation() == "CPython" and sys.version_info[0] >= 3 and not os.environ.get("CURRINT_PURE_PYTHON"):
+    ext_modules = [Extension("currint._speedups", ["currint/_speedups.c"])]
+else:
+    ext_modules = []
 
 setup(
     name='currint',
     version=__version__,
     description='Integer-based, fixed precision currency calculation',
     packages=find_packages(),
+    ext_modules=ext_modules,
+    cmdclass={'build_ext': optional_build_ext},
+    package_data={
+        'currint': ['data/*.json'],
+    },
     author='Andrew Godwin',
     author_email='andrew@aeracode.org',
     install_requires=[
         'six',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     test_suite='currint.tests',
     classifiers=[
         'Development Status :: 5 - Production/Stable',